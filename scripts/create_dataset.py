@@ -3,20 +3,24 @@
 # global imports
 import argparse
 import asyncio
-import io
 import logging
 import os
+import shutil
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pandas as pd
 
 # local imports
 from source.aws import AWSHandler
-from source.data_handling.data_handler import DataHandler
+from source.data_handling import DataHandler, CandleStore
 from source.indicators import DonchainChannelsIndicatorHandler, \
     MovingVolumeProfileIndicatorHandler, StochasticOscillatorIndicatorHandler, \
     ExponentialMovingAverageIndicatorHandler, MACDIndicatorHandler, \
     BollingerBandsIndicatorHandler, OnBalanceVolumeIndicatorHandler, \
     RelativeStrengthIndexIndicatorHandler, VolatilityIndicatorHandler
-from source.utils import Granularity
+from source.utils import Granularity, CompressionHandler, IndexedDataSetWriter, INDEXED_DATA_SET_EXTENSION
 
 def str_to_granularity(granularity_str):
     granularity_map = {
@@ -33,7 +37,7 @@ def str_to_granularity(granularity_str):
 
 def str_to_list_of_indicators(list_of_indicators_str):
     if not list_of_indicators_str:
-        return []
+        return [], ''
 
     indicators_map = {
         'donchain_channels': DonchainChannelsIndicatorHandler(),
@@ -57,21 +61,190 @@ def str_to_list_of_indicators(list_of_indicators_str):
 
     return list_of_indicators, list_of_indicators_str
 
-async def main(trading_pair, start_date, end_date, granularity_str, list_of_indicators_str) -> bool:
+def generate_csv_chunks(data, rows_per_chunk = 100000):
+    for i in range(0, max(len(data), 1), rows_per_chunk):
+        yield data.iloc[i:i + rows_per_chunk].to_csv(header = i == 0, index = True)
+
+def create_file_name(trading_pair, start_date, end_date, granularity_str, list_of_indicators_str, compression = None,
+                     data_set_format = 'csv'):
+    file_name = f'DS_{trading_pair}_{start_date}_{end_date}_{granularity_str}_{list_of_indicators_str}'
+    for char_to_replace in [':', ' ', ',']:
+        file_name = file_name.replace(char_to_replace, '_')
+
+    if data_set_format == 'indexed':
+        return file_name + INDEXED_DATA_SET_EXTENSION
+    return file_name + '.csv' + CompressionHandler().get_extension(compression)
+
+async def main(trading_pairs, start_date, end_date, granularity_str, list_of_indicators_str,
+               candle_store_path = None, trading_pair_catalogue_path = None, stream_directory_path = None,
+               backfill_gaps = False, resample_from_str = None, compression = None, data_set_format = 'csv') -> bool:
+    try:
+        list_of_indicators, list_of_indicators_str = str_to_list_of_indicators(list_of_indicators_str)
+        candle_store = CandleStore(candle_store_path) if candle_store_path else None
+        granularity = str_to_granularity(granularity_str)
+        compression_handler = CompressionHandler()
+        async with DataHandler(list_of_indicators, candle_store, trading_pair_catalogue_path,
+                               backfill_gaps = backfill_gaps,
+                               resample_from = str_to_granularity(resample_from_str)) as data_handler:
+            if stream_directory_path:
+                os.makedirs(stream_directory_path, exist_ok = True)
+                aws_handler = AWSHandler.get_handler(os.getenv('ROLE_NAME'))
+                for trading_pair in trading_pairs:
+                    file_name = create_file_name(trading_pair, start_date, end_date, granularity_str,
+                                                 list_of_indicators_str, compression)
+                    file_path = os.path.join(stream_directory_path, compression_handler.strip_extension(file_name))
+                    await data_handler.stream_data_to_file(trading_pair, start_date, end_date, granularity, file_path)
+                    aws_handler.upload_stream_to_s3(os.getenv('BUCKET_NAME'), compression_handler.compress_chunks(
+                        compression_handler.read_file_chunks(file_path), compression), file_name)
+                    os.remove(file_path)
+                    logging.info('Successfully uploaded data to S3 bucket! File name: %s', file_name)
+                return True
+
+            if len(trading_pairs) > 1:
+                prepared_data = await data_handler.prepare_panel_data(trading_pairs, start_date, end_date, granularity)
+            else:
+                prepared_data = {trading_pairs[0]: await data_handler.prepare_data(trading_pairs[0], start_date,
+                                                                                   end_date, granularity)}
+
+        for trading_pair, coverage_statistics in data_handler.coverage_statistics.items():
+            logging.info('Coverage of %s: %s', trading_pair, coverage_statistics)
+
+        aws_handler = AWSHandler.get_handler(os.getenv('ROLE_NAME'))
+        for trading_pair, data in prepared_data.items():
+            file_name = create_file_name(trading_pair, start_date, end_date, granularity_str, list_of_indicators_str,
+                                         compression, data_set_format)
+            upload_data(aws_handler, data, file_name, compression, data_set_format)
+            logging.info('Successfully uploaded data to S3 bucket! File name: %s', file_name)
+        return True
+
+    except Exception as e:
+        logging.error('Encounter problem during script execution!')
+        logging.error(e)
+        return False
+
+async def main_append(trading_pair, start_date, end_date, granularity_str, list_of_indicators_str, append_to,
+                      append_output = 'version', candle_store_path = None, trading_pair_catalogue_path = None,
+                      backfill_gaps = False, resample_from_str = None, compression = None) -> bool:
     try:
         list_of_indicators, list_of_indicators_str = str_to_list_of_indicators(list_of_indicators_str)
-        data_handler = DataHandler(list_of_indicators)
+        candle_store = CandleStore(candle_store_path) if candle_store_path else None
+        granularity = str_to_granularity(granularity_str)
+        aws_handler = AWSHandler.get_handler(os.getenv('ROLE_NAME'))
+        compression_handler = CompressionHandler()
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            downloaded_path = os.path.join(temporary_directory, os.path.basename(append_to))
+            if os.path.exists(append_to):
+                shutil.copyfile(append_to, downloaded_path)
+            else:
+                aws_handler.download_file_from_s3(os.getenv('BUCKET_NAME'), append_to, downloaded_path)
+
+            # Existing data set is kept as plain CSV, so new rows can be appended to it
+            existing_path = os.path.join(temporary_directory, 'existing.csv')
+            with open(downloaded_path, 'rb') as downloaded_file:
+                compression_handler.decompress_to_file(downloaded_file, existing_path)
+            os.remove(downloaded_path)
+
+            async with DataHandler(list_of_indicators, candle_store, trading_pair_catalogue_path,
+                                   backfill_gaps = backfill_gaps,
+                                   resample_from = str_to_granularity(resample_from_str)) as data_handler:
+                existing_tail = data_handler.read_data_tail(existing_path, data_handler.get_warm_up_period() + 1)
+                appended_data = await data_handler.prepare_appended_data(existing_tail, trading_pair, end_date, granularity)
+
+            if appended_data.empty:
+                logging.info('Data set is already up to date!')
+                return True
+
+            if append_output == 'segment':
+                segment_start_date = appended_data.index[0].strftime('%Y-%m-%d %H:%M:%S')
+                file_name = create_file_name(trading_pair, segment_start_date, end_date, granularity_str,
+                                             list_of_indicators_str, compression)
+                upload_data(aws_handler, appended_data, file_name, compression)
+            else:
+                appended_data.to_csv(existing_path, mode = 'a', header = False, index = True)
+                file_name = create_file_name(trading_pair, start_date, end_date, granularity_str, list_of_indicators_str,
+                                             compression)
+                aws_handler.upload_stream_to_s3(os.getenv('BUCKET_NAME'), compression_handler.compress_chunks(
+                    compression_handler.read_file_chunks(existing_path), compression), file_name)
+
+        logging.info('Successfully uploaded %d appended rows to S3 bucket! File name: %s', len(appended_data), file_name)
+        return True
+
+    except Exception as e:
+        logging.error('Encounter problem during script execution!')
+        logging.error(e)
+        return False
+
+def calculate_indicators(data, list_of_indicators_str):
+    list_of_indicators, _ = str_to_list_of_indicators(list_of_indicators_str)
+    if not list_of_indicators:
+        return data
+
+    return pd.concat([data] + [indicator.calculate(data) for indicator in list_of_indicators], axis = 1)
+
+def upload_data(aws_handler, data, file_name, compression = None, data_set_format = 'csv'):
+    if data_set_format == 'indexed':
+        chunks = IndexedDataSetWriter().generate_chunks(data)
+    else:
+        chunks = CompressionHandler().compress_chunks(generate_csv_chunks(data), compression)
+    aws_handler.upload_stream_to_s3(os.getenv('BUCKET_NAME'), chunks, file_name)
+
+async def build_dataset(data_handler, process_pool, upload_pool, aws_handler, trading_pair, start_date, end_date,
+                        granularity_str, list_of_indicators_str, compression = None, data_set_format = 'csv'):
+    status = {'trading_pair': trading_pair, 'granularity': granularity_str, 'status': 'failed', 'rows': 0,
+              'coverage': None, 'duration': 0.0, 'error': ''}
+    start_time = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
         data = await data_handler.prepare_data(trading_pair, start_date, end_date, str_to_granularity(granularity_str))
-        csv_data_buffer = io.StringIO()
-        data.to_csv(csv_data_buffer, index = True)
-
-        file_name = f'DS_{trading_pair}_{start_date}_{end_date}_{granularity_str}_{list_of_indicators_str}.csv'
-        for char_to_replace in [':', ' ', ',']:
-            file_name = file_name.replace(char_to_replace, '_')
-        aws_handler = AWSHandler(os.getenv('ROLE_NAME'))
-        aws_handler.upload_buffer_to_s3(os.getenv('BUCKET_NAME'), csv_data_buffer, file_name)
+        status['coverage'] = data_handler.coverage_statistics.get(trading_pair, {}).get('coverage')
+        data = await loop.run_in_executor(process_pool, calculate_indicators, data, list_of_indicators_str)
+
+        file_name = create_file_name(trading_pair, start_date, end_date, granularity_str, list_of_indicators_str,
+                                     compression, data_set_format)
+        await loop.run_in_executor(upload_pool, upload_data, aws_handler, data, file_name, compression,
+                                   data_set_format)
+        status.update({'status': 'uploaded', 'rows': len(data)})
         logging.info('Successfully uploaded data to S3 bucket! File name: %s', file_name)
-        return True
+    except Exception as e:
+        status['error'] = str(e)
+        logging.error('Encounter problem while building %s %s data set!', trading_pair, granularity_str)
+        logging.error(e)
+
+    status['duration'] = time.perf_counter() - start_time
+    return status
+
+def log_status_summary(statuses):
+    logging.info('%-15s %-11s %-9s %10s %9s %10s  %s', 'trading_pair', 'granularity', 'status', 'rows',
+                 'coverage', 'duration', 'error')
+    for status in statuses:
+        coverage = f"{status['coverage']:.2%}" if status['coverage'] is not None else '-'
+        logging.info('%-15s %-11s %-9s %10d %9s %9.1fs  %s', status['trading_pair'], status['granularity'],
+                     status['status'], status['rows'], coverage, status['duration'], status['error'])
+
+async def main_batch(trading_pairs, start_date, end_date, granularities_str, list_of_indicators_str,
+                     candle_store_path = None, trading_pair_catalogue_path = None, backfill_gaps = False,
+                     resample_from_str = None, max_workers = None, max_upload_workers = 4,
+                     compression = None, data_set_format = 'csv') -> bool:
+    try:
+        _, list_of_indicators_str = str_to_list_of_indicators(list_of_indicators_str)
+        candle_store = CandleStore(candle_store_path) if candle_store_path else None
+        aws_handler = AWSHandler.get_handler(os.getenv('ROLE_NAME'))
+
+        # Single data handler shares one Coinbase session and rate budget between all data sets
+        with ProcessPoolExecutor(max_workers) as process_pool, ThreadPoolExecutor(max_upload_workers) as upload_pool:
+            async with DataHandler([], candle_store, trading_pair_catalogue_path,
+                                   backfill_gaps = backfill_gaps,
+                                   resample_from = str_to_granularity(resample_from_str)) as data_handler:
+                statuses = await asyncio.gather(*[build_dataset(data_handler, process_pool, upload_pool, aws_handler,
+                                                                trading_pair, start_date, end_date, granularity_str,
+                                                                list_of_indicators_str, compression,
+                                                                data_set_format)
+                                                  for trading_pair in trading_pairs
+                                                  for granularity_str in granularities_str])
+
+        log_status_summary(statuses)
+        return all(status['status'] == 'uploaded' for status in statuses)
 
     except Exception as e:
         logging.error('Encounter problem during script execution!')
@@ -79,15 +252,63 @@ async def main(trading_pair, start_date, end_date, granularity_str, list_of_indi
         return False
 
 if __name__ == "__main__":
+    logging.basicConfig(level = logging.INFO, format = "{asctime} | {levelname} | {message}",
+                        style="{", datefmt="%Y-%m-%d %H:%M:%S")
+
     parser = argparse.ArgumentParser(description = 'Prepare data with given parameters and save it into AWS S3 bucket.')
-    parser.add_argument('--trading_pair', type = str, required = True, help = 'Trading pair symbol.')
+    trading_pair_group = parser.add_mutually_exclusive_group(required = True)
+    trading_pair_group.add_argument('--trading_pair', type = str, help = 'Trading pair symbol.')
+    trading_pair_group.add_argument('--trading_pairs', type = str,
+                                    help = '''List of trading pair symbols, that looks like: pair_1,pair_2,...,pair_N.
+                                    Data for all of them is prepared at once in panel mode and uploaded as
+                                    separate data sets.''')
     parser.add_argument('--start_date', type = str, required = True, help = 'Start date in YYYY-MM-DD format.')
     parser.add_argument('--end_date', type = str, required = True, help = 'End date in YYYY-MM-DD format.')
-    parser.add_argument('--granularity', type = str, required = True, choices = ['1m', '5m', '15m', '30m', '1h', '6h', '1d'],
-                        help = 'Granularity of the fetched data.')
+    granularity_group = parser.add_mutually_exclusive_group(required = True)
+    granularity_group.add_argument('--granularity', type = str, choices = ['1m', '5m', '15m', '30m', '1h', '6h', '1d'],
+                                   help = 'Granularity of the fetched data.')
+    granularity_group.add_argument('--granularities', type = str,
+                                   help = '''List of granularities, that looks like: granularity_1,...,granularity_N.
+                                   Implies batch mode.''')
     parser.add_argument('--list_of_indicators', type = str, required = False,
                         help = '''List of indicators, that looks like: indicator_1,indicator_2,...,indicator_N.
                         Possible indicators are: donchain_channels, moving_volume_profile, stochastic_oscillator.''')
+    parser.add_argument('--candle_store_path', type = str, required = False,
+                        help = '''Path to local candle store. If given, already stored candles are reused
+                        and only missing ranges are fetched from data source.''')
+    parser.add_argument('--trading_pair_catalogue_path', type = str, required = False,
+                        help = '''Path to file that recognized trading pairs are cached in, so they are not
+                        fetched again on every run.''')
+    parser.add_argument('--stream_directory_path', type = str, required = False,
+                        help = '''Path to directory for temporary data set files. If given, data is streamed
+                        chunk by chunk into file with indicators calculated on the fly, which keeps memory
+                        usage bounded for long ranges. Trading pairs are then prepared one by one.''')
+    parser.add_argument('--backfill_gaps', action = 'store_true',
+                        help = '''Request again only ranges missing from collected candles, e.g. due to
+                        short or empty pages returned by data source.''')
+    parser.add_argument('--resample_from', type = str, required = False, choices = ['1m', '5m', '15m', '30m', '1h', '6h'],
+                        help = '''Finer granularity that candles are collected with and resampled locally into
+                        requested granularity. Combined with candle store, only this granularity is fetched.''')
+    parser.add_argument('--batch', action = 'store_true',
+                        help = '''Build separate data set for every trading pair and granularity. Candles are
+                        fetched concurrently under one rate budget, indicators are calculated in process pool
+                        and uploads are pipelined. Status of each data set is summarized at the end.''')
+    parser.add_argument('--max_workers', type = int, required = False,
+                        help = 'Number of processes that indicators are calculated with in batch mode.')
+    parser.add_argument('--append_to', type = str, required = False,
+                        help = '''Name of existing data set in S3 bucket, or local path to it, that should be
+                        extended up to end date. Only new candles are fetched and indicators are calculated
+                        only over them and warm-up rows taken from data set tail.''')
+    parser.add_argument('--append_output', type = str, default = 'version', choices = ['version', 'segment'],
+                        help = '''Whether to upload new version of whole data set, or only appended segment.''')
+    parser.add_argument('--compression', type = str, required = False, choices = ['gzip', 'bz2', 'xz'],
+                        help = '''Codec that data set is compressed with on the fly before upload. Codec
+                        extension is appended to file name. Compressed data sets are detected and
+                        decompressed automatically while loading and appending.''')
+    parser.add_argument('--data_set_format', type = str, default = 'csv', choices = ['csv', 'indexed'],
+                        help = '''Format of uploaded data set. Indexed data set is stored in compressed blocks
+                        of rows with index of their byte ranges, so training environment can fetch only
+                        rows it uses straight from S3 bucket with range requests.''')
 
     if sys.platform.startswith('win'):
         policy = asyncio.WindowsSelectorEventLoopPolicy()
@@ -96,7 +317,32 @@ if __name__ == "__main__":
     asyncio.set_event_loop_policy(policy)
 
     args = parser.parse_args()
-    success = asyncio.run(main(args.trading_pair, args.start_date, args.end_date, args.granularity, args.list_of_indicators))
+    trading_pairs = args.trading_pairs.split(',') if args.trading_pairs else [args.trading_pair]
+    granularities = args.granularities.split(',') if args.granularities else [args.granularity]
+    if any(str_to_granularity(granularity) is None for granularity in granularities):
+        parser.error('Granularities should be chosen from: 1m, 5m, 15m, 30m, 1h, 6h, 1d.')
+
+    if args.data_set_format == 'indexed' and (args.append_to or args.stream_directory_path or args.compression):
+        parser.error('Indexed data set format can not be combined with append, stream or compression modes.')
+
+    if args.append_to:
+        if len(trading_pairs) > 1 or len(granularities) > 1:
+            parser.error('Append mode supports single trading pair and granularity.')
+        success = asyncio.run(main_append(trading_pairs[0], args.start_date, args.end_date, granularities[0],
+                                          args.list_of_indicators, args.append_to, args.append_output,
+                                          args.candle_store_path, args.trading_pair_catalogue_path, args.backfill_gaps,
+                                          args.resample_from, args.compression))
+    elif args.batch or len(granularities) > 1:
+        success = asyncio.run(main_batch(trading_pairs, args.start_date, args.end_date, granularities,
+                                         args.list_of_indicators, args.candle_store_path,
+                                         args.trading_pair_catalogue_path, args.backfill_gaps, args.resample_from,
+                                         args.max_workers, compression = args.compression,
+                                         data_set_format = args.data_set_format))
+    else:
+        success = asyncio.run(main(trading_pairs, args.start_date, args.end_date, granularities[0],
+                                   args.list_of_indicators, args.candle_store_path, args.trading_pair_catalogue_path,
+                                   args.stream_directory_path, args.backfill_gaps, args.resample_from,
+                                   args.compression, args.data_set_format))
 
     if not success:
         logging.error('Script execution failed!')
@@ -0,0 +1,69 @@
+# scripts/run_sweep.py
+
+import logging
+import json
+import os
+import argparse
+import urllib.parse
+from typing import Optional
+
+from source.training import SweepRunner, SuccessiveHalvingScheduler
+from source.utils import ArtifactCache
+from source.aws import AWSHandler
+
+def main(config_path: str, results_path: str, max_workers: Optional[int] = None,
+         threads_per_worker: Optional[int] = None, cache_directory: Optional[str] = None) -> None:
+        artifact_cache = ArtifactCache(cache_directory if cache_directory is not None
+                                       else os.path.join(os.getcwd(), '.artifact_cache'),
+                                       aws_handler_factory = lambda: AWSHandler.get_handler(os.getenv('ROLE_NAME')))
+
+        if urllib.parse.urlparse(config_path).scheme != '':
+            config_path = artifact_cache.get_local_path(config_path, os.getenv('BUCKET_NAME'))
+        config = json.load(open(config_path, 'r'))
+
+        # Data set is fetched once, before any trial is started
+        data_set_name = config['data_set_name']
+        if urllib.parse.urlparse(data_set_name).scheme != '':
+            data_set_name = artifact_cache.get_local_path(data_set_name, os.getenv('BUCKET_NAME'))
+        config['training_config']['data_path'] = data_set_name
+
+        sweep_config = config['sweep']
+        sweep_runner = SweepRunner(config['training_config'], sweep_config['parameters'],
+                                   sweep_config.get('mode', SweepRunner.GRID_MODE),
+                                   sweep_config.get('number_of_trials', None), sweep_config.get('seed', 0),
+                                   max_workers, threads_per_worker)
+        successive_halving_config = sweep_config.get('successive_halving', None)
+        if successive_halving_config is not None:
+            # Trials are trained in rungs of episodes and only the best ones are trained further
+            scheduler = SuccessiveHalvingScheduler(sweep_runner.generate_trials(),
+                                                   os.path.join(os.getcwd(), 'sweep_weights'),
+                                                   max_workers = max_workers,
+                                                   threads_per_worker = threads_per_worker,
+                                                   **successive_halving_config)
+            results = scheduler.run()
+        else:
+            results = sweep_runner.run()
+        results.to_csv(results_path, index = False)
+        logging.info(f'Sweep results saved to {results_path}.')
+
+if __name__ == "__main__":
+    logging.basicConfig(level = logging.INFO, format = "{asctime} | {levelname} | {message}",
+                        style="{", datefmt="%Y-%m-%d %H:%M:%S")
+
+    parser = argparse.ArgumentParser(description = 'Runs hyperparameter sweep described by configuration file.')
+    parser.add_argument('--config_path', type = str, required = True,
+                        help = '''Path to configuration file in *json format. Besides training config, it
+                        should contain "sweep" section with "parameters" and optionally "mode",
+                        "number_of_trials", "seed" and "successive_halving" with parameters of
+                        SuccessiveHalvingScheduler, e.g. "metric" and "min_episodes".''')
+    parser.add_argument('--results_path', type = str, default = 'sweep_results.csv',
+                        help = 'Path to *csv file that results table is saved to.')
+    parser.add_argument('--max_workers', type = int, required = False,
+                        help = 'Number of trials trained at once. Defaults to number of CPUs.')
+    parser.add_argument('--threads_per_worker', type = int, required = False,
+                        help = 'Number of CPU threads used by single trial. Defaults to even share of CPUs.')
+    parser.add_argument('--cache_directory', type = str, required = False,
+                        help = 'Path to local artifact cache used for configuration file and data set.')
+
+    args = parser.parse_args()
+    main(args.config_path, args.results_path, args.max_workers, args.threads_per_worker, args.cache_directory)
@@ -0,0 +1,39 @@
+# scripts/run_worker_daemon.py
+
+import logging
+import argparse
+from typing import Optional
+
+from source.training import WorkerDaemon
+
+def main(queue_directory: str, max_workers: int = 1, data_paths: Optional[str] = None, test_ratio: float = 0.2,
+         threads_per_worker: Optional[int] = None, cache_directory: Optional[str] = None) -> None:
+        worker_daemon = WorkerDaemon(queue_directory, max_workers, data_paths.split(',') if data_paths else None,
+                                     test_ratio, threads_per_worker, cache_directory)
+        logging.info('Preloading modules and data sets...')
+        worker_daemon.preload()
+        worker_daemon.serve()
+
+if __name__ == "__main__":
+    logging.basicConfig(level = logging.INFO, format = "{asctime} | {levelname} | {message}",
+                        style="{", datefmt="%Y-%m-%d %H:%M:%S")
+
+    parser = argparse.ArgumentParser(description = '''Runs long-lived worker daemon that keeps TensorFlow and
+                                     data sets loaded, and runs training jobs submitted with submit_job.py.''')
+    parser.add_argument('--queue_directory', type = str, required = True,
+                        help = 'Path to queue directory that jobs are submitted to.')
+    parser.add_argument('--max_workers', type = int, default = 1, help = 'Number of jobs run at once.')
+    parser.add_argument('--data_paths', type = str, required = False,
+                        help = '''Paths or S3 / public URLs of data sets that should be preloaded, that looks
+                        like: path_1,path_2,...,path_N.''')
+    parser.add_argument('--test_ratio', type = float, default = 0.2,
+                        help = 'Test ratio that data sets are preloaded with.')
+    parser.add_argument('--threads_per_worker', type = int, required = False,
+                        help = 'Number of CPU threads used by single job. Defaults to even share of CPUs.')
+    parser.add_argument('--cache_directory', type = str, required = False,
+                        help = '''Path to local artifact cache that data sets and weights given as S3 or public
+                        URLs are fetched into. Defaults to directory inside queue directory.''')
+
+    args = parser.parse_args()
+    main(args.queue_directory, args.max_workers, args.data_paths, args.test_ratio, args.threads_per_worker,
+         args.cache_directory)
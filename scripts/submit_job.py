@@ -0,0 +1,50 @@
+# scripts/submit_job.py
+
+import logging
+import json
+import sys
+import argparse
+from typing import Optional
+
+from source.training import WorkerClient
+
+def main(queue_directory: str, config_path: str, follow: bool = True, timeout: Optional[float] = None) -> None:
+        worker_client = WorkerClient(queue_directory)
+        job = json.load(open(config_path, 'r'))
+        job_id = worker_client.submit(job)
+        logging.info(f'Submitted job {job_id}.')
+
+        if follow:
+            try:
+                for line in worker_client.stream_logs(job_id, timeout = timeout):
+                    print(line, flush = True)
+            except TimeoutError as e:
+                logging.error(e)
+                sys.exit(1)
+
+            status = worker_client.get_status(job_id)
+            logging.info(f"Job {job_id} {status['status']} in {status['duration']:.1f}s.")
+            if status['status'] != 'finished':
+                logging.error(status['error'])
+                sys.exit(1)
+            logging.info(f"Test metrics: {status['metrics']}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level = logging.INFO, format = "{asctime} | {levelname} | {message}",
+                        style="{", datefmt="%Y-%m-%d %H:%M:%S")
+
+    parser = argparse.ArgumentParser(description = 'Submits training job to worker daemon and streams its logs.')
+    parser.add_argument('--queue_directory', type = str, required = True,
+                        help = 'Path to queue directory watched by worker daemon.')
+    parser.add_argument('--config_path', type = str, required = True,
+                        help = '''Path to local configuration file in *json format, as used by train_model.py.
+                        Data set and weights are expected under local paths.''')
+    parser.add_argument('--detach', action = 'store_true', default = False,
+                        help = 'Indicates if script should exit right after submitting job.')
+    parser.add_argument('--timeout', type = float, required = False,
+                        help = '''Maximal number of seconds to follow job for. Script exits with error if job
+                        does not finish within it, while job itself keeps running. Follows job until it
+                        finishes if not given.''')
+
+    args = parser.parse_args()
+    main(args.queue_directory, args.config_path, not args.detach, args.timeout)
@@ -5,55 +5,38 @@ import json
 import os
 import argparse
 import urllib.parse
-from typing import Any, Type
+import urllib.request
+from typing import Optional
 from datetime import datetime
 
-from source.training import TrainingHandler, TrainingConfig
+from source.training import TrainingHandler, TrainingConfigFactory
 from source.paperspace import GradientHandler
-from source.utils import CallbackFromStringConverter, ValidatorFromStringConverter, \
-    ModelBluePrintFromStringConverter, OptimizerFromStringConverter, PolicyFromStringConverter, \
-    LearningStrategyHandlerFromStringConverter, TestingStrategyHandlerFromStringConverter, \
-    LabelAnnotatorFromStringConverter
+from source.utils import CallbackFromStringConverter, CompressionHandler, ArtifactCache, INDEXED_DATA_SET_EXTENSION, \
+    MetricsExporter, MetricsCallback
 from source.aws import AWSHandler
 
-CONVERTER_TYPE_MAP: dict[str, Type[Any]] = {
-    'model_blue_print': ModelBluePrintFromStringConverter,
-    'validator': ValidatorFromStringConverter,
-    'optimizer': OptimizerFromStringConverter,
-    'policy': PolicyFromStringConverter,
-    'learning_strategy_handler': LearningStrategyHandlerFromStringConverter,
-    'testing_strategy_handler': TestingStrategyHandlerFromStringConverter,
-    'label_annotator': LabelAnnotatorFromStringConverter
-}
-
-def __attempt_from_string_conversion(value: Any, key: str) -> Any:
-    if isinstance(value, dict):
-        converter_type = CONVERTER_TYPE_MAP[key]
-        name = value.get('name', None)
-        params = value.get('parameters', None)
-        for param_key, param_value in params.items():
-            params[param_key] = __attempt_from_string_conversion(param_value, param_key)
-        converter_instance = converter_type(**params)
-        return converter_instance.convert_from_string(name)
-    else:
-        return value
-
-def __get_local_path(file_path: str) -> str:
+def __get_local_path(file_path: str, artifact_cache: Optional[ArtifactCache] = None) -> str:
         try:
             url_parsed = urllib.parse.urlparse(file_path)
-            if url_parsed.netloc != '' and url_parsed.scheme != '':
+            if url_parsed.netloc != '' and url_parsed.scheme != '' and artifact_cache is not None:
+                local_path = artifact_cache.get_local_path(file_path, os.getenv('BUCKET_NAME'))
+            elif url_parsed.netloc != '' and url_parsed.scheme != '':
                 if url_parsed.scheme == 's3':
                     logging.info('Loading file from S3 bucket...')
-                    aws_handler = AWSHandler(os.getenv('ROLE_NAME'))
+                    aws_handler = AWSHandler.get_handler(os.getenv('ROLE_NAME'))
                     file_name = '/'.join(file_path.split('/')[3:])
-                    aws_handler.download_file_from_s3(os.getenv('BUCKET_NAME'), file_name)
+                    source = aws_handler.open_s3_object_stream(os.getenv('BUCKET_NAME'), file_name)
                 else:
                     logging.info('Loading file from public URL...')
-                    response = urllib.request.urlopen(file_path)
-                    response.raise_for_status()
-                    local_file = open(file_path.split('/')[-1], 'wb')
-                    local_file.write(response.read())
-                local_path = os.getcwd() + '/' + file_path.split('/')[-1]
+                    source = urllib.request.urlopen(file_path)
+
+                # Compressed files are decompressed while being streamed to disk
+                compression_handler = CompressionHandler()
+                local_path = os.getcwd() + '/' + compression_handler.strip_extension(file_path.split('/')[-1])
+                with source:
+                    compression = compression_handler.decompress_to_file(source, local_path)
+                if compression is not None:
+                    logging.info(f'Decompressed {compression} file into {local_path}.')
             else:
                 logging.info('Loading file from local path...')
                 local_path = file_path
@@ -64,35 +47,66 @@ def __get_local_path(file_path: str) -> str:
 
         return local_path
 
-def main(config_path: str, invoked_inside_gradient: bool = False) -> None:
+def main(config_path: str, invoked_inside_gradient: bool = False, cache_directory: Optional[str] = None,
+         cache_size: int = ArtifactCache.DEFAULT_MAX_SIZE, lazy_data_set: bool = False,
+         save_weights: bool = False, metrics_port: Optional[int] = None) -> None:
     # try:
-        config_local_path = __get_local_path(config_path)
+        if metrics_port is not None:
+            MetricsExporter.enable(metrics_port)
+            logging.info(f'Serving metrics at http://{MetricsExporter.DEFAULT_ADDRESS}:{metrics_port}/metrics.')
+
+        artifact_cache = None
+        if cache_directory is not None:
+            artifact_cache = ArtifactCache(cache_directory, cache_size,
+                                           lambda: AWSHandler.get_handler(os.getenv('ROLE_NAME')))
+
+        config_local_path = __get_local_path(config_path, artifact_cache)
         config = json.load(open(config_local_path, 'r'))
-        for key, value in config['training_config'].items():
-            config['training_config'][key] = __attempt_from_string_conversion(value, key)
 
         data_set_name = config['data_set_name']
-        config['training_config']['data_path'] = __get_local_path(data_set_name)
+        if lazy_data_set and data_set_name.startswith('s3://') and data_set_name.endswith(INDEXED_DATA_SET_EXTENSION):
+            # Rows of indexed data set are fetched by environment itself, only when they are used
+            config['training_config']['data_path'] = data_set_name
+        else:
+            config['training_config']['data_path'] = __get_local_path(data_set_name, artifact_cache)
 
         callbacks = []
         callback_dict = config.get('callbacks', None)
         if callback_dict is not None:
             for key, value in callback_dict.items():
                 callbacks.append(CallbackFromStringConverter(**value).convert_from_string(key))
+        if metrics_port is not None and not any(isinstance(callback, MetricsCallback) for callback in callbacks):
+            callbacks.append(MetricsCallback())
 
         weights_load_path = None
         weights_file_name = config.get('weights_file_name', None)
         if weights_file_name is not None:
-            weights_load_path = __get_local_path(weights_file_name)
+            weights_load_path = __get_local_path(weights_file_name, artifact_cache)
+
+        weights_save_path = None
+        weights_save_name = f"Weights from {datetime.now().__format__('%Y-%m-%d_%H_%M_%S')}.h5"
+        if save_weights:
+            weights_save_path = os.path.join(os.getcwd(), weights_save_name)
 
-        training_handler = TrainingHandler(TrainingConfig(**config['training_config']))
-        training_handler.run_training(callbacks = callbacks, weights_load_path = weights_load_path)
+        training_handler = TrainingHandler(TrainingConfigFactory().create(config['training_config']))
+        training_handler.run_training(callbacks = callbacks, weights_load_path = weights_load_path,
+                                      weights_save_path = weights_save_path)
+
+        # Artifacts are uploaded in background, while report is still being generated
+        aws_handler = AWSHandler.get_handler(os.getenv('ROLE_NAME'))
+        if weights_save_path is not None:
+            aws_handler.enqueue_file_upload(os.getenv('BUCKET_NAME'), weights_save_path, weights_save_name)
 
         report_name = f"Report from {datetime.now().__format__('%Y-%m-%d_%H_%M_%S')}.pdf"
         report_path = os.getcwd() + '\\' + report_name
         training_handler.generate_report(report_path)
-        aws_handler = AWSHandler(os.getenv('ROLE_NAME'))
-        aws_handler.upload_file_to_s3(os.getenv('BUCKET_NAME'), report_path, report_name)
+        aws_handler.enqueue_file_upload(os.getenv('BUCKET_NAME'), report_path, report_name)
+
+        profile_name = f"Profile from {datetime.now().__format__('%Y-%m-%d_%H_%M_%S')}.json"
+        profile_path = os.path.join(os.getcwd(), profile_name)
+        training_handler.save_profile(profile_path)
+        aws_handler.enqueue_file_upload(os.getenv('BUCKET_NAME'), profile_path, profile_name)
+        aws_handler.flush()
 
     # except Exception as e:
     #     logging.error('Encounter problem during script execution!')
@@ -115,6 +129,21 @@ if __name__ == "__main__":
                         help = 'Path to configuration file in *json format.')
     parser.add_argument('--gradient', action = 'store_true', default = False,
                         help = 'Indicates if it was run on a gradient notebook that should be closed at the end.')
+    parser.add_argument('--cache_directory', type = str, required = False,
+                        help = '''Path to local artifact cache. If given, configuration file, data set and
+                        weights fetched from S3 bucket or URL are cached there and downloaded again
+                        only if they changed since.''')
+    parser.add_argument('--cache_size', type = float, default = 10,
+                        help = 'Size of local artifact cache in GB. Least recently used artifacts are evicted.')
+    parser.add_argument('--lazy_data_set', action = 'store_true', default = False,
+                        help = '''Indicates if indexed data set stored in S3 bucket should not be downloaded,
+                        but its rows should be fetched with range requests only when they are used.''')
+    parser.add_argument('--save_weights', action = 'store_true', default = False,
+                        help = 'Indicates if trained weights should be saved and uploaded to S3 bucket.')
+    parser.add_argument('--metrics_port', type = int, required = False,
+                        help = '''Port of local HTTP endpoint serving Prometheus metrics of training, e.g.
+                        environment step latency and epoch times. Metrics are not collected if not given.''')
 
     args = parser.parse_args()
-    main(args.config_path, args.gradient)
\ No newline at end of file
+    main(args.config_path, args.gradient, args.cache_directory, int(args.cache_size * 1024 ** 3), args.lazy_data_set,
+         args.save_weights, args.metrics_port)
\ No newline at end of file
@@ -1,15 +1,26 @@
 # agent/__init__.py
 
-#from .agent_handler import AgentHandler
-from .strategies.performance_testable import PerformanceTestable
-from .strategies.classification_testable import ClassificationTestable
-from .agents.agent_base import AgentBase
-from .strategies.learning_strategy_handler_base import LearningStrategyHandlerBase
-from .strategies.testing_strategy_handler_base import TestingStrategyHandlerBase
-from .agent_handler import AgentHandler
-from .agents.reinforcement_learning_agent import ReinforcementLearningAgent
-from .agents.classification_learning_agent import ClassificationLearningAgent
-from .strategies.reinforcement_learning_strategy_handler import ReinforcementLearningStrategyHandler
-from .strategies.classification_learning_strategy_handler import ClassificationLearningStrategyHandler
-from .strategies.performance_testing_strategy_handler import PerformanceTestingStrategyHandler
-from .strategies.classification_testing_strategy_handler import ClassificationTestingStrategyHandler
\ No newline at end of file
+from source.utils import LazyLoader
+
+"""
+Names exported by package, mapped onto modules they are defined in. Modules are
+imported only on first access, as all of them load TensorFlow or keras-rl.
+"""
+__exports = {
+    'PerformanceTestable': '.strategies.performance_testable',
+    'ClassificationTestable': '.strategies.classification_testable',
+    'AgentBase': '.agents.agent_base',
+    'LearningStrategyHandlerBase': '.strategies.learning_strategy_handler_base',
+    'TestingStrategyHandlerBase': '.strategies.testing_strategy_handler_base',
+    'AgentHandler': '.agent_handler',
+    'ReinforcementLearningAgent': '.agents.reinforcement_learning_agent',
+    'ClassificationLearningAgent': '.agents.classification_learning_agent',
+    'ReinforcementLearningStrategyHandler': '.strategies.reinforcement_learning_strategy_handler',
+    'ClassificationLearningStrategyHandler': '.strategies.classification_learning_strategy_handler',
+    'PerformanceTestingStrategyHandler': '.strategies.performance_testing_strategy_handler',
+    'ClassificationTestingStrategyHandler': '.strategies.classification_testing_strategy_handler'
+}
+__all__ = list(__exports)
+__lazy_loader = LazyLoader(__name__, __exports)
+__getattr__ = __lazy_loader.load
+__dir__ = __lazy_loader.list_names
@@ -13,6 +13,7 @@ from typing import Any, Callable, Optional
 from source.agent import AgentBase, LearningStrategyHandlerBase, TestingStrategyHandlerBase
 from source.environment import TradingEnvironment
 from source.model import BluePrintBase
+from source.utils import PhaseProfiler
 
 class AgentHandler():
     """"""
@@ -29,6 +30,7 @@ class AgentHandler():
         self.__trading_environment: TradingEnvironment = trading_environment
         self.__agent: AgentBase = learning_strategy_handler.create_agent(model_blue_print, trading_environment)
 
+    @PhaseProfiler.measure('train_agent')
     def train_agent(self, nr_of_steps: int, nr_of_episodes: int, callbacks: Optional[list[Callback]] = None,
                     model_load_path: Optional[str] = None,
                     model_save_path: Optional[str] = None) -> tuple[list[str], list[dict]]:
@@ -44,7 +46,8 @@ class AgentHandler():
 
         # captured_output = io.StringIO()
         # with redirect_stdout(captured_output): #TODO: Create an callback logger
-        key, report_data = self.__learning_strategy_handler.fit(self.__agent, self.__trading_environment,
+        with PhaseProfiler.measure('fit'):
+            key, report_data = self.__learning_strategy_handler.fit(self.__agent, self.__trading_environment,
                                                                     nr_of_steps, nr_of_episodes, callbacks)
 
             # for line in captured_output.getvalue().split('\n'):
@@ -66,6 +69,7 @@ class AgentHandler():
 
         return key, report_data
 
+    @PhaseProfiler.measure('test_agent')
     def test_agent(self, repeat: int = 1) -> tuple[dict[int, list[str]], dict[int, list[dict[str, Any]]]]:
         """"""
 
@@ -90,8 +94,9 @@ class AgentHandler():
             window_size = self.__trading_environment.get_trading_consts().WINDOW_SIZE
             current_iteration = random.randint(window_size, int(env_length/2))
             self.__trading_environment.reset(current_iteration)
-            key[i], report_data[i] = self.__testing_strategy_handler.evaluate(self.__agent,
-                                                                              self.__trading_environment)
+            with PhaseProfiler.measure('evaluate'):
+                key[i], report_data[i] = self.__testing_strategy_handler.evaluate(self.__agent,
+                                                                                  self.__trading_environment)
 
         return key, report_data
 
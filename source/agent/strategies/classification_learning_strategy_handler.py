@@ -16,6 +16,7 @@ from source.environment import TradingEnvironment
 from source.model import BluePrintBase
 from source.model import TFModelAdapter
 from source.model import SciKitLearnModelAdapter
+from source.utils import PhaseProfiler
 
 class ClassificationLearningStrategyHandler(LearningStrategyHandlerBase):
     """"""
@@ -89,7 +90,10 @@ class ClassificationLearningStrategyHandler(LearningStrategyHandlerBase):
         currency_prices = environment.get_data_for_iteration(['close'], 0, env_length - 1)
         currency_prices = (np.array(currency_prices) / currency_prices[0]).tolist()
 
+        history = agent.classification_fit(input_data, output_data, **tensorflow_arguments)
+        PhaseProfiler.count(PhaseProfiler.SAMPLES, len(input_data) * tensorflow_arguments.get('epochs', 1))
+
         return [ClassificationLearningStrategyHandler.PLOTTING_KEY], \
-            [{"history": agent.classification_fit(input_data, output_data, **tensorflow_arguments),
+            [{"history": history,
               "currency_prices": currency_prices,
               "learning_curve_data": learning_curve_data}]
@@ -12,6 +12,7 @@ from source.agent import AgentBase
 from source.agent import ReinforcementLearningAgent
 from source.environment import TradingEnvironment
 from source.model import BluePrintBase
+from source.utils import PhaseProfiler
 
 class ReinforcementLearningStrategyHandler(LearningStrategyHandlerBase):
     """"""
@@ -43,6 +44,7 @@ class ReinforcementLearningStrategyHandler(LearningStrategyHandlerBase):
             raise TypeError("Agent must be an instance of ReinforcementLearningAgent.")
 
         steps_per_episode = nr_of_steps // nr_of_episodes
-        return [ReinforcementLearningStrategyHandler.PLOTTING_KEY], \
-            [agent.reinforcement_learning_fit(trading_environment,
-                                             nr_of_steps, steps_per_episode, callbacks)]
\ No newline at end of file
+        history = agent.reinforcement_learning_fit(trading_environment, nr_of_steps, steps_per_episode, callbacks)
+        PhaseProfiler.count(PhaseProfiler.SAMPLES, nr_of_steps)
+
+        return [ReinforcementLearningStrategyHandler.PLOTTING_KEY], [history]
\ No newline at end of file
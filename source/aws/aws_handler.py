@@ -2,13 +2,49 @@
 
 import os
 import boto3
+import botocore.session
 import io
+import itertools
+import logging
+import threading
+import time
+from botocore.config import Config
+from botocore.credentials import RefreshableCredentials
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Union
+
+"""
+Default size of parts that streamed uploads are split into. S3 requires each part
+except the last one to have at least 5 MiB.
+"""
+PART_SIZE = 8 * 1024 * 1024
+MAX_UPLOAD_WORKERS = 4
+
+"""
+Number of connections kept open by S3 client. It should cover all threads transferring
+data at once, e.g. parts of concurrent multipart uploads.
+"""
+MAX_POOL_CONNECTIONS = 32
+
+"""
+Settings of background uploads. Failed upload is retried with exponentially growing
+delay, starting from base delay in seconds.
+"""
+MAX_BACKGROUND_UPLOAD_WORKERS = 2
+BACKGROUND_UPLOAD_RETRIES = 3
+BACKGROUND_UPLOAD_RETRY_DELAY = 1.0
 
 class AWSHandler:
     """
-    Responsible for handling communication with Amazon AWS services.
+    Responsible for handling communication with Amazon AWS services. Assumed role
+    credentials are refreshed automatically shortly before they expire, so single
+    handler, and single S3 client, can be reused for the whole process.
     """
 
+    # Handlers shared by all callers within process, keyed by role name and region
+    __handlers: dict[tuple[str, str], 'AWSHandler'] = {}
+    __handlers_lock: threading.Lock = threading.Lock()
+
     def __init__(self, role_name: str, region_name: str = "eu-central-1") -> None:
         """
         Class constructor. Before calling it AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY
@@ -30,15 +66,73 @@ class AWSHandler:
 
         session = boto3.Session(aws_access_key_id = AWS_ACCESS_KEY_ID,
                                 aws_secret_access_key = AWS_SECRET_ACCESS_KEY)
-        role_arn = f'arn:aws:iam::{ACCOUNT_ID}:role/{role_name}'
+        self.__sts_client = session.client('sts')
+        self.__role_arn: str = f'arn:aws:iam::{ACCOUNT_ID}:role/{role_name}'
+
+        # Credentials are assumed again by botocore itself once they are about to expire
+        credentials = RefreshableCredentials.create_from_metadata(metadata = self.__assume_role(),
+                                                                  refresh_using = self.__assume_role,
+                                                                  method = 'sts-assume-role')
+        botocore_session = botocore.session.get_session()
+        botocore_session._credentials = credentials
+        self.aws_s3_resource = boto3.Session(botocore_session = botocore_session).client(
+            's3', region_name = region_name, config = Config(max_pool_connections = MAX_POOL_CONNECTIONS,
+                                                             retries = {'mode': 'standard'}))
+
+        self.__upload_executor: Optional[ThreadPoolExecutor] = None
+        self.__pending_uploads: list[Future] = []
+        self.__pending_uploads_lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def get_handler(cls, role_name: str, region_name: str = "eu-central-1") -> 'AWSHandler':
+        """
+        Returns handler shared within process, creating it on first call. Reusing it
+        skips assuming role and setting up new connections for every transfer.
+
+        Parameters:
+            role_name (str): Assumed role name.
+            region_name (str): Region name to connect to.
+
+        Raises:
+            RuntimeError: If AWS credentials or account ID are not defined.
+
+        Returns:
+            (AWSHandler): Shared handler.
+        """
+
+        with cls.__handlers_lock:
+            key = (role_name, region_name)
+            if key not in cls.__handlers:
+                cls.__handlers[key] = cls(role_name, region_name)
+
+            return cls.__handlers[key]
+
+    @classmethod
+    def clear_handlers(cls) -> None:
+        """
+        Clears handlers shared within process, forcing them to be created again.
+        """
+
+        with cls.__handlers_lock:
+            cls.__handlers.clear()
+
+    def __assume_role(self) -> dict[str, str]:
+        """
+        Assumes role and returns its temporary credentials.
 
-        assumed_role = session.client('sts').assume_role(RoleArn = role_arn,
-                                                         RoleSessionName = 'S3_bucket_user_session')
-        credentials = assumed_role['Credentials']
-        self.aws_s3_resource = boto3.client('s3', aws_access_key_id = credentials['AccessKeyId'],
-                                            aws_secret_access_key = credentials['SecretAccessKey'],
-                                            aws_session_token = credentials['SessionToken'],
-                                            region_name = region_name)
+        Returns:
+            (dict[str, str]): Credentials in format expected by botocore refreshable credentials.
+        """
+
+        credentials = self.__sts_client.assume_role(RoleArn = self.__role_arn,
+                                                    RoleSessionName = 'S3_bucket_user_session')['Credentials']
+
+        return {
+            'access_key': credentials['AccessKeyId'],
+            'secret_key': credentials['SecretAccessKey'],
+            'token': credentials['SessionToken'],
+            'expiry_time': credentials['Expiration'].isoformat()
+        }
 
     def upload_file_to_s3(self, bucket_name: str, file_path: str, desired_name: str = "") -> None:
         """
@@ -81,6 +175,86 @@ class AWSHandler:
         except Exception as e:
             raise RuntimeError(f"Did not managed to upload file! Original error: {e}")
 
+    def __generate_parts(self, chunks: Iterable[Union[str, bytes]], part_size: int) -> Iterator[bytes]:
+        """
+        Regroups chunks of arbitrary size into parts of fixed size. Only the last
+        part can be smaller.
+
+        Parameters:
+            chunks (Iterable[Union[str, bytes]]): Chunks of data, strings are encoded as UTF-8.
+            part_size (int): Number of bytes in each part.
+
+        Returns:
+            (Iterator[bytes]): Parts of data.
+        """
+
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer += chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+            while len(buffer) >= part_size:
+                yield bytes(buffer[:part_size])
+                del buffer[:part_size]
+
+        if buffer:
+            yield bytes(buffer)
+
+    def upload_stream_to_s3(self, bucket_name: str, chunks: Iterable[Union[str, bytes]], desired_name: str,
+                            part_size: int = PART_SIZE, max_workers: int = MAX_UPLOAD_WORKERS) -> None:
+        """
+        Attempts to upload data produced chunk by chunk to S3 Amazon bucket. Data is split
+        into fixed-size parts uploaded in parallel as multipart upload. Only limited number
+        of parts is kept in memory at once, so memory usage does not depend on data size.
+        Data fitting into single part is uploaded directly.
+
+        Parameters:
+            bucket_name (str): String denoting bucket name.
+            chunks (Iterable[Union[str, bytes]]): Chunks of data, e.g. produced by generator.
+            desired_name (str): Desired name to be given to the file after being uploaded.
+            part_size (int): Number of bytes in each uploaded part.
+            max_workers (int): Maximal number of parts uploaded at the same time.
+
+        Raises:
+            RuntimeError: If approached problem during file uploading.
+        """
+
+        parts = self.__generate_parts(chunks, part_size)
+        first_part = next(parts, b'')
+        second_part = next(parts, None)
+        if second_part is None:
+            try:
+                self.aws_s3_resource.put_object(Bucket = bucket_name, Key = desired_name, Body = first_part)
+                return
+            except Exception as e:
+                raise RuntimeError(f"Did not managed to upload file! Original error: {e}")
+
+        upload_id = None
+        try:
+            upload_id = self.aws_s3_resource.create_multipart_upload(Bucket = bucket_name, Key = desired_name)['UploadId']
+            upload_part = lambda part_number, part: {
+                'PartNumber': part_number,
+                'ETag': self.aws_s3_resource.upload_part(Bucket = bucket_name, Key = desired_name, UploadId = upload_id,
+                                                         PartNumber = part_number, Body = part)['ETag']
+            }
+
+            uploaded_parts = []
+            with ThreadPoolExecutor(max_workers = max_workers) as executor:
+                pending_uploads = set()
+                for part_number, part in enumerate(itertools.chain([first_part, second_part], parts), start = 1):
+                    if len(pending_uploads) >= max_workers:
+                        done_uploads, pending_uploads = wait(pending_uploads, return_when = FIRST_COMPLETED)
+                        uploaded_parts.extend(upload.result() for upload in done_uploads)
+                    pending_uploads.add(executor.submit(upload_part, part_number, part))
+
+                uploaded_parts.extend(upload.result() for upload in pending_uploads)
+
+            self.aws_s3_resource.complete_multipart_upload(
+                Bucket = bucket_name, Key = desired_name, UploadId = upload_id,
+                MultipartUpload = {'Parts': sorted(uploaded_parts, key = lambda part: part['PartNumber'])})
+        except Exception as e:
+            if upload_id is not None:
+                self.aws_s3_resource.abort_multipart_upload(Bucket = bucket_name, Key = desired_name, UploadId = upload_id)
+            raise RuntimeError(f"Did not managed to upload file! Original error: {e}")
+
     def download_file_from_s3(self, bucket_name: str, file_name: str, desired_path: str = "") -> None:
         """
         Downloads a file from an S3 bucket to a local path.
@@ -102,3 +276,214 @@ class AWSHandler:
             self.aws_s3_resource.download_file(bucket_name, file_name, desired_path)
         except Exception as e:
             raise RuntimeError(f"Did not managed to download file! Original error: {e}")
+
+    def open_s3_object_stream(self, bucket_name: str, file_name: str) -> BinaryIO:
+        """
+        Opens file from an S3 bucket for reading, so it can be consumed block by block
+        without being downloaded in whole first.
+
+        Parameters:
+            bucket_name (str): The name of the S3 bucket.
+            file_name (str): The key/path of the file in the S3 bucket.
+
+        Raises:
+            RuntimeError: If the file can not be opened.
+
+        Returns:
+            (BinaryIO): Readable stream of file content.
+        """
+
+        try:
+            return self.aws_s3_resource.get_object(Bucket = bucket_name, Key = file_name)['Body']
+        except Exception as e:
+            raise RuntimeError(f"Did not managed to open file! Original error: {e}")
+
+    def get_s3_object_etag(self, bucket_name: str, file_name: str) -> str:
+        """
+        Fetches entity tag of file stored in an S3 bucket without downloading it.
+        Entity tag changes whenever file content changes.
+
+        Parameters:
+            bucket_name (str): The name of the S3 bucket.
+            file_name (str): The key/path of the file in the S3 bucket.
+
+        Raises:
+            RuntimeError: If the file metadata can not be fetched.
+
+        Returns:
+            (str): Entity tag of the file.
+        """
+
+        try:
+            return self.aws_s3_resource.head_object(Bucket = bucket_name, Key = file_name)['ETag']
+        except Exception as e:
+            raise RuntimeError(f"Did not managed to fetch file metadata! Original error: {e}")
+
+    def get_s3_object_size(self, bucket_name: str, file_name: str) -> int:
+        """
+        Fetches size of file stored in an S3 bucket without downloading it.
+
+        Parameters:
+            bucket_name (str): The name of the S3 bucket.
+            file_name (str): The key/path of the file in the S3 bucket.
+
+        Raises:
+            RuntimeError: If the file metadata can not be fetched.
+
+        Returns:
+            (int): Size of the file in bytes.
+        """
+
+        try:
+            return self.aws_s3_resource.head_object(Bucket = bucket_name, Key = file_name)['ContentLength']
+        except Exception as e:
+            raise RuntimeError(f"Did not managed to fetch file metadata! Original error: {e}")
+
+    def read_s3_object_range(self, bucket_name: str, file_name: str, start: int, stop: int) -> bytes:
+        """
+        Reads range of bytes of file stored in an S3 bucket with single range request.
+
+        Parameters:
+            bucket_name (str): The name of the S3 bucket.
+            file_name (str): The key/path of the file in the S3 bucket.
+            start (int): Offset of the first byte.
+            stop (int): Offset of byte after the last one.
+
+        Raises:
+            RuntimeError: If the range can not be read.
+
+        Returns:
+            (bytes): Read bytes.
+        """
+
+        if stop <= start:
+            return b''
+
+        try:
+            response = self.aws_s3_resource.get_object(Bucket = bucket_name, Key = file_name,
+                                                       Range = f'bytes={start}-{stop - 1}')
+            return response['Body'].read()
+        except Exception as e:
+            raise RuntimeError(f"Did not managed to read file range! Original error: {e}")
+
+    def __upload_with_retries(self, upload_function: Callable[[], None], desired_name: str, retries: int,
+                              retry_delay: float) -> None:
+        """
+        Performs upload, retrying it if it fails.
+
+        Parameters:
+            upload_function (Callable[[], None]): Function performing upload.
+            desired_name (str): Name of uploaded file, used for logging.
+            retries (int): Number of retries after the first attempt.
+            retry_delay (float): Delay before the first retry in seconds, doubled with every retry.
+
+        Raises:
+            RuntimeError: If all attempts failed.
+        """
+
+        for attempt in range(retries + 1):
+            try:
+                upload_function()
+                logging.info(f'Uploaded {desired_name} in background.')
+                return
+            except Exception as e:
+                if attempt == retries:
+                    raise RuntimeError(f"Did not managed to upload {desired_name} in background! Original error: {e}")
+                logging.warning(f'Background upload of {desired_name} failed, retrying. Original error: {e}')
+                time.sleep(retry_delay * 2 ** attempt)
+
+    def __enqueue_upload(self, upload_function: Callable[[], None], desired_name: str, retries: int,
+                         retry_delay: float) -> Future:
+        """
+        Submits upload to background worker pool, creating the pool on first use.
+
+        Parameters:
+            upload_function (Callable[[], None]): Function performing upload.
+            desired_name (str): Name of uploaded file, used for logging.
+            retries (int): Number of retries after the first attempt.
+            retry_delay (float): Delay before the first retry in seconds.
+
+        Returns:
+            (Future): Future completed once upload finishes.
+        """
+
+        with self.__pending_uploads_lock:
+            if self.__upload_executor is None:
+                self.__upload_executor = ThreadPoolExecutor(MAX_BACKGROUND_UPLOAD_WORKERS,
+                                                            thread_name_prefix = 'background_upload')
+            future = self.__upload_executor.submit(self.__upload_with_retries, upload_function, desired_name,
+                                                   retries, retry_delay)
+            self.__pending_uploads.append(future)
+
+        return future
+
+    def enqueue_file_upload(self, bucket_name: str, file_path: str, desired_name: str = "",
+                            retries: int = BACKGROUND_UPLOAD_RETRIES,
+                            retry_delay: float = BACKGROUND_UPLOAD_RETRY_DELAY) -> Future:
+        """
+        Uploads local file to S3 Amazon bucket in background, so caller can continue its
+        work meanwhile. File should not be modified until upload finishes.
+
+        Parameters:
+            bucket_name (str): String denoting bucket name.
+            file_path (str): String representing file to the path that should be uploaded.
+            desired_name (str): Desired name to be given to the file after being uploaded.
+            retries (int): Number of retries after the first failed attempt.
+            retry_delay (float): Delay before the first retry in seconds, doubled with every retry.
+
+        Returns:
+            (Future): Future completed once upload finishes.
+        """
+
+        desired_name = desired_name if desired_name else os.path.basename(file_path)
+        return self.__enqueue_upload(lambda: self.upload_file_to_s3(bucket_name, file_path, desired_name),
+                                     desired_name, retries, retry_delay)
+
+    def enqueue_buffer_upload(self, bucket_name: str, buffer: Union[io.StringIO, io.BytesIO], desired_name: str,
+                              retries: int = BACKGROUND_UPLOAD_RETRIES,
+                              retry_delay: float = BACKGROUND_UPLOAD_RETRY_DELAY) -> Future:
+        """
+        Uploads content of buffer to S3 Amazon bucket in background. Content is copied
+        when upload is enqueued, so buffer can be reused right away.
+
+        Parameters:
+            bucket_name (str): String denoting bucket name.
+            buffer (Union[io.StringIO, io.BytesIO]): Buffer with content that should be uploaded.
+            desired_name (str): Desired name to be given to the file after being uploaded.
+            retries (int): Number of retries after the first failed attempt.
+            retry_delay (float): Delay before the first retry in seconds, doubled with every retry.
+
+        Returns:
+            (Future): Future completed once upload finishes.
+        """
+
+        content = buffer.getvalue()
+        snapshot = io.BytesIO(content.encode('utf-8') if isinstance(content, str) else content)
+
+        return self.__enqueue_upload(lambda: self.upload_buffer_to_s3(bucket_name, snapshot, desired_name),
+                                     desired_name, retries, retry_delay)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Waits until all uploads enqueued so far finish.
+
+        Parameters:
+            timeout (Optional[float]): Maximal number of seconds to wait. Waits without limit if None.
+
+        Raises:
+            TimeoutError: If uploads did not finish within timeout.
+            RuntimeError: If any of uploads failed despite retries.
+        """
+
+        with self.__pending_uploads_lock:
+            pending_uploads, self.__pending_uploads = self.__pending_uploads, []
+
+        done, not_done = wait(pending_uploads, timeout = timeout)
+        if not_done:
+            with self.__pending_uploads_lock:
+                self.__pending_uploads.extend(not_done)
+            raise TimeoutError(f'{len(not_done)} background uploads did not finish in time!')
+
+        errors = [str(future.exception()) for future in done if future.exception() is not None]
+        if errors:
+            raise RuntimeError(f'{len(errors)} background uploads failed! Errors: {"; ".join(errors)}')
@@ -1,4 +1,5 @@
 # coinbase/__init__.py
 
 from .coinbase_handler import CoinBaseHandler
-from .yahoo_finance_handler import YahooFinanceHandler
\ No newline at end of file
+from .yahoo_finance_handler import YahooFinanceHandler
+from .rate_limiter import TokenBucketRateLimiter
\ No newline at end of file
@@ -2,20 +2,164 @@
  
 import aiohttp
 import asyncio
+import collections
+import contextlib
 from datetime import datetime
 import pytz
 import math
+import random
+import time
+import numpy as np
 import pandas as pd
-from ..utils import Granularity
+from ..utils import Granularity, MetricsExporter
+from typing import AsyncIterator, Optional
+from .rate_limiter import TokenBucketRateLimiter
 
 MAX_NUMBER_OF_CANDLES_PER_REQUEST = 300
-PRODUCTS_URL = 'https://api.exchange.coinbase.com/products'
+BASE_URL = 'https://api.exchange.coinbase.com'
+
+"""
+Default request limits. Coinbase allows public endpoints to be requested 10 times per
+second with bursts up to 15 requests, defaults are kept just under these values.
+"""
+REQUESTS_PER_SECOND = 9
+REQUESTS_BURST = 10
+MAX_CONCURRENT_REQUESTS = 10
+MAX_RETRIES = 8
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30
+
+"""
+Default connection pool settings of session owned by handler.
+"""
+CONNECTOR_LIMIT = 20
+KEEPALIVE_TIMEOUT = 60
+
+"""
+Order of values describing single candle in Coinbase API responses.
+"""
+CANDLE_COLUMNS = ['time', 'low', 'high', 'open', 'close', 'volume']
+
+"""
+Default number of requests sent ahead of consumer while streaming candles.
+"""
+PREFETCHED_REQUESTS = 4
 
 class CoinBaseHandler:
     """
-    Responsible for handling request towards Coinbase API.
+    Responsible for handling request towards Coinbase API. Used as async context manager,
+    handler owns long-lived session with pooled connections that is reused by all requests.
+    Otherwise, separate session is created for each call.
     """
 
+    def __init__(self, requests_per_second: float = REQUESTS_PER_SECOND, requests_burst: int = REQUESTS_BURST,
+                 max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, backoff_cap: float = BACKOFF_CAP,
+                 connector_limit: int = CONNECTOR_LIMIT, keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+                 base_url: str = BASE_URL) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            requests_per_second (float): Average number of requests sent per second.
+            requests_burst (int): Number of requests that can be sent at once before
+                average rate is enforced.
+            max_concurrent_requests (int): Maximal number of requests awaiting response
+                at the same time.
+            max_retries (int): Number of times failed request is repeated before giving up.
+            backoff_base (float): Number of seconds that exponential backoff starts from.
+            backoff_cap (float): Maximal number of seconds to wait between retries.
+            connector_limit (int): Maximal number of connections kept in pool of owned session.
+            keepalive_timeout (float): Number of seconds that idle connection is kept alive for.
+            base_url (str): URL address of Coinbase API, e.g. of local server standing in for it.
+        """
+
+        self.__rate_limiter: TokenBucketRateLimiter = TokenBucketRateLimiter(requests_per_second, requests_burst)
+        self.__max_concurrent_requests: int = max_concurrent_requests
+        self.__max_retries: int = max_retries
+        self.__backoff_base: float = backoff_base
+        self.__backoff_cap: float = backoff_cap
+        self.__semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self.__connector_limit: int = connector_limit
+        self.__keepalive_timeout: float = keepalive_timeout
+        self.__session: Optional[aiohttp.ClientSession] = None
+        self.__base_url: str = base_url.rstrip('/')
+        self.__products_url: str = f'{self.__base_url}/products'
+
+    def get_base_url(self) -> str:
+        """
+        Base URL getter.
+
+        Returns:
+            (str): URL address of Coinbase API that requests are sent towards.
+        """
+
+        return self.__base_url
+
+    def __create_session(self) -> aiohttp.ClientSession:
+        """
+        Creates session with connection pool configured for the handler.
+
+        Returns:
+            (aiohttp.ClientSession): Newly created session.
+        """
+
+        connector = aiohttp.TCPConnector(limit = self.__connector_limit,
+                                         keepalive_timeout = self.__keepalive_timeout)
+        return aiohttp.ClientSession(connector = connector)
+
+    async def open(self) -> None:
+        """
+        Opens long-lived session reused by all subsequent requests. Does nothing if
+        session is already opened.
+        """
+
+        if self.__session is None or self.__session.closed:
+            self.__session = self.__create_session()
+
+    async def close(self) -> None:
+        """
+        Closes long-lived session together with its pooled connections.
+        """
+
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    async def __aenter__(self) -> 'CoinBaseHandler':
+        """
+        Opens long-lived session when entering context.
+
+        Returns:
+            (CoinBaseHandler): Handler itself.
+        """
+
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exception_info) -> None:
+        """
+        Closes long-lived session when leaving context.
+        """
+
+        await self.close()
+
+    @contextlib.asynccontextmanager
+    async def __get_session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        Provides session to send requests with. Long-lived session is used if it was opened,
+        otherwise temporary session is created and closed after use.
+
+        Returns:
+            (AsyncIterator[aiohttp.ClientSession]): Session to send requests with.
+        """
+
+        if self.__session is not None and not self.__session.closed:
+            yield self.__session
+        else:
+            async with self.__create_session() as session:
+                yield session
+
     def __convert_date_to_timestamp(self, date_str: str, date_format: str = "%Y-%m-%d %H:%M:%S", target_timezone = pytz.UTC) -> int:
         """
         Converts date given by string into integer timestamp.
@@ -39,77 +183,228 @@ class CoinBaseHandler:
 
         return result
 
+    def __get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Returns semaphore bounding number of concurrent requests. Semaphores are bound
+        to event loop, so separate one is kept for each loop that handler is used in.
+
+        Returns:
+            (asyncio.Semaphore): Semaphore for currently running event loop.
+        """
+
+        loop = asyncio.get_running_loop()
+        if loop not in self.__semaphores:
+            self.__semaphores = {loop: asyncio.Semaphore(self.__max_concurrent_requests)}
+
+        return self.__semaphores[loop]
+
+    def __calculate_backoff(self, attempt: int) -> float:
+        """
+        Calculates time to wait before next attempt using exponential backoff with
+        full jitter, so retrying requests do not hit API at the same moment.
+
+        Parameters:
+            attempt (int): Number of already failed attempts.
+
+        Returns:
+            (float): Number of seconds to wait.
+        """
+
+        return random.uniform(0, min(self.__backoff_cap, self.__backoff_base * 2 ** attempt))
+
     async def __send_request_to_coinbase(self, session: aiohttp.ClientSession, url: str, pid: int) -> list:
         """
-        Sends request towards Coinbase API and handles exceedance of public rates by repeating
-        request after certain time.
+        Sends request towards Coinbase API. Requests are paced by token bucket and number
+        of concurrent requests is bounded. Exceedance of public rates, server errors and
+        connection problems are handled by repeating request with exponential backoff.
 
         Parameters:
             session (aiohttp.ClientSession): Session used to send request with.
             url (str): URL address that certain request is sent towards.
             pid (int): Request indentification number.
-        
+
         Raises:
-            RuntimeError: If public rates are exceeded. Will try to handle that and reattempt 
-                to sent request.
+            RuntimeError: If request was rejected by API or did not succeed within
+                maximal number of retries.
 
         Returns:
             (list): List of values returned by Coinbase API for certain request.
         """
 
-        try:
-            async with session.get(url) as response:
-                 data = await response.json()
-                 if 'message' in data and data['message'] == 'Public rate limit exceeded':
-                     raise RuntimeError("Exceeded public rate! Retrying in 5s...")
-                 return data
-        except:
-            await asyncio.sleep(5)
-            return await self.__send_request_to_coinbase(session, url, pid)
+        last_error = None
+        for attempt in range(self.__max_retries + 1):
+            if attempt > 0:
+                await asyncio.sleep(self.__calculate_backoff(attempt - 1))
 
-    async def get_candles_for(self, trading_pair: str, start_date: str, end_date: str, granularity: Granularity) -> pd.DataFrame:
+            will_retry = attempt < self.__max_retries
+            try:
+                async with self.__get_semaphore():
+                    await self.__rate_limiter.acquire()
+                    start_time = time.perf_counter()
+                    async with session.get(url) as response:
+                        data = await response.json()
+                    MetricsExporter.observe_coinbase_request(time.perf_counter() - start_time)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                last_error = error
+                if will_retry:
+                    MetricsExporter.count_coinbase_retry('connection_error')
+                continue
+
+            if response.status == 429 or response.status >= 500 or \
+                (isinstance(data, dict) and data.get('message') == 'Public rate limit exceeded'):
+                last_error = RuntimeError(f'Request {pid} failed with status {response.status}!')
+                if will_retry:
+                    MetricsExporter.count_coinbase_retry('server_error' if response.status >= 500 else 'rate_limited')
+                continue
+            if response.status >= 400:
+                raise RuntimeError(f'Request {pid} rejected with status {response.status}! Response: {data}')
+
+            return data
+
+        raise RuntimeError(f'Did not managed to send request {pid} within {self.__max_retries} retries! '
+                           f'Original error: {last_error}')
+
+    def __create_candles_urls(self, trading_pair: str, start_date: str, end_date: str, granularity: Granularity) -> list[str]:
         """
-        Collects data from Coinbase API given starting date, ending date, granularity and trainding pair. Dependent on amount of
-        data segments to fetch, might take some time. Especially, if request exceeds public rates.
+        Splits requested range into consecutive segments fitting into single request.
 
         Parameters:
             trading_pair (str): String representing unique trainding pair symbol.
             start_date (str): String representing date that collected data should start from.
             end_date (str): String representing date that collected data should finish at.
-            granularity (Granularity): Enum specifying resolution of collected data - e.g. each 
-                15 minutes or 1 hour or 6 hours is treated separately
-        
+            granularity (Granularity): Enum specifying resolution of collected data.
+
         Raises:
             ValueError: If given granularity is not member if Granularity enum.
 
         Returns:
-            (pd.DataFrame): Collected data frame.
+            (list[str]): URL addresses of requests ordered by time.
         """
 
         if granularity not in Granularity:
             raise ValueError(f"{granularity} is not an value of Granularity enum!")
-        
+
         start_timestamp = self.__convert_date_to_timestamp(start_date)
         end_timestamp = self.__convert_date_to_timestamp(end_date)
         granularity_seconds = granularity.value
         total_periods = (end_timestamp - start_timestamp) // granularity_seconds
         requests_needed = math.ceil(total_periods / MAX_NUMBER_OF_CANDLES_PER_REQUEST)
 
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for i in range(requests_needed):
-                start_period = start_timestamp + i * MAX_NUMBER_OF_CANDLES_PER_REQUEST * granularity_seconds
-                end_period = min(start_period + MAX_NUMBER_OF_CANDLES_PER_REQUEST * granularity_seconds, end_timestamp)
-                url = f'{PRODUCTS_URL}/{trading_pair}/candles?start={start_period}&end={end_period}&granularity={granularity_seconds}'
-                tasks.append(self.__send_request_to_coinbase(session, url, i))
+        urls = []
+        for i in range(requests_needed):
+            start_period = start_timestamp + i * MAX_NUMBER_OF_CANDLES_PER_REQUEST * granularity_seconds
+            end_period = min(start_period + MAX_NUMBER_OF_CANDLES_PER_REQUEST * granularity_seconds, end_timestamp)
+            urls.append(f'{self.__products_url}/{trading_pair}/candles?start={start_period}&end={end_period}&granularity={granularity_seconds}')
+
+        return urls
+
+    def __convert_responses_to_data_frame(self, responses: list[list]) -> pd.DataFrame:
+        """
+        Converts candles returned by Coinbase API into data frame sorted by time. Responses
+        are decoded directly into preallocated array, each written reversed at its offset,
+        as Coinbase returns candles from the newest one and requests are ordered by time.
+        Therefore, sorting is needed only if responses turn out to be unordered. Candles
+        duplicated at boundaries of consecutive requests are dropped.
+
+        Parameters:
+            responses (list[list]): List of responses ordered by time, each being list of candles.
+
+        Returns:
+            (pd.DataFrame): Candles indexed by time.
+        """
+
+        lengths = [len(response) if response else 0 for response in responses]
+        values = np.empty((sum(lengths), len(CANDLE_COLUMNS)), dtype = np.float64)
+        offset = 0
+        for response, length in zip(responses, lengths):
+            if length > 0:
+                values[offset:offset + length] = np.asarray(response, dtype = np.float64)[::-1]
+                offset += length
+
+        times = values[:, 0].astype(np.int64)
+        if np.any(times[1:] < times[:-1]):
+            order = np.argsort(times, kind = 'stable')
+            values, times = values[order], times[order]
+
+        unique_candles = np.ones(len(times), dtype = bool)
+        unique_candles[1:] = times[1:] != times[:-1]
+
+        return pd.DataFrame({column: values[unique_candles, i] for i, column in enumerate(CANDLE_COLUMNS) if i > 0},
+                            index = pd.DatetimeIndex(pd.to_datetime(times[unique_candles], unit = 's'), name = 'time'))
+
+    async def get_candles_for(self, trading_pair: str, start_date: str, end_date: str, granularity: Granularity) -> pd.DataFrame:
+        """
+        Collects data from Coinbase API given starting date, ending date, granularity and trainding pair. Dependent on amount of
+        data segments to fetch, might take some time. Especially, if request exceeds public rates.
+
+        Parameters:
+            trading_pair (str): String representing unique trainding pair symbol.
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data - e.g. each 
+                15 minutes or 1 hour or 6 hours is treated separately
+        
+        Raises:
+            ValueError: If given granularity is not member if Granularity enum.
+
+        Returns:
+            (pd.DataFrame): Collected data frame.
+        """
+
+        urls = self.__create_candles_urls(trading_pair, start_date, end_date, granularity)
 
+        async with self.__get_session() as session:
+            tasks = [self.__send_request_to_coinbase(session, url, i) for i, url in enumerate(urls)]
             responses = await asyncio.gather(*tasks)
-            candles = [item for sublist in responses if sublist for item in sublist]
-            df = pd.DataFrame(candles, columns=['time', 'low', 'high', 'open', 'close', 'volume'])
-            df['time'] = pd.to_datetime(df['time'], unit='s')
-            df.set_index('time', inplace=True)
-            df.sort_values(by='time', inplace=True)
-            return df
+            return self.__convert_responses_to_data_frame(responses)
+
+    async def stream_candles_for(self, trading_pair: str, start_date: str, end_date: str, granularity: Granularity,
+                                 prefetched_requests: int = PREFETCHED_REQUESTS) -> AsyncIterator[pd.DataFrame]:
+        """
+        Collects data from Coinbase API chunk by chunk, yielding each chunk as soon as it and
+        all preceding ones are received. Only limited number of requests is sent ahead of
+        consumer, so memory usage does not depend on length of requested range, while
+        network transfer overlaps with processing of already yielded chunks.
+
+        Parameters:
+            trading_pair (str): String representing unique trainding pair symbol.
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data.
+            prefetched_requests (int): Maximal number of requests awaiting consumer at once.
+
+        Raises:
+            ValueError: If given granularity is not member if Granularity enum.
+
+        Returns:
+            (AsyncIterator[pd.DataFrame]): Chunks of candles indexed by time, ordered by time
+                and without duplicated timestamps between chunks.
+        """
+
+        urls = self.__create_candles_urls(trading_pair, start_date, end_date, granularity)
+
+        async with self.__get_session() as session:
+            pending_requests = collections.deque()
+            next_request = 0
+            last_time = None
+            try:
+                while next_request < len(urls) or pending_requests:
+                    while next_request < len(urls) and len(pending_requests) < max(1, prefetched_requests):
+                        pending_requests.append(asyncio.ensure_future(
+                            self.__send_request_to_coinbase(session, urls[next_request], next_request)))
+                        next_request += 1
+
+                    chunk = self.__convert_responses_to_data_frame([await pending_requests.popleft()])
+                    if last_time is not None:
+                        chunk = chunk[chunk.index > last_time]
+                    if chunk.empty:
+                        continue
+
+                    last_time = chunk.index[-1]
+                    yield chunk
+            finally:
+                for pending_request in pending_requests:
+                    pending_request.cancel()
     
     async def get_possible_pairs(self) -> pd.DataFrame:
         """
@@ -119,8 +414,8 @@ class CoinBaseHandler:
             (pd.DataFrame): Fetched possible traiding pairs inside data frame.
         """
 
-        async with aiohttp.ClientSession() as session:
-            response = await asyncio.gather(self.__send_request_to_coinbase(session, PRODUCTS_URL, 0))
+        async with self.__get_session() as session:
+            response = await asyncio.gather(self.__send_request_to_coinbase(session, self.__products_url, 0))
             data = [[product['id'], product['base_currency'], product['quote_currency']] for product in response[0]]
             df = pd.DataFrame(sorted(data), columns=['id', 'base_currency', 'quote_currency'])
             df.set_index('id', inplace=True)
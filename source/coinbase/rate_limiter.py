@@ -0,0 +1,52 @@
+# coinbase/rate_limiter.py
+
+import asyncio
+import time
+
+class TokenBucketRateLimiter:
+    """
+    Implements token bucket algorithm used to keep requests rate under certain limit.
+    Bucket is refilled with constant rate and can hold only limited number of tokens,
+    which allows for short bursts while preserving average rate. Tokens are reserved
+    synchronously, so concurrently awaiting coroutines are served in order without locks.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            rate (float): Number of tokens added to bucket per second.
+            capacity (int): Maximal number of tokens that bucket can hold.
+
+        Raises:
+            ValueError: If rate or capacity is not positive.
+        """
+
+        if rate <= 0 or capacity <= 0:
+            raise ValueError('Rate and capacity of token bucket should be positive!')
+
+        self.__rate: float = rate
+        self.__capacity: int = capacity
+        self.__tokens: float = capacity
+        self.__last_refill: float = time.monotonic()
+
+    def __refill(self) -> None:
+        """
+        Adds tokens accumulated since last refill, not exceeding bucket capacity.
+        """
+
+        now = time.monotonic()
+        self.__tokens = min(self.__capacity, self.__tokens + (now - self.__last_refill) * self.__rate)
+        self.__last_refill = now
+
+    async def acquire(self) -> None:
+        """
+        Takes single token from bucket. If bucket is empty, token is reserved in advance
+        and coroutine waits until it is refilled.
+        """
+
+        self.__refill()
+        self.__tokens -= 1
+        if self.__tokens < 0:
+            await asyncio.sleep(-self.__tokens / self.__rate)
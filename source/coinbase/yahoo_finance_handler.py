@@ -3,15 +3,72 @@
 import asyncio
 import yfinance as yf
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Optional
 import pytz
 from source.utils import Granularity
 
+"""
+Maximal number of days that single request can span over for given Yahoo Finance interval.
+Longer ranges are split into chunks. Intervals missing here are not limited.
+"""
+MAX_DAYS_PER_REQUEST = {
+    '1m': 7,
+    '5m': 59,
+    '15m': 59,
+    '60m': 729,
+    '1h': 729
+}
+
+"""
+Default number of threads that chunks are downloaded with.
+"""
+MAX_WORKERS = 4
+
 class YahooFinanceHandler:
     """
-    Responsible for handling requests towards Yahoo Finance API.
+    Responsible for handling requests towards Yahoo Finance API. Ranges exceeding
+    limits of Yahoo Finance are split into chunks downloaded in parallel by dedicated,
+    bounded thread pool. Thread pool is started on first download and shut down by close.
+    Many symbols are downloaded together in batched requests.
     """
 
+    def __init__(self, max_workers: int = MAX_WORKERS) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            max_workers (int): Maximal number of chunks downloaded at the same time.
+        """
+
+        self.__max_workers: int = max_workers
+        self.__executor: Optional[ThreadPoolExecutor] = None
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        """
+        Starts thread pool that chunks are downloaded with, if it is not running yet.
+
+        Returns:
+            (ThreadPoolExecutor): Thread pool used for downloads.
+        """
+
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers = self.__max_workers,
+                                                 thread_name_prefix = 'yahoo_finance')
+
+        return self.__executor
+
+    async def close(self) -> None:
+        """
+        Shuts down thread pool together with its threads. Thread pool is started again
+        if handler is used afterwards.
+        """
+
+        if self.__executor is not None:
+            self.__executor.shutdown(wait = True)
+            self.__executor = None
+
     def __map_granularity_to_yahoo(self, granularity: Granularity) -> str:
         """
         Maps internal Granularity enum to Yahoo Finance interval format.
@@ -100,6 +157,109 @@ class YahooFinanceHandler:
 
         return df
 
+    def __split_date_range(self, start_date: str, end_date: str, interval: str) -> list[tuple[datetime, datetime]]:
+        """
+        Splits date range into consecutive chunks not exceeding limit of given interval.
+
+        Parameters:
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            interval (str): Yahoo Finance interval string.
+
+        Returns:
+            (list[tuple[datetime, datetime]]): List of chunk start and end dates.
+        """
+
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        if interval not in MAX_DAYS_PER_REQUEST:
+            return [(start.to_pydatetime(), end.to_pydatetime())]
+
+        chunk_length = pd.Timedelta(days = MAX_DAYS_PER_REQUEST[interval])
+        chunks = []
+        while start < end:
+            chunk_end = min(start + chunk_length, end)
+            chunks.append((start.to_pydatetime(), chunk_end.to_pydatetime()))
+            start = chunk_end
+
+        return chunks
+
+    def __download(self, symbols: list[str], start: datetime, end: datetime, interval: str) -> dict[str, pd.DataFrame]:
+        """
+        Downloads single chunk for many symbols in one batched request and splits it
+        into separate data frame for each symbol.
+
+        Parameters:
+            symbols (list[str]): List of unique symbols.
+            start (datetime): Date that chunk starts from.
+            end (datetime): Date that chunk finishes at (exclusive).
+            interval (str): Yahoo Finance interval string.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Dictionary mapping symbols onto downloaded data frames.
+        """
+
+        df = yf.download(symbols, start=start, end=end, interval=interval, group_by='ticker',
+                         threads=False, progress=False)
+
+        symbols_data = {}
+        for symbol in symbols:
+            if isinstance(df.columns, pd.MultiIndex):
+                symbol_level = next((level for level in range(df.columns.nlevels)
+                                     if symbol in df.columns.get_level_values(level)), None)
+                symbol_df = df.xs(symbol, axis=1, level=symbol_level) if symbol_level is not None \
+                    else pd.DataFrame(index=df.index)
+            else:
+                symbol_df = df.copy()
+
+            # Rename columns to match Coinbase format
+            symbols_data[symbol] = symbol_df.rename(columns={
+                'Low': 'low',
+                'High': 'high',
+                'Open': 'open',
+                'Close': 'close',
+                'Volume': 'volume'
+            })
+
+        return symbols_data
+
+    async def get_candles_for_many(self, symbols: list[str], start_date: str, end_date: str,
+                                   granularity: Granularity) -> dict[str, pd.DataFrame]:
+        """
+        Collects data from Yahoo Finance API for many symbols at once. Date range is split
+        into chunks downloaded in parallel, each chunk being single batched request for all
+        symbols. Downloaded chunks are afterwards joined separately for each symbol.
+
+        Parameters:
+            symbols (list[str]): List of unique symbols (e.g. "BTC-USD", "AAPL", "^GSPC").
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data.
+
+        Raises:
+            ValueError: If given granularity is not supported by Yahoo Finance.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Dictionary mapping symbols onto collected data frames.
+        """
+        if granularity not in Granularity:
+            raise ValueError(f"{granularity} is not a value of Granularity enum!")
+
+        interval = self.__map_granularity_to_yahoo(granularity)
+
+        # Run the Yahoo Finance downloads in dedicated threads to avoid blocking the event loop
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(*[loop.run_in_executor(self.__get_executor(), self.__download, symbols,
+                                                             chunk_start, chunk_end, interval)
+                                        for chunk_start, chunk_end in self.__split_date_range(start_date, end_date, interval)])
+
+        symbols_data = {}
+        for symbol in symbols:
+            df = pd.concat([chunk[symbol] for chunk in chunks])
+            symbols_data[symbol] = df[~df.index.duplicated(keep='last')].sort_index()
+
+        return symbols_data
+
     async def get_candles_for(self, symbol: str, start_date: str, end_date: str, granularity: Granularity) -> pd.DataFrame:
         """
         Collects data from Yahoo Finance API given starting date, ending date, granularity and symbol.
@@ -117,31 +277,5 @@ class YahooFinanceHandler:
         Returns:
             (pd.DataFrame): Collected data frame.
         """
-        if granularity not in Granularity:
-            raise ValueError(f"{granularity} is not a value of Granularity enum!")
-
-        interval = self.__map_granularity_to_yahoo(granularity)
 
-        # Run the Yahoo Finance download in a separate thread to avoid blocking the event loop
-        loop = asyncio.get_event_loop()
-        df = await loop.run_in_executor(
-            None,
-            lambda: yf.download(
-                symbol,
-                start=start_date,
-                end=end_date,
-                interval=interval
-            )
-        )
-
-        # Rename columns to match Coinbase format
-        df = df.rename(columns={
-            'Low': 'low',
-            'High': 'high',
-            'Open': 'open',
-            'Close': 'close',
-            'Volume': 'volume'
-        })
-
-        df.columns = df.columns.get_level_values(0)
-        return df
+        return (await self.get_candles_for_many([symbol], start_date, end_date, granularity))[symbol]
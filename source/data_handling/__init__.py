@@ -1,3 +1,7 @@
 # data_handling/__init__.py
 
 from .data_handler import DataHandler
+from .candle_store import CandleStore
+from .trading_pair_catalogue import TradingPairCatalogue
+from .gap_detector import GapDetector
+from .candle_resampler import CandleResampler
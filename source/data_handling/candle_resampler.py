@@ -0,0 +1,67 @@
+# data_handling/candle_resampler.py
+
+import numpy as np
+import pandas as pd
+import pytz
+from typing import Optional
+from ..utils import Granularity
+
+class CandleResampler():
+    """
+    Responsible for deriving candles of coarser granularity from finer ones. Candles are
+    assigned to buckets by integer division of epoch timestamps, and each bucket is reduced
+    with single vectorized pass, so no data needs to be fetched again for coarser granularity.
+    """
+
+    def resample(self, data: pd.DataFrame, target_granularity: Granularity,
+                 source_granularity: Optional[Granularity] = None) -> pd.DataFrame:
+        """
+        Resamples candles into coarser granularity. Each resulting candle takes open of
+        the first candle, maximal high, minimal low, close of the last candle and summed
+        volume of its bucket. Buckets without any candles are skipped.
+
+        Parameters:
+            data (pd.DataFrame): Candles indexed by time.
+            target_granularity (Granularity): Enum specifying resolution of resulting candles.
+            source_granularity (Optional[Granularity]): Enum specifying resolution of given candles.
+                If given, it is validated against target granularity.
+
+        Raises:
+            ValueError: If target granularity is not multiple of source granularity.
+
+        Returns:
+            (pd.DataFrame): Resampled candles indexed by time of bucket start, in time zone
+                of given candles.
+        """
+
+        if source_granularity is not None and target_granularity.value % source_granularity.value != 0:
+            raise ValueError(f'{target_granularity} is not multiple of {source_granularity}!')
+
+        index = pd.DatetimeIndex(data.index)
+        original_tz = index.tz
+        if original_tz is not None:
+            index = index.tz_convert(pytz.UTC).tz_localize(None)
+        timestamps = index.values.astype('datetime64[s]').astype(np.int64)
+
+        order = np.argsort(timestamps, kind = 'stable')
+        buckets = timestamps[order] // target_granularity.value
+        bucket_starts = np.flatnonzero(np.diff(buckets, prepend = buckets[:1] - 1)) if len(buckets) > 0 \
+            else np.empty(0, dtype = np.int64)
+        bucket_ends = np.append(bucket_starts[1:], len(buckets)) - 1
+
+        resampled_data = {}
+        if len(bucket_starts) > 0:
+            resampled_data['low'] = np.minimum.reduceat(data['low'].values[order], bucket_starts)
+            resampled_data['high'] = np.maximum.reduceat(data['high'].values[order], bucket_starts)
+            resampled_data['open'] = data['open'].values[order][bucket_starts]
+            resampled_data['close'] = data['close'].values[order][bucket_ends]
+            resampled_data['volume'] = np.add.reduceat(data['volume'].values[order], bucket_starts)
+        else:
+            resampled_data = {column: np.empty(0) for column in ['low', 'high', 'open', 'close', 'volume']}
+
+        resampled_index = pd.DatetimeIndex(pd.to_datetime(buckets[bucket_starts] * target_granularity.value, unit = 's'),
+                                           name = 'time')
+        if original_tz is not None:
+            resampled_index = resampled_index.tz_localize(pytz.UTC).tz_convert(original_tz)
+
+        return pd.DataFrame(resampled_data, index = resampled_index)
@@ -0,0 +1,330 @@
+# data_handling/candle_store.py
+
+import asyncio
+import contextlib
+import json
+import os
+import time
+import urllib.parse
+from typing import Awaitable, Callable, Optional
+import numpy as np
+import pandas as pd
+import pytz
+from ..utils import FileLock, Granularity
+
+"""
+Format of dates passed to data sources while fetching missing ranges of candles.
+"""
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+class CandleStore():
+    """
+    Responsible for keeping candles collected from data sources on local disk. Candles
+    are stored separately for each data source, symbol and granularity, as binary chunks
+    partitioned by time. Store tracks which time ranges are already covered, so only
+    missing gaps are fetched from data source. Writes are guarded by file lock and
+    performed atomically, therefore store can be shared by many concurrent processes.
+    """
+
+    # Constants used locally
+    PARTITION_SIZE = 10000
+    LOCK_TIMEOUT = 60
+    LOCK_POLL_INTERVAL = 0.1
+    CANDLE_COLUMNS = ['low', 'high', 'open', 'close', 'volume']
+    CANDLE_DTYPE = np.dtype([('time', '<i8'), ('low', '<f8'), ('high', '<f8'), ('open', '<f8'),
+                             ('close', '<f8'), ('volume', '<f8')])
+
+    def __init__(self, root_path: str, partition_size: int = PARTITION_SIZE,
+                 lock_timeout: float = LOCK_TIMEOUT) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            root_path (str): Path to directory that candles should be stored in.
+            partition_size (int): Number of candles that single partition file spans over.
+            lock_timeout (float): Number of seconds to wait for lock held by other process.
+                Lock of crashed process is released by operating system, so it is never stale.
+        """
+
+        self.__root_path: str = root_path
+        self.__partition_size: int = partition_size
+        self.__lock_timeout: float = lock_timeout
+
+    def __get_directory(self, source_name: str, symbol: str, granularity: Granularity) -> str:
+        """
+        Creates directory path that candles for certain key are stored in.
+
+        Parameters:
+            source_name (str): Name of data source, e.g. 'coinbase'.
+            symbol (str): Symbol that candles describe.
+            granularity (Granularity): Resolution of candles.
+
+        Returns:
+            (str): Path to directory with partitions and coverage of certain key.
+        """
+
+        directory = os.path.join(self.__root_path, source_name, urllib.parse.quote(symbol, safe = '-_.'),
+                                 str(granularity.value))
+        os.makedirs(directory, exist_ok = True)
+
+        return directory
+
+    @contextlib.asynccontextmanager
+    async def __lock(self, directory: str):
+        """
+        Acquires file lock in given directory for the time of context. Lock is polled,
+        so event loop is not blocked while waiting for it.
+
+        Parameters:
+            directory (str): Directory that should be locked.
+
+        Raises:
+            RuntimeError: If lock could not be acquired within lock timeout.
+        """
+
+        lock = FileLock(os.path.join(directory, '.lock'))
+        deadline = time.monotonic() + self.__lock_timeout
+        while not lock.try_acquire():
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'Did not managed to acquire lock for {directory}!')
+            await asyncio.sleep(CandleStore.LOCK_POLL_INTERVAL)
+
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def __write_atomically(self, path: str, write_function: Callable) -> None:
+        """
+        Writes file by writing temporary file first and then replacing target with it.
+        Readers see either old or new file, never partially written one.
+
+        Parameters:
+            path (str): Path to file that should be written.
+            write_function (Callable): Function writing content into given file object.
+        """
+
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as file:
+            write_function(file)
+        os.replace(temporary_path, path)
+
+    def __read_coverage(self, directory: str) -> list[list[int]]:
+        """
+        Reads list of already covered time ranges.
+
+        Parameters:
+            directory (str): Directory of certain key.
+
+        Returns:
+            (list[list[int]]): Sorted, non overlapping list of [start, end) timestamp ranges.
+        """
+
+        coverage_path = os.path.join(directory, 'coverage.json')
+        if not os.path.exists(coverage_path):
+            return []
+
+        with open(coverage_path, 'r') as file:
+            return json.load(file)
+
+    def __merge_ranges(self, ranges: list[list[int]]) -> list[list[int]]:
+        """
+        Merges overlapping and adjacent ranges.
+
+        Parameters:
+            ranges (list[list[int]]): List of [start, end) ranges.
+
+        Returns:
+            (list[list[int]]): Sorted, non overlapping list of [start, end) ranges.
+        """
+
+        merged_ranges = []
+        for start, end in sorted(ranges):
+            if merged_ranges and start <= merged_ranges[-1][1]:
+                merged_ranges[-1][1] = max(merged_ranges[-1][1], end)
+            else:
+                merged_ranges.append([start, end])
+
+        return merged_ranges
+
+    def __get_missing_ranges(self, coverage: list[list[int]], start: int, end: int) -> list[list[int]]:
+        """
+        Calculates which parts of given range are not covered yet.
+
+        Parameters:
+            coverage (list[list[int]]): Sorted, non overlapping list of covered [start, end) ranges.
+            start (int): Start timestamp of requested range.
+            end (int): End timestamp (exclusive) of requested range.
+
+        Returns:
+            (list[list[int]]): List of [start, end) ranges that are still missing.
+        """
+
+        missing_ranges = []
+        current_start = start
+        for covered_start, covered_end in coverage:
+            if covered_end <= current_start:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > current_start:
+                missing_ranges.append([current_start, covered_start])
+            current_start = max(current_start, covered_end)
+
+        if current_start < end:
+            missing_ranges.append([current_start, end])
+
+        return missing_ranges
+
+    def __data_frame_to_records(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Converts candles data frame into structured array stored on disk.
+
+        Parameters:
+            data (pd.DataFrame): Candles indexed by time.
+
+        Returns:
+            (np.ndarray): Structured array of candles.
+        """
+
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_convert(pytz.UTC).tz_localize(None)
+
+        records = np.empty(len(data), dtype = CandleStore.CANDLE_DTYPE)
+        records['time'] = index.values.astype('datetime64[s]').astype(np.int64)
+        for column in CandleStore.CANDLE_COLUMNS:
+            records[column] = data[column].values
+
+        return records
+
+    def __write_records(self, directory: str, granularity: Granularity, records: np.ndarray) -> None:
+        """
+        Merges given candles into partitions they belong to. Newly fetched candles replace
+        already stored candles with the same timestamp.
+
+        Parameters:
+            directory (str): Directory of certain key.
+            granularity (Granularity): Resolution of candles.
+            records (np.ndarray): Structured array of candles.
+        """
+
+        partition_span = granularity.value * self.__partition_size
+        partition_indices = records['time'] // partition_span
+        for partition_index in np.unique(partition_indices):
+            partition_path = os.path.join(directory, f'{partition_index}.npy')
+            partition_records = records[partition_indices == partition_index]
+            if os.path.exists(partition_path):
+                partition_records = np.concatenate([partition_records, np.load(partition_path)])
+
+            _, unique_positions = np.unique(partition_records['time'], return_index = True)
+            partition_records = partition_records[unique_positions]
+            self.__write_atomically(partition_path, lambda file: np.save(file, partition_records))
+
+    def __read_records(self, directory: str, granularity: Granularity, start: int, end: int) -> np.ndarray:
+        """
+        Reads stored candles from given range.
+
+        Parameters:
+            directory (str): Directory of certain key.
+            granularity (Granularity): Resolution of candles.
+            start (int): Start timestamp of range.
+            end (int): End timestamp (exclusive) of range.
+
+        Returns:
+            (np.ndarray): Structured array of candles sorted by time.
+        """
+
+        partition_span = granularity.value * self.__partition_size
+        partitions = []
+        for partition_index in range(start // partition_span, (end - 1) // partition_span + 1):
+            partition_path = os.path.join(directory, f'{partition_index}.npy')
+            if os.path.exists(partition_path):
+                partition_records = np.load(partition_path)
+                partitions.append(partition_records[(partition_records['time'] >= start) &
+                                                    (partition_records['time'] < end)])
+
+        if not partitions:
+            return np.empty(0, dtype = CandleStore.CANDLE_DTYPE)
+
+        return np.concatenate(partitions)
+
+    async def store_candles(self, source_name: str, symbol: str, granularity: Granularity,
+                            data: pd.DataFrame) -> None:
+        """
+        Stores candles collected outside of get_candles_for, e.g. gaps backfilled within
+        already covered range. Coverage is left unchanged.
+
+        Parameters:
+            source_name (str): Name of data source, e.g. 'coinbase'.
+            symbol (str): Symbol that candles describe.
+            granularity (Granularity): Resolution of candles.
+            data (pd.DataFrame): Candles indexed by time.
+        """
+
+        records = self.__data_frame_to_records(data)
+        if len(records) == 0:
+            return
+
+        directory = self.__get_directory(source_name, symbol, granularity)
+        async with self.__lock(directory):
+            self.__write_records(directory, granularity, records)
+
+    async def get_candles_for(self, source_name: str, symbol: str, start_date: str, end_date: str,
+                              granularity: Granularity,
+                              fetch_function: Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]],
+                              now: Optional[int] = None) -> pd.DataFrame:
+        """
+        Returns candles from given range, fetching only ranges that are not stored yet.
+        Returned candles span from start date up to end date inclusively. Fetched range is
+        marked as covered only up to the last returned candle, so range that data source
+        returned nothing for, e.g. due to transient error, is fetched again next time.
+        Ranges reaching the current, not yet finished candle are never marked as covered.
+
+        Parameters:
+            source_name (str): Name of data source, e.g. 'coinbase'.
+            symbol (str): Symbol that candles describe.
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data.
+            fetch_function (Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]]):
+                Data source function used to collect missing candles, e.g. get_candles_for
+                method of CoinBaseHandler.
+            now (Optional[int]): Current timestamp. Defaults to system time.
+
+        Returns:
+            (pd.DataFrame): Candles indexed by time.
+        """
+
+        if now is None:
+            now = int(time.time())
+
+        start = int(pd.Timestamp(start_date).timestamp())
+        end = int(pd.Timestamp(end_date).timestamp()) + granularity.value
+        directory = self.__get_directory(source_name, symbol, granularity)
+
+        missing_ranges = self.__get_missing_ranges(self.__read_coverage(directory), start, end)
+        for missing_start, missing_end in missing_ranges:
+            fetched_data = await fetch_function(symbol, pd.Timestamp(missing_start, unit = 's').strftime(DATE_FORMAT),
+                                                pd.Timestamp(missing_end, unit = 's').strftime(DATE_FORMAT),
+                                                granularity)
+            records = self.__data_frame_to_records(fetched_data)
+            records = records[(records['time'] >= missing_start) & (records['time'] < missing_end)]
+
+            async with self.__lock(directory):
+                if len(records) > 0:
+                    self.__write_records(directory, granularity, records)
+
+                    covered_end = min(int(records['time'].max()) + granularity.value,
+                                      now // granularity.value * granularity.value)
+                    if covered_end > missing_start:
+                        coverage = self.__read_coverage(directory) + [[missing_start, covered_end]]
+                        coverage = self.__merge_ranges(coverage)
+                        self.__write_atomically(os.path.join(directory, 'coverage.json'),
+                                                lambda file: file.write(json.dumps(coverage).encode()))
+
+        records = self.__read_records(directory, granularity, start, end)
+        data = pd.DataFrame({column: records[column] for column in CandleStore.CANDLE_COLUMNS},
+                            index = pd.DatetimeIndex(pd.to_datetime(records['time'], unit = 's'), name = 'time'))
+
+        return data
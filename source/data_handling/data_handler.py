@@ -1,25 +1,380 @@
 # data_handling/data_handler.py
 
+import asyncio
+import io
+import logging
+import numpy as np
 import pandas as pd
+from typing import AsyncIterator, Awaitable, Callable, Optional
 from ..utils import Granularity
 from source.coinbase import CoinBaseHandler, YahooFinanceHandler
+from .candle_resampler import CandleResampler
+from .candle_store import CandleStore
+from .gap_detector import GapDetector
+from .trading_pair_catalogue import TradingPairCatalogue
+
+"""
+Names of columns that candles are described with. Used to arrange panel data.
+"""
+CANDLE_COLUMNS = ['low', 'high', 'open', 'close', 'volume']
+
+"""
+Relative tolerance of indicator values recalculated at the seam of appended data. Exponentially
+weighted indicators are recalculated over limited warm-up, so they differ negligibly.
+"""
+SEAM_TOLERANCE = 1e-4
 
 class DataHandler():
     """
     Responsible for data handling. Including data collection and preparation.
     """
 
-    def __init__(self, list_of_indicators_to_apply: list = []) -> None:
+    def __init__(self, list_of_indicators_to_apply: list = [], candle_store: Optional[CandleStore] = None,
+                 trading_pair_catalogue_path: Optional[str] = None,
+                 coinbase_handler: Optional[CoinBaseHandler] = None, backfill_gaps: bool = False,
+                 resample_from: Optional[Granularity] = None) -> None:
         """
         Class constructor.
 
         Parameters:
             list_of_indicators_to_apply (list): List of indicators further to apply.
+            candle_store (Optional[CandleStore]): Local store of candles. If given, only candles
+                missing from the store are collected from data sources.
+            trading_pair_catalogue_path (Optional[str]): Path to file that recognized trading
+                pairs should be cached in. If not given, they are cached only in memory.
+            coinbase_handler (Optional[CoinBaseHandler]): Handler used to communicate with Coinbase.
+                Can be shared by many data handlers, so they reuse the same session and request
+                limits. If not given, new handler is created.
+            backfill_gaps (bool): Indicates if gaps in collected Coinbase candles should be requested
+                again. Coverage statistics of collected candles are gathered regardless of it.
+            resample_from (Optional[Granularity]): Finer granularity that candles should be collected
+                with and resampled locally into requested coarser granularity. Allows to collect
+                and store single granularity only. If not given, candles are collected directly.
         """
 
         self.indicators = list_of_indicators_to_apply
-        self.coinbase = CoinBaseHandler()
+        self.candle_store = candle_store
+        self.coinbase = coinbase_handler if coinbase_handler is not None else CoinBaseHandler()
+        self.__owns_coinbase: bool = coinbase_handler is None
         self.yahoo_finance = YahooFinanceHandler()
+        self.trading_pair_catalogue = TradingPairCatalogue(self.coinbase, self.yahoo_finance,
+                                                           cache_path = trading_pair_catalogue_path)
+        self.backfill_gaps = backfill_gaps
+        self.gap_detector = GapDetector()
+        self.coverage_statistics: dict[str, dict] = {}
+        self.resample_from = resample_from
+        self.candle_resampler = CandleResampler()
+
+    async def __aenter__(self) -> 'DataHandler':
+        """
+        Opens long-lived Coinbase session, so all trading pairs prepared within context
+        reuse its pooled connections.
+
+        Returns:
+            (DataHandler): Data handler itself.
+        """
+
+        await self.coinbase.open()
+        return self
+
+    async def __aexit__(self, *exception_info) -> None:
+        """
+        Closes long-lived Coinbase session and Yahoo Finance thread pool when leaving context.
+        Session of handler given in constructor is left open, as it may still be used by other
+        data handlers.
+        """
+
+        if self.__owns_coinbase:
+            await self.coinbase.close()
+        await self.yahoo_finance.close()
+
+    async def __get_candles_for(self, trading_pair: str, start_date: str, end_date: str,
+                                granularity: Granularity) -> pd.DataFrame:
+        """
+        Collects candles for certain trading pair from data source that recognizes it.
+
+        Parameters:
+            trading_pair (str): String representing unique trainding pair symbol.
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data.
+
+        Raises:
+            RuntimeError: If given traiding pair symbol is not recognized.
+
+        Returns:
+            (pd.DataFrame): Collected candles.
+        """
+
+        source_name = await self.trading_pair_catalogue.get_source_of(trading_pair)
+        if source_name is None:
+            raise RuntimeError('Traiding pair not recognized!')
+
+        if source_name == TradingPairCatalogue.YAHOO_FINANCE_SOURCE:
+            fetch_function = self.yahoo_finance.get_candles_for
+        else:
+            fetch_function = self.coinbase.get_candles_for
+
+        if self.candle_store is not None:
+            stored_fetch_function = lambda symbol, start_date, end_date, granularity: \
+                self.candle_store.get_candles_for(source_name, symbol, start_date, end_date, granularity, fetch_function)
+            backfill_fetch_function = self.__stored_backfill(source_name, fetch_function)
+        else:
+            stored_fetch_function = fetch_function
+            backfill_fetch_function = fetch_function
+
+        if self.__can_resample(granularity):
+            stored_fetch_function = self.__resampled(stored_fetch_function)
+            backfill_fetch_function = self.__resampled(backfill_fetch_function)
+
+        data = await stored_fetch_function(trading_pair, start_date, end_date, granularity)
+
+        if source_name == TradingPairCatalogue.COINBASE_SOURCE:
+            data = await self.__check_gaps(data, trading_pair, start_date, end_date, granularity,
+                                           backfill_fetch_function)
+
+        return data
+
+    def __stored_backfill(self, source_name: str,
+                          fetch_function: Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]]) \
+        -> Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]]:
+        """
+        Wraps data source function, so candles it collects while backfilling gaps are written
+        into candle store. Gaps are filled in the store as well, and are not requested again.
+
+        Parameters:
+            source_name (str): Name of data source, e.g. 'coinbase'.
+            fetch_function (Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]]):
+                Data source function used to collect candles.
+
+        Returns:
+            (Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]]): Wrapped function.
+        """
+
+        async def fetch_stored_function(trading_pair: str, start_date: str, end_date: str,
+                                        granularity: Granularity) -> pd.DataFrame:
+            data = await fetch_function(trading_pair, start_date, end_date, granularity)
+            await self.candle_store.store_candles(source_name, trading_pair, granularity, data)
+            return data
+
+        return fetch_stored_function
+
+    def __can_resample(self, granularity: Granularity) -> bool:
+        """
+        Checks if candles of given granularity can be resampled from finer granularity.
+
+        Parameters:
+            granularity (Granularity): Enum specifying requested resolution of data.
+
+        Returns:
+            (bool): True if candles should be collected with finer granularity, False otherwise.
+        """
+
+        return self.resample_from is not None and granularity.value > self.resample_from.value and \
+            granularity.value % self.resample_from.value == 0
+
+    def __resampled(self, fetch_function: Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]]) \
+        -> Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]]:
+        """
+        Wraps data source function, so it collects candles with finer granularity and
+        resamples them into requested one.
+
+        Parameters:
+            fetch_function (Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]]):
+                Data source function used to collect candles.
+
+        Returns:
+            (Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]]): Wrapped function.
+        """
+
+        async def fetch_resampled_function(trading_pair: str, start_date: str, end_date: str,
+                                           granularity: Granularity) -> pd.DataFrame:
+            # Last requested candle spans until the start of the next one
+            fine_end_date = pd.Timestamp(end_date) + pd.Timedelta(seconds = granularity.value - self.resample_from.value)
+            data = await fetch_function(trading_pair, start_date, fine_end_date.strftime('%Y-%m-%d %H:%M:%S'),
+                                        self.resample_from)
+            return self.candle_resampler.resample(data, granularity, self.resample_from)
+
+        return fetch_resampled_function
+
+    async def __check_gaps(self, data: pd.DataFrame, trading_pair: str, start_date: str, end_date: str,
+                           granularity: Granularity, fetch_function) -> pd.DataFrame:
+        """
+        Gathers coverage statistics of collected candles and, if enabled, requests again
+        only ranges that are missing from them. Applied only to markets trading continuously,
+        as gaps are expected outside of trading hours otherwise.
+
+        Parameters:
+            data (pd.DataFrame): Collected candles.
+            trading_pair (str): String representing unique trainding pair symbol.
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data.
+            fetch_function (Callable): Data source function used to collect missing candles.
+
+        Returns:
+            (pd.DataFrame): Collected candles, with gaps filled if enabled.
+        """
+
+        if self.backfill_gaps:
+            data = await self.gap_detector.backfill(data, trading_pair, granularity, fetch_function,
+                                                    start_date, end_date)
+
+        coverage_statistics = self.gap_detector.get_coverage_statistics(data, granularity, start_date, end_date)
+        self.coverage_statistics[trading_pair] = coverage_statistics
+        if coverage_statistics['missing_candles'] > 0:
+            logging.warning('%s is missing %d of %d candles in %d gaps!', trading_pair,
+                            coverage_statistics['missing_candles'], coverage_statistics['expected_candles'],
+                            coverage_statistics['number_of_gaps'])
+
+        return data
+
+    async def __get_candles_for_many(self, trading_pairs: list[str], start_date: str, end_date: str,
+                                     granularity: Granularity) -> dict[str, pd.DataFrame]:
+        """
+        Collects candles for many trading pairs concurrently. Yahoo Finance symbols are
+        collected together in batched requests, unless they are served from candle store.
+
+        Parameters:
+            trading_pairs (list[str]): List of unique trainding pair symbols.
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data.
+
+        Raises:
+            RuntimeError: If any of given traiding pair symbols is not recognized.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Dictionary mapping trading pair symbols onto collected candles.
+        """
+
+        source_names = await asyncio.gather(*[self.trading_pair_catalogue.get_source_of(trading_pair)
+                                              for trading_pair in trading_pairs])
+        if None in source_names:
+            raise RuntimeError('Traiding pair not recognized!')
+
+        batched_pairs = [trading_pair for trading_pair, source_name in zip(trading_pairs, source_names)
+                         if source_name == TradingPairCatalogue.YAHOO_FINANCE_SOURCE and self.candle_store is None]
+        separate_pairs = [trading_pair for trading_pair in trading_pairs if trading_pair not in batched_pairs]
+
+        separate_data = asyncio.gather(*[self.__get_candles_for(trading_pair, start_date, end_date, granularity)
+                                         for trading_pair in separate_pairs])
+        if batched_pairs:
+            batched_data, separate_data = await asyncio.gather(
+                self.yahoo_finance.get_candles_for_many(batched_pairs, start_date, end_date, granularity), separate_data)
+        else:
+            batched_data, separate_data = {}, await separate_data
+
+        collected_data = {**batched_data, **dict(zip(separate_pairs, separate_data))}
+        return {trading_pair: collected_data[trading_pair] for trading_pair in trading_pairs}
+
+    async def __stream_candles_for(self, trading_pair: str, start_date: str, end_date: str,
+                                   granularity: Granularity) -> AsyncIterator[pd.DataFrame]:
+        """
+        Collects candles for certain trading pair chunk by chunk. Candles are streamed only
+        directly from Coinbase, other sources and candle store yield all candles at once.
+
+        Parameters:
+            trading_pair (str): String representing unique trainding pair symbol.
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data.
+
+        Raises:
+            RuntimeError: If given traiding pair symbol is not recognized.
+
+        Returns:
+            (AsyncIterator[pd.DataFrame]): Chunks of candles ordered by time.
+        """
+
+        source_name = await self.trading_pair_catalogue.get_source_of(trading_pair)
+        if source_name == TradingPairCatalogue.COINBASE_SOURCE and self.candle_store is None:
+            async for chunk in self.coinbase.stream_candles_for(trading_pair, start_date, end_date, granularity):
+                yield chunk
+        else:
+            yield await self.__get_candles_for(trading_pair, start_date, end_date, granularity)
+
+    def get_warm_up_period(self) -> int:
+        """
+        Calculates number of preceding rows needed by all assigned indicators to be
+        calculated incrementally.
+
+        Raises:
+            ValueError: If any of assigned indicators can not be calculated incrementally.
+
+        Returns:
+            (int): Number of preceding rows.
+        """
+
+        warm_up_periods = [indicator.get_warm_up_period() for indicator in self.indicators]
+        if None in warm_up_periods:
+            raise ValueError(f'{type(self.indicators[warm_up_periods.index(None)]).__name__} '
+                             'can not be calculated incrementally!')
+
+        return max(warm_up_periods, default = 0)
+
+    def __calculate_indicators_continuation(self, warm_up_data: pd.DataFrame, chunk: pd.DataFrame,
+                                            previous_outputs: list[Optional[pd.DataFrame]]) -> pd.DataFrame:
+        """
+        Extends chunk of candles with indicators calculated over warm-up rows preceding it.
+
+        Parameters:
+            warm_up_data (pd.DataFrame): Candles directly preceding chunk.
+            chunk (pd.DataFrame): New candles.
+            previous_outputs (list[Optional[pd.DataFrame]]): Last output rows of each indicator,
+                updated in place.
+
+        Returns:
+            (pd.DataFrame): Chunk extended with given indicators.
+        """
+
+        data = pd.concat([warm_up_data, chunk])
+        indicators_data = []
+        for i, indicator in enumerate(self.indicators):
+            indicator_data = indicator.calculate_continuation(data, previous_outputs[i])
+            previous_outputs[i] = indicator_data.iloc[-1:]
+            indicators_data.append(indicator_data.iloc[len(warm_up_data):])
+
+        return pd.concat([chunk] + indicators_data, axis=1)
+
+    async def stream_data_to_file(self, trading_pair: str, start_date: str, end_date: str,
+                                  granularity: Granularity, file_path: str) -> int:
+        """
+        Collects data chunk by chunk and appends it, extended with assigned list of indicators,
+        to CSV file. Indicators are calculated over rolling buffer holding only rows needed
+        to warm them up, so memory usage does not depend on length of requested range.
+        Calculation runs in separate thread, overlapping with collection of next chunks.
+
+        Parameters:
+            trading_pair (str): String representing unique trainding pair symbol.
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data.
+            file_path (str): Path to CSV file that data should be written to.
+
+        Raises:
+            RuntimeError: If given traiding pair symbol is not recognized.
+            ValueError: If any of assigned indicators can not be calculated incrementally.
+
+        Returns:
+            (int): Number of written rows.
+        """
+
+        warm_up_period = self.get_warm_up_period()
+        loop = asyncio.get_running_loop()
+        warm_up_data = pd.DataFrame(columns = CANDLE_COLUMNS, index = pd.DatetimeIndex([], name = 'time'), dtype = float)
+        previous_outputs = [None] * len(self.indicators)
+        number_of_rows = 0
+        async for chunk in self.__stream_candles_for(trading_pair, start_date, end_date, granularity):
+            data = await loop.run_in_executor(None, self.__calculate_indicators_continuation,
+                                              warm_up_data, chunk, previous_outputs)
+            await loop.run_in_executor(None, lambda: data.to_csv(file_path, mode = 'a' if number_of_rows else 'w',
+                                                                 header = not number_of_rows))
+            number_of_rows += len(data)
+            if warm_up_period > 0:
+                warm_up_data = pd.concat([warm_up_data, chunk]).iloc[-warm_up_period:]
+
+        return number_of_rows
 
     async def prepare_data(self, trading_pair: str, start_date: str, end_date: str, granularity: Granularity) -> pd.DataFrame:
         """
@@ -39,15 +394,7 @@ class DataHandler():
             (pd.DataFrame): Collected data extended with given indicators.
         """
 
-        possible_traiding_pairs_cb = await self.coinbase.get_possible_pairs()
-        possible_traiding_pairs_yf = await self.yahoo_finance.get_possible_pairs(asset_type='all')
-        if trading_pair not in possible_traiding_pairs_cb.index and trading_pair not in possible_traiding_pairs_yf.index:
-            raise RuntimeError('Traiding pair not recognized!')
-
-        if trading_pair in possible_traiding_pairs_yf.index:
-            data = await self.yahoo_finance.get_candles_for(trading_pair, start_date, end_date, granularity)
-        else:
-            data = await self.coinbase.get_candles_for(trading_pair, start_date, end_date, granularity)
+        data = await self.__get_candles_for(trading_pair, start_date, end_date, granularity)
         if self.indicators:
             indicators_data = []
             for indicator in self.indicators:
@@ -55,3 +402,134 @@ class DataHandler():
             data = pd.concat([data] + indicators_data, axis=1)
 
         return data
+
+    async def prepare_panel_data(self, trading_pairs: list[str], start_date: str, end_date: str,
+                                 granularity: Granularity) -> dict[str, pd.DataFrame]:
+        """
+        Collects data for many trading pairs at once and extends it with assigned list of
+        indicators. Candles of trading pairs sharing the same time index are gathered into
+        panel (time x symbol) data frames, so every indicator is calculated in a single
+        vectorized call over all of them. Trading pairs with different time index, e.g.
+        listed later or with gaps in candles, are put into separate panels, as rolling
+        indicators calculated over rows added only for alignment would differ from those
+        calculated by prepare_data. Afterwards panels are split back into separate data
+        set for each trading pair.
+
+        Parameters:
+            trading_pairs (list[str]): List of unique trainding pair symbols.
+            start_date (str): String representing date that collected data should start from.
+            end_date (str): String representing date that collected data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data.
+
+        Raises:
+            RuntimeError: If any of given traiding pair symbols is not recognized.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Dictionary mapping trading pair symbols onto collected
+                data extended with given indicators.
+        """
+
+        collected_data = await self.__get_candles_for_many(trading_pairs, start_date, end_date, granularity)
+
+        aligned_groups: list[tuple[pd.Index, list[str]]] = []
+        for trading_pair, data in collected_data.items():
+            for index, group in aligned_groups:
+                if index.equals(data.index):
+                    group.append(trading_pair)
+                    break
+            else:
+                aligned_groups.append((data.index, [trading_pair]))
+
+        prepared_data = {}
+        for _, group in aligned_groups:
+            panel = {column: pd.concat({trading_pair: collected_data[trading_pair][column] for trading_pair in group},
+                                       axis = 1)
+                     for column in CANDLE_COLUMNS}
+            for indicator in self.indicators:
+                panel.update(indicator.calculate_panel({column: panel[column] for column in CANDLE_COLUMNS}))
+
+            for trading_pair in group:
+                prepared_data[trading_pair] = pd.DataFrame({column: frame[trading_pair]
+                                                            for column, frame in panel.items()})
+
+        return {trading_pair: prepared_data[trading_pair] for trading_pair in collected_data}
+
+    def read_data_tail(self, file_path: str, number_of_rows: int, block_size: int = 1 << 16) -> pd.DataFrame:
+        """
+        Reads last rows of CSV data set without parsing the whole file. File is read
+        backwards in blocks until enough lines are collected.
+
+        Parameters:
+            file_path (str): Path to CSV file written by data handler.
+            number_of_rows (int): Number of last rows to read.
+            block_size (int): Number of bytes read at once.
+
+        Returns:
+            (pd.DataFrame): Last rows of data set indexed by time.
+        """
+
+        with open(file_path, 'rb') as file:
+            header = file.readline()
+            header_end = file.tell()
+            file.seek(0, io.SEEK_END)
+            position = file.tell()
+            tail = b''
+            while position > header_end and tail.count(b'\n') <= number_of_rows:
+                read_size = min(block_size, position - header_end)
+                position -= read_size
+                file.seek(position)
+                tail = file.read(read_size) + tail
+
+        lines = tail.splitlines()[-number_of_rows:] if number_of_rows > 0 else []
+        return pd.read_csv(io.BytesIO(header + b'\n'.join(lines)), index_col = 0, parse_dates = True)
+
+    async def prepare_appended_data(self, existing_data: pd.DataFrame, trading_pair: str, end_date: str,
+                                    granularity: Granularity) -> pd.DataFrame:
+        """
+        Collects only candles following existing data set and extends them with assigned
+        list of indicators. Indicators are calculated over new rows preceded by warm-up
+        rows taken from existing data, instead of the whole history. Seam is verified by
+        collecting the last existing candle again and comparing both candles and indicator
+        values recalculated for it with existing ones.
+
+        Parameters:
+            existing_data (pd.DataFrame): Tail of existing data set, containing at least
+                warm-up period of assigned indicators and one row more, unless data set is shorter.
+            trading_pair (str): String representing unique trainding pair symbol.
+            end_date (str): String representing date that appended data should finish at.
+            granularity (Granularity): Enum specifying resolution of collected data.
+
+        Raises:
+            RuntimeError: If given traiding pair symbol is not recognized or data does not
+                continue existing data set.
+            ValueError: If any of assigned indicators can not be calculated incrementally.
+
+        Returns:
+            (pd.DataFrame): New rows only, with columns ordered as in existing data set.
+        """
+
+        warm_up_period = self.get_warm_up_period()
+        last_time = existing_data.index[-1]
+        candles = await self.__get_candles_for(trading_pair, last_time.strftime('%Y-%m-%d %H:%M:%S'), end_date, granularity)
+        if last_time not in candles.index:
+            raise RuntimeError(f'Last existing candle from {last_time} was not collected again!')
+        if not np.allclose(candles.loc[last_time, CANDLE_COLUMNS].values.astype(float),
+                           existing_data.loc[last_time, CANDLE_COLUMNS].values.astype(float)):
+            raise RuntimeError(f'Collected candle from {last_time} does not match existing data set!')
+
+        new_candles = candles[candles.index > last_time]
+        warm_up_data = existing_data[CANDLE_COLUMNS].iloc[-(warm_up_period + 1):-1]
+        data = self.__calculate_indicators_continuation(warm_up_data, pd.concat([existing_data[CANDLE_COLUMNS].iloc[-1:],
+                                                                                 new_candles]),
+                                                        [existing_data.iloc[:-1]] * len(self.indicators))
+        if set(data.columns) != set(existing_data.columns):
+            raise RuntimeError('Appended data does not have the same columns as existing data set!')
+
+        indicator_columns = [column for column in existing_data.columns if column not in CANDLE_COLUMNS]
+        if not np.allclose(data[indicator_columns].iloc[:1].values.astype(float),
+                           existing_data[indicator_columns].iloc[-1:].values.astype(float),
+                           rtol = SEAM_TOLERANCE, equal_nan = True):
+            raise RuntimeError(f'Indicators recalculated for {last_time} do not match existing data set!')
+
+        data = data.iloc[1:]
+        return data[existing_data.columns]
@@ -0,0 +1,177 @@
+# data_handling/gap_detector.py
+
+import asyncio
+import numpy as np
+import pandas as pd
+import pytz
+from typing import Awaitable, Callable, Optional
+from ..utils import Granularity
+
+"""
+Format of dates passed to data sources while re-requesting missing ranges of candles.
+"""
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+class GapDetector():
+    """
+    Responsible for finding gaps in candles, i.e. ranges where consecutive candles are
+    further apart than granularity implies. Gaps are found with single vectorized pass over
+    time index, and only missing ranges are requested again from data source.
+    """
+
+    def __to_seconds(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Converts time index of candles into integer timestamps.
+
+        Parameters:
+            data (pd.DataFrame): Candles indexed by time.
+
+        Returns:
+            (np.ndarray): Timestamps in seconds, in order of candles.
+        """
+
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_convert(pytz.UTC).tz_localize(None)
+
+        return index.values.astype('datetime64[s]').astype(np.int64)
+
+    def __get_timestamps(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Converts time index of candles into sorted, unique integer timestamps.
+
+        Parameters:
+            data (pd.DataFrame): Candles indexed by time.
+
+        Returns:
+            (np.ndarray): Timestamps in seconds.
+        """
+
+        return np.unique(self.__to_seconds(data))
+
+    def __get_expected_bounds(self, timestamps: np.ndarray, granularity: Granularity, start_date: Optional[str],
+                              end_date: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+        """
+        Calculates timestamps of the first and the last expected candle.
+
+        Parameters:
+            timestamps (np.ndarray): Timestamps of present candles.
+            granularity (Granularity): Resolution of candles.
+            start_date (Optional[str]): Date that candles should start from. Defaults to the first candle.
+            end_date (Optional[str]): Date that candles should finish at. Defaults to the last candle.
+
+        Returns:
+            (tuple[Optional[int], Optional[int]]): Timestamps of the first and the last expected
+                candle, or None if they can not be determined.
+        """
+
+        first = int(pd.Timestamp(start_date).timestamp()) if start_date is not None else \
+            (int(timestamps[0]) if len(timestamps) > 0 else None)
+        last = int(pd.Timestamp(end_date).timestamp()) if end_date is not None else \
+            (int(timestamps[-1]) if len(timestamps) > 0 else None)
+        if first is not None:
+            first = -(-first // granularity.value) * granularity.value
+        if last is not None:
+            last = last // granularity.value * granularity.value
+
+        return first, last
+
+    def find_gaps(self, data: pd.DataFrame, granularity: Granularity, start_date: Optional[str] = None,
+                  end_date: Optional[str] = None) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Finds ranges of missing candles.
+
+        Parameters:
+            data (pd.DataFrame): Candles indexed by time.
+            granularity (Granularity): Enum specifying expected spacing of candles.
+            start_date (Optional[str]): Date that candles should start from. Defaults to the first candle.
+            end_date (Optional[str]): Date that candles should finish at. Defaults to the last candle.
+
+        Returns:
+            (list[tuple[pd.Timestamp, pd.Timestamp]]): List of timestamps of the first and the last
+                missing candle of each gap.
+        """
+
+        timestamps = self.__get_timestamps(data)
+        first, last = self.__get_expected_bounds(timestamps, granularity, start_date, end_date)
+        if first is None or last is None or first > last:
+            return []
+
+        timestamps = timestamps[(timestamps >= first) & (timestamps <= last)]
+        bounded_timestamps = np.concatenate([[first - granularity.value], timestamps, [last + granularity.value]])
+        gap_positions = np.nonzero(np.diff(bounded_timestamps) > granularity.value)[0]
+        gap_starts = bounded_timestamps[gap_positions] + granularity.value
+        gap_ends = bounded_timestamps[gap_positions + 1] - granularity.value
+
+        return [(pd.Timestamp(gap_start, unit = 's'), pd.Timestamp(gap_end, unit = 's'))
+                for gap_start, gap_end in zip(gap_starts, gap_ends)]
+
+    def get_coverage_statistics(self, data: pd.DataFrame, granularity: Granularity, start_date: Optional[str] = None,
+                                end_date: Optional[str] = None) -> dict:
+        """
+        Summarizes how completely candles cover expected range.
+
+        Parameters:
+            data (pd.DataFrame): Candles indexed by time.
+            granularity (Granularity): Enum specifying expected spacing of candles.
+            start_date (Optional[str]): Date that candles should start from. Defaults to the first candle.
+            end_date (Optional[str]): Date that candles should finish at. Defaults to the last candle.
+
+        Returns:
+            (dict): Numbers of expected, present and missing candles, coverage ratio, number
+                of gaps and length of the largest gap in candles.
+        """
+
+        timestamps = self.__get_timestamps(data)
+        first, last = self.__get_expected_bounds(timestamps, granularity, start_date, end_date)
+        expected_candles = (last - first) // granularity.value + 1 if first is not None and last is not None \
+            and first <= last else 0
+        gaps = self.find_gaps(data, granularity, start_date, end_date)
+        gap_lengths = [int((gap_end - gap_start).total_seconds()) // granularity.value + 1 for gap_start, gap_end in gaps]
+        missing_candles = sum(gap_lengths)
+
+        return {
+            'expected_candles': expected_candles,
+            'present_candles': expected_candles - missing_candles,
+            'missing_candles': missing_candles,
+            'coverage': (expected_candles - missing_candles) / expected_candles if expected_candles > 0 else 1.0,
+            'number_of_gaps': len(gaps),
+            'largest_gap': max(gap_lengths, default = 0)
+        }
+
+    async def backfill(self, data: pd.DataFrame, trading_pair: str, granularity: Granularity,
+                       fetch_function: Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]],
+                       start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        Fills gaps in candles by requesting only missing ranges from data source. Gaps that
+        data source still does not have candles for, e.g. periods without trades, are left.
+
+        Parameters:
+            data (pd.DataFrame): Candles indexed by time.
+            trading_pair (str): String representing unique trainding pair symbol.
+            granularity (Granularity): Enum specifying expected spacing of candles.
+            fetch_function (Callable[[str, str, str, Granularity], Awaitable[pd.DataFrame]]):
+                Data source function used to collect missing candles, e.g. get_candles_for
+                method of CoinBaseHandler.
+            start_date (Optional[str]): Date that candles should start from. Defaults to the first candle.
+            end_date (Optional[str]): Date that candles should finish at. Defaults to the last candle.
+
+        Returns:
+            (pd.DataFrame): Candles with filled gaps, sorted by time.
+        """
+
+        gaps = self.find_gaps(data, granularity, start_date, end_date)
+        if not gaps:
+            return data
+
+        fetched_data = await asyncio.gather(*[fetch_function(trading_pair, gap_start.strftime(DATE_FORMAT),
+                                                             (gap_end + pd.Timedelta(seconds = granularity.value)).strftime(DATE_FORMAT),
+                                                             granularity)
+                                              for gap_start, gap_end in gaps])
+        gap_data = []
+        for gap_fetched_data, (gap_start, gap_end) in zip(fetched_data, gaps):
+            timestamps = self.__to_seconds(gap_fetched_data)
+            gap_data.append(gap_fetched_data[(timestamps >= gap_start.timestamp()) & (timestamps <= gap_end.timestamp())])
+        data = pd.concat([data] + gap_data)
+
+        return data[~data.index.duplicated(keep = 'first')].sort_index()
@@ -0,0 +1,178 @@
+# data_handling/trading_pair_catalogue.py
+
+import asyncio
+import json
+import os
+import time
+from typing import Optional
+from source.coinbase import CoinBaseHandler, YahooFinanceHandler
+
+class TradingPairCatalogue():
+    """
+    Responsible for keeping track of trading pairs offered by data sources. Fetched
+    trading pairs are indexed by symbol, so checking membership does not depend on
+    number of pairs. Index is cached in memory for the whole process and optionally
+    on disk, and is fetched again only after its time to live expires. Caches are kept
+    separately for each Coinbase base URL, e.g. real API and local server standing in for it.
+    """
+
+    # Constants used locally
+    COINBASE_SOURCE = 'coinbase'
+    YAHOO_FINANCE_SOURCE = 'yahoo_finance'
+    TIME_TO_LIVE = 24 * 60 * 60
+
+    # Index cache shared by all catalogues within process, keyed by Coinbase base URL and disk cache path
+    __memory_cache: dict[tuple[str, Optional[str]], tuple[float, dict[str, str]]] = {}
+
+    def __init__(self, coinbase_handler: CoinBaseHandler, yahoo_finance_handler: YahooFinanceHandler,
+                 time_to_live: float = TIME_TO_LIVE, cache_path: Optional[str] = None) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            coinbase_handler (CoinBaseHandler): Handler used to fetch Coinbase trading pairs.
+            yahoo_finance_handler (YahooFinanceHandler): Handler used to fetch Yahoo Finance symbols.
+            time_to_live (float): Number of seconds that fetched trading pairs stay valid for.
+            cache_path (Optional[str]): Path to JSON file that index should be cached in.
+                If not given, index is cached only in memory.
+        """
+
+        self.__coinbase_handler: CoinBaseHandler = coinbase_handler
+        self.__yahoo_finance_handler: YahooFinanceHandler = yahoo_finance_handler
+        self.__time_to_live: float = time_to_live
+        self.__cache_path: Optional[str] = cache_path
+        self.__cache_key: tuple[str, Optional[str]] = (coinbase_handler.get_base_url(), cache_path)
+        self.__pending_refresh: Optional[asyncio.Task] = None
+
+    @classmethod
+    def clear_memory_cache(cls) -> None:
+        """
+        Clears index cached in memory, forcing it to be read from disk or fetched again.
+        """
+
+        cls.__memory_cache.clear()
+
+    def __is_fresh(self, fetched_at: float) -> bool:
+        """
+        Checks if index fetched at certain time is still valid.
+
+        Parameters:
+            fetched_at (float): Timestamp that index was fetched at.
+
+        Returns:
+            (bool): True if index did not expire yet, False otherwise.
+        """
+
+        return time.time() - fetched_at < self.__time_to_live
+
+    def __read_disk_cache(self) -> Optional[tuple[float, dict[str, str]]]:
+        """
+        Reads index cached on disk.
+
+        Returns:
+            (Optional[tuple[float, dict[str, str]]]): Timestamp of fetching and index, or None
+                if there is no readable disk cache, or it was fetched from other base URL.
+        """
+
+        if self.__cache_path is None or not os.path.exists(self.__cache_path):
+            return None
+
+        try:
+            with open(self.__cache_path, 'r') as file:
+                cached_data = json.load(file)
+            if cached_data['base_url'] != self.__cache_key[0]:
+                return None
+            return cached_data['fetched_at'], cached_data['pairs']
+        except (ValueError, KeyError):
+            return None
+
+    def __write_disk_cache(self, fetched_at: float, pairs: dict[str, str]) -> None:
+        """
+        Writes index to disk cache through temporary file, so concurrent readers never
+        see it partially written.
+
+        Parameters:
+            fetched_at (float): Timestamp that index was fetched at.
+            pairs (dict[str, str]): Index mapping trading pairs onto data source names.
+        """
+
+        if self.__cache_path is None:
+            return
+
+        cache_directory = os.path.dirname(self.__cache_path)
+        if cache_directory:
+            os.makedirs(cache_directory, exist_ok = True)
+        temporary_path = f'{self.__cache_path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w') as file:
+            json.dump({'base_url': self.__cache_key[0], 'fetched_at': fetched_at, 'pairs': pairs}, file)
+        os.replace(temporary_path, self.__cache_path)
+
+    async def __fetch_index(self) -> dict[str, str]:
+        """
+        Fetches trading pairs from data sources and indexes them. Yahoo Finance symbols
+        take precedence over Coinbase trading pairs with the same symbol.
+
+        Returns:
+            (dict[str, str]): Index mapping trading pairs onto data source names.
+        """
+
+        coinbase_pairs = await self.__coinbase_handler.get_possible_pairs()
+        yahoo_finance_pairs = await self.__yahoo_finance_handler.get_possible_pairs(asset_type = 'all')
+
+        pairs = dict.fromkeys(coinbase_pairs.index, TradingPairCatalogue.COINBASE_SOURCE)
+        pairs.update(dict.fromkeys(yahoo_finance_pairs.index, TradingPairCatalogue.YAHOO_FINANCE_SOURCE))
+        fetched_at = time.time()
+        self.__write_disk_cache(fetched_at, pairs)
+        TradingPairCatalogue.__memory_cache[self.__cache_key] = (fetched_at, pairs)
+
+        return pairs
+
+    async def __get_index(self) -> dict[str, str]:
+        """
+        Returns valid index, looking for it in memory, on disk and finally fetching it.
+        Concurrent calls wait for the same fetch instead of sending their own requests.
+
+        Returns:
+            (dict[str, str]): Index mapping trading pairs onto data source names.
+        """
+
+        cached_index = TradingPairCatalogue.__memory_cache.get(self.__cache_key)
+        if cached_index is not None and self.__is_fresh(cached_index[0]):
+            return cached_index[1]
+
+        cached_index = self.__read_disk_cache()
+        if cached_index is not None and self.__is_fresh(cached_index[0]):
+            TradingPairCatalogue.__memory_cache[self.__cache_key] = cached_index
+            return cached_index[1]
+
+        if self.__pending_refresh is None or self.__pending_refresh.done() or \
+            self.__pending_refresh.get_loop() is not asyncio.get_running_loop():
+            self.__pending_refresh = asyncio.ensure_future(self.__fetch_index())
+
+        return await asyncio.shield(self.__pending_refresh)
+
+    async def get_source_of(self, trading_pair: str) -> Optional[str]:
+        """
+        Looks up data source offering given trading pair.
+
+        Parameters:
+            trading_pair (str): String representing unique trainding pair symbol.
+
+        Returns:
+            (Optional[str]): Name of data source, or None if trading pair is not recognized.
+        """
+
+        return (await self.__get_index()).get(trading_pair)
+
+    async def contains(self, trading_pair: str) -> bool:
+        """
+        Checks if any data source offers given trading pair.
+
+        Parameters:
+            trading_pair (str): String representing unique trainding pair symbol.
+
+        Returns:
+            (bool): True if trading pair is recognized, False otherwise.
+        """
+
+        return trading_pair in await self.__get_index()
@@ -3,6 +3,7 @@
 import copy
 
 from .order import Order
+from source.utils import MetricsExporter
 
 class Broker():
     """
@@ -58,6 +59,7 @@ class Broker():
         """
 
         self.__current_orders.append(Order(amount, is_buy_order, stop_loss, take_profit))
+        MetricsExporter.count_placed_order(is_buy_order)
     
     def update_orders(self, coefficient: float) -> list[Order]:
         """
@@ -85,6 +87,7 @@ class Broker():
             order_ratio = order.current_value / order.initial_value
             if order_ratio >= order.take_profit or order_ratio <= order.stop_loss:
                 self.__recently_closed_orders.append(order)
+                MetricsExporter.count_closed_order('take_profit' if order_ratio >= order.take_profit else 'stop_loss')
 
         for order in self.__recently_closed_orders:
             self.__current_orders.remove(order)
@@ -7,17 +7,20 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler, StandardScaler, RobustScaler
 import math
+import os
+import time
 import random
+import urllib.parse
 from types import SimpleNamespace
-from typing import Optional
+from typing import Optional, Union
 import copy
-from tensorflow.keras.utils import to_categorical
 import logging
 
 # local imports
 from source.environment import Broker
 from source.environment import RewardValidatorBase
 from source.environment import LabelAnnotatorBase
+from source.utils import MetricsExporter, PhaseProfiler
 
 class TradingEnvironment(Env):
     """
@@ -29,6 +32,9 @@ class TradingEnvironment(Env):
     TRAIN_MODE = 'train'
     TEST_MODE = 'test'
 
+    # Data preloaded for the whole process, keyed by data path and test ratio
+    __data_cache: dict[tuple[str, float], dict[str, Union[pd.DataFrame, 'IndexedDataSetView']]] = {}
+
     def __init__(self, data_path: str, initial_budget: float, max_amount_of_trades: int, window_size: int,
                  validator: RewardValidatorBase, label_annotator: LabelAnnotatorBase, sell_stop_loss: float,
                  sell_take_profit: float, buy_stop_loss: float, buy_take_profit: float, test_ratio: float = 0.2,
@@ -39,6 +45,8 @@ class TradingEnvironment(Env):
 
         Parameters:
             data_path (str): Path to CSV data that should be used as enivronmental stock market.
+                Data set in indexed binary layout can be given as local path or S3 URL, in which
+                case rows are fetched lazily only when they are used.
             initial_budget (float): Initial budget constant for trader to start from.
             max_amount_of_trades (int): Max amount of trades that can be ongoing at the same time.
                 Seting this constant prevents traders from placing orders randomly and defines
@@ -71,7 +79,7 @@ class TradingEnvironment(Env):
         if test_ratio < 0.0 or test_ratio >= 1.0:
             raise ValueError(f"Invalid test_ratio: {test_ratio}. It should be in range [0, 1).")
 
-        self.__data: dict[pd.DataFrame, pd.DataFrame] = self.__load_data(data_path, test_ratio)
+        self.__data: dict[str, Union[pd.DataFrame, 'IndexedDataSetView']] = self.__load_data(data_path, test_ratio)
         self.__mode = TradingEnvironment.TRAIN_MODE
         self.__broker: Broker = Broker()
         self.__validator: RewardValidatorBase = validator
@@ -106,20 +114,87 @@ class TradingEnvironment(Env):
                                           high = np.ones(len(self.state)) * 3,
                                           dtype=np.float64)
 
-    def __load_data(self, data_path: str, test_size: float) -> dict[pd.DataFrame, pd.DataFrame]:
+    @classmethod
+    def preload_data(cls, data_path: str, test_ratio: float = 0.2) -> None:
+        """
+        Loads data once for the whole process, so environments created later with the same
+        data path and test ratio share it instead of loading it again. Preloaded data is
+        also shared with processes forked afterwards.
+
+        Parameters:
+            data_path (str): Path to CSV data, or local path or S3 URL of indexed data set.
+            test_ratio (float): Ratio of data that should be used for testing purposes.
+        """
+
+        cls.__data_cache[(data_path, test_ratio)] = cls.__read_data(data_path, test_ratio)
+
+    @classmethod
+    def clear_data_cache(cls) -> None:
+        """
+        Clears preloaded data.
+        """
+
+        cls.__data_cache.clear()
+
+    def __load_data(self, data_path: str, test_size: float) -> dict[str, Union[pd.DataFrame, 'IndexedDataSetView']]:
+        """
+        Returns preloaded data if there is any for given data path and test size, otherwise
+        reads it.
+
+        Parameters:
+            data_path (str): Path to the CSV file containing the stock market data, or
+                local path or S3 URL of indexed data set.
+            test_size (float): Ratio of the data to be used for testing.
+
+        Returns:
+            (dict[str, Union[pd.DataFrame, IndexedDataSetView]]): Dictionary containing training
+                and testing data frames or views.
+        """
+
+        cached_data = TradingEnvironment.__data_cache.get((data_path, test_size))
+        if cached_data is not None:
+            return dict(cached_data)
+
+        return TradingEnvironment.__read_data(data_path, test_size)
+
+    @staticmethod
+    def __read_data(data_path: str, test_size: float) -> dict[str, Union[pd.DataFrame, 'IndexedDataSetView']]:
         """
         Loads data from CSV file and splits it into training and testing sets based on the
-        specified test size ratio.
+        specified test size ratio. Compressed files are detected and decompressed while reading.
+        Data sets in indexed binary layout are not read at once, only views over their
+        training and testing rows are created.
 
         Parameters:
-            data_path (str): Path to the CSV file containing the stock market data.
+            data_path (str): Path to the CSV file containing the stock market data, or
+                local path or S3 URL of indexed data set.
             test_size (float): Ratio of the data to be used for testing.
 
         Returns:
-            (dict[pd.DataFrame, pd.DataFrame]): Dictionary containing training and testing data frames.
+            (dict[str, Union[pd.DataFrame, IndexedDataSetView]]): Dictionary containing training
+                and testing data frames or views.
         """
 
-        data_frame = pd.read_csv(data_path)
+        # Imported here, as utils package imports environment package itself
+        from source.utils import CompressionHandler, IndexedDataSetReader, IndexedDataSetView
+
+        url_parsed = urllib.parse.urlparse(data_path)
+        if url_parsed.scheme == 's3' or IndexedDataSetReader.is_indexed_data_set(data_path):
+            if url_parsed.scheme == 's3':
+                from source.aws import AWSHandler
+                reader = IndexedDataSetReader.from_s3(AWSHandler.get_handler(os.getenv('ROLE_NAME')),
+                                                      url_parsed.netloc, url_parsed.path.lstrip('/'))
+            else:
+                reader = IndexedDataSetReader.from_file(data_path)
+            dividing_index = int(len(reader) * (1 - test_size))
+
+            return {
+                TradingEnvironment.TRAIN_MODE: IndexedDataSetView(reader, 0, dividing_index),
+                TradingEnvironment.TEST_MODE: IndexedDataSetView(reader, dividing_index, len(reader))
+            }
+
+        compression = CompressionHandler().detect_file_compression(data_path)
+        data_frame = pd.read_csv(data_path, compression = compression)
         dividing_index = int(len(data_frame) * (1 - test_size))
 
         return {
@@ -127,6 +202,35 @@ class TradingEnvironment(Env):
             TradingEnvironment.TEST_MODE: data_frame.iloc[dividing_index:].reset_index(drop=True)
         }
 
+    def __get_rows(self, start: Optional[int], stop: Optional[int]) -> pd.DataFrame:
+        """
+        Returns range of rows of data for current mode, fetching them first if data is lazily loaded.
+
+        Parameters:
+            start (Optional[int]): Index of the first row.
+            stop (Optional[int]): Index of row after the last one.
+
+        Returns:
+            (pd.DataFrame): Requested rows.
+        """
+
+        data = self.__data[self.__mode]
+        if isinstance(data, pd.DataFrame):
+            return data.iloc[start:stop]
+
+        return data.get_rows(start, stop)
+
+    def __get_data_frame(self) -> pd.DataFrame:
+        """
+        Returns whole data for current mode.
+
+        Returns:
+            (pd.DataFrame): Data for current mode.
+        """
+
+        data = self.__data[self.__mode]
+        return data if isinstance(data, pd.DataFrame) else data.to_data_frame()
+
     def __prepare_labeled_data(self) -> pd.DataFrame:
         """"""
 
@@ -138,7 +242,7 @@ class TradingEnvironment(Env):
         logging.info(f"New Rows Count: {len(self.__data[self.__mode])}")
         new_data = pd.DataFrame(new_rows, columns=[f"feature_{i}" for i in range(len(new_rows[0]))])
         logging.info(f"New Data Shape: {new_data.shape}")
-        labels = self.__label_annotator.annotate(self.__data[self.__mode]).shift(-self.current_iteration)
+        labels = self.__label_annotator.annotate(self.__get_data_frame()).shift(-self.current_iteration)
         logging.info(f"Labels NaN Count: {labels.shape}")
 
         return new_data, labels.dropna()
@@ -156,7 +260,7 @@ class TradingEnvironment(Env):
         if index is None:
             index = slice(self.current_iteration - self.__trading_consts.WINDOW_SIZE, self.current_iteration)
 
-        current_market_data = self.__data[self.__mode].iloc[index]
+        current_market_data = self.__get_rows(index.start, index.stop)
         current_market_data_no_index = current_market_data.select_dtypes(include = [np.number])
         normalized_current_market_data_values = pd.DataFrame(MinMaxScaler().fit_transform(current_market_data_no_index),
                                                              columns = current_market_data_no_index.columns).values
@@ -247,9 +351,13 @@ class TradingEnvironment(Env):
 
         return (self.__trading_consts.WINDOW_SIZE, self.__data[self.__mode].shape[1] - 1)
 
+    @PhaseProfiler.measure('labeled_data_generation')
     def get_labeled_data(self) -> tuple[np.ndarray, np.ndarray]:
         """"""
 
+        # TensorFlow is imported only here, so that environment can be used without loading it
+        from tensorflow.keras.utils import to_categorical
+
         input_data, output_data = self.__prepare_labeled_data()
         logging.info(f"Here Input data shape: {input_data.shape}, Output data shape: {output_data.shape}")
         input_data = np.expand_dims(np.array(input_data), axis = 1)
@@ -272,7 +380,8 @@ class TradingEnvironment(Env):
                 over specified iterations.
         """
 
-        return copy.copy(self.__data[self.__mode].loc[start:stop:step, columns].values.ravel().tolist())
+        # Range of labels is inclusive, like in case of data frame loc accessor
+        return copy.copy(self.__get_rows(start, stop + 1)[columns].iloc[::step].values.ravel().tolist())
 
     def step(self, action: int) -> tuple[list[float], float, bool, dict]:
         """
@@ -289,10 +398,12 @@ class TradingEnvironment(Env):
                 state, reward, finish indication and additional info dictionary.
         """
 
+        start_time = time.perf_counter()
+        PhaseProfiler.count(PhaseProfiler.ENVIRONMENT_STEPS)
         self.current_iteration += 1
         self.state = self.__prepare_state_data()
 
-        close_changes = self.__data[self.__mode].iloc[self.current_iteration - 2 : self.current_iteration]['close'].values
+        close_changes = self.__get_rows(self.current_iteration - 2, self.current_iteration)['close'].values
         stock_change_coeff = 1 + (close_changes[1] - close_changes[0]) / close_changes[0]
         closed_orders= self.__broker.update_orders(stock_change_coeff)
 
@@ -354,6 +465,7 @@ class TradingEnvironment(Env):
                 'no_trades_placed_for': self.__trading_data.no_trades_placed_for,
                 'currently_placed_trades': self.__trading_data.currently_placed_trades}
 
+        MetricsExporter.observe_environment_step(time.perf_counter() - start_time)
         return self.state, reward, done, info
 
     def render(self) -> None:
@@ -49,4 +49,43 @@ class BollingerBandsIndicatorHandler(IndicatorHandlerBase):
 
         print(f"Bollinger Bands NaN Count: {bollinger_df.replace(np.nan, 0).notna().sum()}")
         bollinger_df = bollinger_df.fillna(0)
-        return bollinger_df
\ No newline at end of file
+        return bollinger_df
+
+    def get_warm_up_period(self) -> Optional[int]:
+        """
+        Returns number of preceding rows needed to calculate indicator incrementally.
+        Window of rows preceding the newest one.
+
+        Returns:
+            (Optional[int]): Number of preceding rows.
+        """
+
+        return self.window_size - 1
+
+    def calculate_panel(self, panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Calculates Bollinger Bands indicator values column-wise for many symbols.
+
+        Parameters:
+            panel (dict[str, pd.DataFrame]): Dictionary mapping input column names onto
+                data frames with one column per symbol.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Calculated Bollinger Bands values per symbol.
+        """
+
+        close = panel['close']
+        middle_band = close.rolling(window=self.window_size, min_periods=1).mean()
+        rolling_std = close.rolling(window=self.window_size, min_periods=1).std()
+        upper_band = middle_band + (self.num_std_dev * rolling_std)
+        lower_band = middle_band - (self.num_std_dev * rolling_std)
+
+        bollinger_panel = {
+            'BB_middle': middle_band,
+            'BB_upper': upper_band,
+            'BB_lower': lower_band,
+            'BB_bandwidth': (upper_band - lower_band) / middle_band,
+            'BB_percent_b': (close - lower_band) / (upper_band - lower_band)
+        }
+
+        return {column: frame.fillna(0) for column, frame in bollinger_panel.items()}
\ No newline at end of file
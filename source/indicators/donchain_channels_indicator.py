@@ -35,4 +35,36 @@ class DonchainChannelsIndicatorHandler(IndicatorHandlerBase):
         donchian_df['lower_channel'] = data['low'].rolling(window = self.window_size, min_periods = 1).min()
         donchian_df['middle_channel'] = (donchian_df['upper_channel'] + donchian_df['lower_channel']) / 2
 
-        return donchian_df
\ No newline at end of file
+        return donchian_df
+
+    def get_warm_up_period(self) -> Optional[int]:
+        """
+        Returns number of preceding rows needed to calculate indicator incrementally.
+        Window of rows preceding the newest one.
+
+        Returns:
+            (Optional[int]): Number of preceding rows.
+        """
+
+        return self.window_size - 1
+
+    def calculate_panel(self, panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Calculates donchain channels indicator values column-wise for many symbols.
+
+        Parameters:
+            panel (dict[str, pd.DataFrame]): Dictionary mapping input column names onto
+                data frames with one column per symbol.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Calculated donchain channels values per symbol.
+        """
+
+        upper_channel = panel['high'].rolling(window = self.window_size, min_periods = 1).max()
+        lower_channel = panel['low'].rolling(window = self.window_size, min_periods = 1).min()
+
+        return {
+            'upper_channel': upper_channel,
+            'lower_channel': lower_channel,
+            'middle_channel': (upper_channel + lower_channel) / 2
+        }
\ No newline at end of file
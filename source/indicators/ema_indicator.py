@@ -32,4 +32,29 @@ class ExponentialMovingAverageIndicatorHandler(IndicatorHandlerBase):
         ema_df[f'EMA_{self.window_size}'] = data['close'].ewm(span=self.window_size, adjust=False).mean()
 
         print(f"EMA NaN Count: {ema_df.notna().sum()}")
-        return ema_df
\ No newline at end of file
+        return ema_df
+
+    def get_warm_up_period(self) -> Optional[int]:
+        """
+        Returns number of preceding rows needed to calculate indicator incrementally.
+        EMA depends on the whole history, but influence of old values decays exponentially.
+
+        Returns:
+            (Optional[int]): Number of preceding rows.
+        """
+
+        return EWM_WARM_UP_SPANS * self.window_size
+
+    def calculate_panel(self, panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Calculates the EMA indicator column-wise for many symbols.
+
+        Parameters:
+            panel (dict[str, pd.DataFrame]): Dictionary mapping input column names onto
+                data frames with one column per symbol.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Calculated EMA values per symbol.
+        """
+
+        return {f'EMA_{self.window_size}': panel['close'].ewm(span=self.window_size, adjust=False).mean()}
\ No newline at end of file
@@ -2,6 +2,13 @@
 
 import pandas as pd
 import numpy as np
+from typing import Optional
+
+"""
+Number of spans that exponentially weighted indicators are warmed up over. Influence of
+values preceding warm-up drops below (1 - 2 / (span + 1)) ** (EWM_WARM_UP_SPANS * span).
+"""
+EWM_WARM_UP_SPANS = 10
 
 class IndicatorHandlerBase():
     """
@@ -28,3 +35,60 @@ class IndicatorHandlerBase():
         """
 
         raise NotImplementedError("Subclasses must implement this method.")
+
+    def calculate_panel(self, panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Calculates indicator values for many symbols at once. Panel maps input column
+        names (e.g. 'close') onto data frames aligned as time x symbol. Default
+        implementation falls back to calculating indicator separately for each symbol,
+        derivative classes override it with column-wise vectorized calculation.
+
+        Parameters:
+            panel (dict[str, pd.DataFrame]): Dictionary mapping input column names onto
+                data frames with one column per symbol.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Dictionary mapping output column names onto
+                data frames with one column per symbol.
+        """
+
+        any_panel_frame = next(iter(panel.values()))
+        output_columns: dict[str, dict[str, pd.Series]] = {}
+        for symbol in any_panel_frame.columns:
+            symbol_data = pd.DataFrame({column: frame[symbol] for column, frame in panel.items()})
+            symbol_output = self.calculate(symbol_data)
+            for column in symbol_output.columns:
+                output_columns.setdefault(column, {})[symbol] = symbol_output[column]
+
+        return {column: pd.DataFrame(series, index = any_panel_frame.index, columns = any_panel_frame.columns)
+                for column, series in output_columns.items()}
+
+    def get_warm_up_period(self) -> Optional[int]:
+        """
+        Returns number of preceding rows needed to calculate indicator values for new rows
+        the same way as they would be calculated over the whole history. It allows indicator
+        to be calculated incrementally, e.g. while streaming or appending data.
+
+        Returns:
+            (Optional[int]): Number of preceding rows, or None if indicator depends on
+                the whole history and can not be calculated incrementally.
+        """
+
+        return None
+
+    def calculate_continuation(self, data: pd.DataFrame, previous_output: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculates indicator values for data preceded by warm-up rows, continuing previously
+        calculated output. Indicators carrying state over the whole history override it
+        to adjust new values to the previous output.
+
+        Parameters:
+            data (pd.DataFrame): Data frame with warm-up rows followed by new input data.
+            previous_output (pd.DataFrame): Previously calculated output, ending at the
+                last warm-up row.
+
+        Returns:
+            (pd.DataFrame): Output data with calculated values for all given rows.
+        """
+
+        return self.calculate(data)
\ No newline at end of file
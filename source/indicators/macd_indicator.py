@@ -47,4 +47,38 @@ class MACDIndicatorHandler(IndicatorHandlerBase):
         macd_df['MACD_histogram'] = macd_df['MACD_line'] - macd_df['MACD_signal']
 
         print(f"MACD NaN Count: {macd_df.notna().sum()}")
-        return macd_df
\ No newline at end of file
+        return macd_df
+
+    def get_warm_up_period(self) -> Optional[int]:
+        """
+        Returns number of preceding rows needed to calculate indicator incrementally.
+        Warm-up covers both slow EMA and signal line smoothing.
+
+        Returns:
+            (Optional[int]): Number of preceding rows.
+        """
+
+        return EWM_WARM_UP_SPANS * (self.slow_period + self.signal_period)
+
+    def calculate_panel(self, panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Calculates MACD indicator values column-wise for many symbols.
+
+        Parameters:
+            panel (dict[str, pd.DataFrame]): Dictionary mapping input column names onto
+                data frames with one column per symbol.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Calculated MACD values per symbol.
+        """
+
+        fast_ema = panel['close'].ewm(span=self.fast_period, adjust=False).mean()
+        slow_ema = panel['close'].ewm(span=self.slow_period, adjust=False).mean()
+        macd_line = fast_ema - slow_ema
+        macd_signal = macd_line.ewm(span=self.signal_period, adjust=False).mean()
+
+        return {
+            'MACD_line': macd_line,
+            'MACD_signal': macd_signal,
+            'MACD_histogram': macd_line - macd_signal
+        }
\ No newline at end of file
@@ -41,4 +41,15 @@ class MovingVolumeProfileIndicatorHandler(VolumeProfileIndicatorHandler):
             volume_profiles_connected_to_lower_prices = volume_profiles_data['price'] <= current_average_price
             moving_volume_price_df.loc[index, 'moving_volume_profile'] = volume_profiles_data[volume_profiles_connected_to_lower_prices]['volume'].iloc[-1]
 
-        return moving_volume_price_df
\ No newline at end of file
+        return moving_volume_price_df
+
+    def get_warm_up_period(self) -> Optional[int]:
+        """
+        Returns number of preceding rows needed to calculate indicator incrementally.
+        Window of rows that volume profile is built over.
+
+        Returns:
+            (Optional[int]): Number of preceding rows.
+        """
+
+        return self.window_size
\ No newline at end of file
@@ -45,4 +45,56 @@ class OnBalanceVolumeIndicatorHandler(IndicatorHandlerBase):
         obv_df['OBV'] = obv
 
         print(f"On-Balance Volume NaN Count: {obv_df.notna().sum()}")
-        return obv_df
\ No newline at end of file
+        return obv_df
+
+    def get_warm_up_period(self) -> Optional[int]:
+        """
+        Returns number of preceding rows needed to calculate indicator incrementally.
+        Single preceding row is needed to tell price change direction.
+
+        Returns:
+            (Optional[int]): Number of preceding rows.
+        """
+
+        return 1
+
+    def calculate_continuation(self, data: pd.DataFrame, previous_output: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculates OBV indicator values continuing previous output. OBV accumulates volume
+        over the whole history, so values are shifted to match previous output at the
+        last warm-up row.
+
+        Parameters:
+            data (pd.DataFrame): Data frame with warm-up rows followed by new input data.
+            previous_output (pd.DataFrame): Previously calculated output, ending at the
+                last warm-up row.
+
+        Returns:
+            (pd.DataFrame): Output data with calculated OBV values.
+        """
+
+        obv_df = self.calculate(data)
+        if previous_output is not None and not previous_output.empty:
+            last_previous_index = previous_output.index[-1]
+            obv_df['OBV'] += previous_output['OBV'].iloc[-1] - obv_df.loc[last_previous_index, 'OBV']
+
+        return obv_df
+
+    def calculate_panel(self, panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Calculates OBV indicator values column-wise for many symbols. Instead of
+        iterating over rows, signed volume is accumulated with a single cumulative sum.
+
+        Parameters:
+            panel (dict[str, pd.DataFrame]): Dictionary mapping input column names onto
+                data frames with one column per symbol.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Calculated OBV values per symbol.
+        """
+
+        close_change_sign = np.sign(panel['close'].diff()).fillna(0)
+        signed_volume = close_change_sign * panel['volume']
+        signed_volume.iloc[0] = 0
+
+        return {'OBV': signed_volume.cumsum()}
\ No newline at end of file
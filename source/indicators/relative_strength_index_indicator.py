@@ -51,4 +51,34 @@ class RelativeStrengthIndexIndicatorHandler(IndicatorHandlerBase):
         rsi_df['RSI'] = rsi_df['RSI'].fillna(50)  # Neutral RSI when there's no data
 
         print(f"RSI NaN Count: {rsi_df.notna().sum()}")
-        return rsi_df
\ No newline at end of file
+        return rsi_df
+
+    def get_warm_up_period(self) -> Optional[int]:
+        """
+        Returns number of preceding rows needed to calculate indicator incrementally.
+        Window of price changes, each needing one preceding row.
+
+        Returns:
+            (Optional[int]): Number of preceding rows.
+        """
+
+        return self.window_size
+
+    def calculate_panel(self, panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Calculates RSI indicator values column-wise for many symbols.
+
+        Parameters:
+            panel (dict[str, pd.DataFrame]): Dictionary mapping input column names onto
+                data frames with one column per symbol.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Calculated RSI values per symbol.
+        """
+
+        delta = panel['close'].diff()
+        avg_gain = delta.clip(lower=0).rolling(window=self.window_size, min_periods=1).mean()
+        avg_loss = (-delta.clip(upper=0)).rolling(window=self.window_size, min_periods=1).mean()
+        rs = avg_gain / avg_loss
+
+        return {'RSI': (100 - (100 / (1 + rs))).fillna(50)}
\ No newline at end of file
@@ -43,4 +43,36 @@ class StochasticOscillatorIndicatorHandler(IndicatorHandlerBase):
         stochastic_data_df['K%'] = 100 * ((close_series - lowest_low) / (highest_high - lowest_low))
         stochastic_data_df['D%'] = stochastic_data_df['K%'].rolling(window = self.d_period, min_periods = 1).mean()
 
-        return stochastic_data_df
\ No newline at end of file
+        return stochastic_data_df
+
+    def get_warm_up_period(self) -> Optional[int]:
+        """
+        Returns number of preceding rows needed to calculate indicator incrementally.
+        Rows needed to smooth K% values calculated over preceding windows.
+
+        Returns:
+            (Optional[int]): Number of preceding rows.
+        """
+
+        return self.window_size + self.d_period - 2
+
+    def calculate_panel(self, panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Calculates stochastic oscillator indicator values column-wise for many symbols.
+
+        Parameters:
+            panel (dict[str, pd.DataFrame]): Dictionary mapping input column names onto
+                data frames with one column per symbol.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Calculated stochastic oscillator values per symbol.
+        """
+
+        highest_high = panel['high'].rolling(window = self.window_size, min_periods = 1).max()
+        lowest_low = panel['low'].rolling(window = self.window_size, min_periods = 1).min()
+        k_percent = 100 * ((panel['close'] - lowest_low) / (highest_high - lowest_low))
+
+        return {
+            'K%': k_percent,
+            'D%': k_percent.rolling(window = self.d_period, min_periods = 1).mean()
+        }
\ No newline at end of file
@@ -43,4 +43,31 @@ class VolatilityIndicatorHandler(IndicatorHandlerBase):
 
         print(f"Volatility NaN Count: {volatility_df.isna().sum()}")
 
-        return volatility_df
\ No newline at end of file
+        return volatility_df
+
+    def get_warm_up_period(self) -> Optional[int]:
+        """
+        Returns number of preceding rows needed to calculate indicator incrementally.
+        Window of percentage changes, each needing one preceding row.
+
+        Returns:
+            (Optional[int]): Number of preceding rows.
+        """
+
+        return self.window_size
+
+    def calculate_panel(self, panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Calculates volatility indicator values column-wise for many symbols.
+
+        Parameters:
+            panel (dict[str, pd.DataFrame]): Dictionary mapping input column names onto
+                data frames with one column per symbol.
+
+        Returns:
+            (dict[str, pd.DataFrame]): Calculated volatility values per symbol.
+        """
+
+        pct_changes = panel['close'].pct_change()
+
+        return {'volatility': pct_changes.rolling(window=self.window_size, min_periods=1).std().fillna(0)}
\ No newline at end of file
@@ -1,14 +1,26 @@
 # model/__init__.py
 
-from .model_building_blocks.inception_block import InceptionBlock
-from .model_building_blocks.se_block import SEBlock
-from .model_building_blocks.vgg16_block import Vgg16Block
-from .model_building_blocks.xception_block import XceptionBlock
-from .model_adapters.model_adapter_base import ModelAdapterBase
-from .model_adapters.tf_model_adapter import TFModelAdapter
-from .model_adapters.sci_kit_learn_model_adapter import SciKitLearnModelAdapter
-from .model_blue_prints.blue_print_base import BluePrintBase
-from .model_blue_prints.mock_blue_print import MockBluePrint
-from .model_blue_prints.vggception_cnn_blue_print import VGGceptionCnnBluePrint
-from .model_blue_prints.svm_blue_print import SVMBluePrint
-from .model_blue_prints.cdt_1d_cnn_blue_print import CDT1DCnnBluePrint
\ No newline at end of file
+from source.utils import LazyLoader
+
+"""
+Names exported by package, mapped onto modules they are defined in. Modules are
+imported only on first access, as most of them load TensorFlow.
+"""
+__exports = {
+    'InceptionBlock': '.model_building_blocks.inception_block',
+    'SEBlock': '.model_building_blocks.se_block',
+    'Vgg16Block': '.model_building_blocks.vgg16_block',
+    'XceptionBlock': '.model_building_blocks.xception_block',
+    'ModelAdapterBase': '.model_adapters.model_adapter_base',
+    'TFModelAdapter': '.model_adapters.tf_model_adapter',
+    'SciKitLearnModelAdapter': '.model_adapters.sci_kit_learn_model_adapter',
+    'BluePrintBase': '.model_blue_prints.blue_print_base',
+    'MockBluePrint': '.model_blue_prints.mock_blue_print',
+    'VGGceptionCnnBluePrint': '.model_blue_prints.vggception_cnn_blue_print',
+    'SVMBluePrint': '.model_blue_prints.svm_blue_print',
+    'CDT1DCnnBluePrint': '.model_blue_prints.cdt_1d_cnn_blue_print'
+}
+__all__ = list(__exports)
+__lazy_loader = LazyLoader(__name__, __exports)
+__getattr__ = __lazy_loader.load
+__dir__ = __lazy_loader.list_names
@@ -1,4 +1,21 @@
 # training/__init__.py
 
-from .training_config import TrainingConfig
-from .training_handler import TrainingHandler
\ No newline at end of file
+from source.utils import LazyLoader
+
+"""
+Names exported by package, mapped onto modules they are defined in. Modules are
+imported only on first access, as most of them load TensorFlow, keras-rl or reportlab.
+"""
+__exports = {
+    'TrainingConfig': '.training_config',
+    'TrainingHandler': '.training_handler',
+    'TrainingConfigFactory': '.training_config_factory',
+    'SweepRunner': '.sweep_runner',
+    'SuccessiveHalvingScheduler': '.successive_halving_scheduler',
+    'WorkerClient': '.worker_client',
+    'WorkerDaemon': '.worker_daemon'
+}
+__all__ = list(__exports)
+__lazy_loader = LazyLoader(__name__, __exports)
+__getattr__ = __lazy_loader.load
+__dir__ = __lazy_loader.list_names
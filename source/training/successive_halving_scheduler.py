@@ -0,0 +1,270 @@
+# training/successive_halving_scheduler.py
+
+# global imports
+import copy
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional
+import pandas as pd
+
+# local imports
+from source.training import SweepRunner
+
+class SuccessiveHalvingScheduler():
+    """
+    Responsible for early stopping of hyperparameter sweep trials with asynchronous
+    successive halving (ASHA). Trials are trained in rungs of growing number of episodes.
+    After each rung agent is tested, and trial is promoted to the next rung only if its
+    metric is in top 1 / reduction_factor of trials that finished that rung so far.
+    Promotion does not wait for the whole rung to finish, so workers are never idle.
+    Number of steps is split between rungs in proportion to their episodes, so trial
+    reaching the last rung is trained for the same number of steps as a single run.
+    Promoted trials resume training from weights saved at the end of previous rung.
+    Only weights are carried over, so state of agent is not. For DQN strategy each rung
+    starts with empty replay memory and repeats warm-up steps and exploration annealing,
+    hence trial reaching the last rung is not trained the same way as a single run of
+    max_episodes would be.
+    """
+
+    # Constants used locally
+    DEFAULT_REDUCTION_FACTOR = 3
+    DEFAULT_MIN_EPISODES = 1
+
+    def __init__(self, trials: list[dict[str, Any]], weights_directory: str, metric: str,
+                 maximize: bool = True, min_episodes: int = DEFAULT_MIN_EPISODES,
+                 reduction_factor: int = DEFAULT_REDUCTION_FACTOR, max_episodes: Optional[int] = None,
+                 max_workers: Optional[int] = None, threads_per_worker: Optional[int] = None) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            trials (list[dict[str, Any]]): Trials created by SweepRunner's generate_trials.
+            weights_directory (str): Path to directory that weights of trials are saved in.
+            metric (str): Name of test metric returned by TrainingHandler's get_test_metrics,
+                e.g. 'accuracy' or 'final_assets_value'.
+            maximize (bool): Indicates if higher metric values are better.
+            min_episodes (int): Number of episodes trained in the first rung.
+            reduction_factor (int): Factor that number of episodes grows by, and number of
+                promoted trials shrinks by, between rungs.
+            max_episodes (Optional[int]): Number of episodes that the best trials are trained for.
+                Defaults to nr_of_episodes of the first trial.
+            max_workers (Optional[int]): Number of rungs trained at once. Defaults to number of CPUs.
+            threads_per_worker (Optional[int]): Number of CPU threads used by single rung.
+                Defaults to even share of CPUs.
+
+        Raises:
+            ValueError: If there are no trials, or reduction factor or episodes are invalid.
+        """
+
+        if not trials:
+            raise ValueError('At least one trial is needed!')
+        if reduction_factor < 2:
+            raise ValueError(f'Invalid reduction factor: {reduction_factor}. It should be at least 2.')
+        if max_episodes is None:
+            max_episodes = trials[0]['training_config']['nr_of_episodes']
+        if min_episodes < 1 or min_episodes > max_episodes:
+            raise ValueError(f'Invalid min episodes: {min_episodes}. It should be between 1 and {max_episodes}.')
+
+        cpu_count = os.cpu_count() or 1
+        self.__trials: dict[int, dict[str, Any]] = {trial['trial_id']: trial for trial in trials}
+        self.__weights_directory: str = weights_directory
+        self.__metric: str = metric
+        self.__maximize: bool = maximize
+        self.__reduction_factor: int = reduction_factor
+        self.__max_workers: int = max_workers if max_workers is not None else cpu_count
+        self.__threads_per_worker: int = threads_per_worker if threads_per_worker is not None \
+            else max(1, cpu_count // self.__max_workers)
+
+        # Total number of episodes trained at the end of each rung
+        self.__rung_episodes: list[int] = []
+        episodes = min_episodes
+        while episodes < max_episodes:
+            self.__rung_episodes.append(episodes)
+            episodes *= reduction_factor
+        self.__rung_episodes.append(max_episodes)
+
+        os.makedirs(weights_directory, exist_ok = True)
+
+    def get_rung_episodes(self) -> list[int]:
+        """
+        Returns total number of episodes trained at the end of each rung.
+
+        Returns:
+            (list[int]): Number of episodes per rung.
+        """
+
+        return list(self.__rung_episodes)
+
+    def __get_weights_path(self, trial_id: int, rung: int) -> str:
+        """
+        Returns path of weights saved at the end of rung.
+
+        Parameters:
+            trial_id (int): Id of trial.
+            rung (int): Index of rung.
+
+        Returns:
+            (str): Path to weights file.
+        """
+
+        return os.path.join(self.__weights_directory, f'trial_{trial_id}_rung_{rung}.h5')
+
+    def __create_job(self, trial_id: int, rung: int) -> dict[str, Any]:
+        """
+        Creates job training trial through single rung, resuming from weights of previous one.
+        Rung is given its share of episodes and steps, as DQN strategy trains for nr_of_steps
+        regardless of nr_of_episodes, and classification strategy derives batch size from their
+        ratio. Step counter and replay memory of keras-rl agent are not restored, so every rung
+        starts its warm-up and exploration annealing anew.
+
+        Parameters:
+            trial_id (int): Id of trial.
+            rung (int): Index of rung.
+
+        Returns:
+            (dict[str, Any]): Trial accepted by SweepRunner's run_trial.
+        """
+
+        job = copy.deepcopy(self.__trials[trial_id])
+        training_config = job['training_config']
+        previous_episodes = self.__rung_episodes[rung - 1] if rung > 0 else 0
+        max_episodes = self.__rung_episodes[-1]
+        training_config['nr_of_episodes'] = self.__rung_episodes[rung] - previous_episodes
+        if 'nr_of_steps' in training_config:
+            # Steps are rounded on totals, so that rungs of trial sum up to nr_of_steps
+            nr_of_steps = training_config['nr_of_steps']
+            training_config['nr_of_steps'] = max(1, nr_of_steps * self.__rung_episodes[rung] // max_episodes -
+                                                 nr_of_steps * previous_episodes // max_episodes)
+        job['weights_load_path'] = self.__get_weights_path(trial_id, rung - 1) if rung > 0 else None
+        job['weights_save_path'] = self.__get_weights_path(trial_id, rung)
+
+        return job
+
+    def __get_promotion(self, rungs: list[dict[int, Optional[float]]],
+                        promoted: list[set[int]]) -> Optional[tuple[int, int]]:
+        """
+        Looks for trial that can be promoted, starting from the highest rung.
+
+        Parameters:
+            rungs (list[dict[int, Optional[float]]]): Metric of each trial that finished given rung,
+                None if it failed.
+            promoted (list[set[int]]): Ids of trials already promoted from given rung.
+
+        Returns:
+            (Optional[tuple[int, int]]): Id of trial and index of rung that it can be promoted
+                from, if there is any.
+        """
+
+        for rung in reversed(range(len(self.__rung_episodes) - 1)):
+            finished = [(trial_id, value) for trial_id, value in rungs[rung].items() if value is not None]
+            finished.sort(key = lambda item: item[1], reverse = self.__maximize)
+            nr_of_promotions = len(rungs[rung]) // self.__reduction_factor
+            for trial_id, _ in finished[:nr_of_promotions]:
+                if trial_id not in promoted[rung]:
+                    promoted[rung].add(trial_id)
+                    return trial_id, rung
+
+        return None
+
+    def __create_executor(self, context: Any, worker_data_keys: list[tuple[str, float]]) -> ProcessPoolExecutor:
+        """
+        Creates process pool whose workers are limited to their share of CPU threads.
+
+        Parameters:
+            context (Any): Multiprocessing context used to start workers.
+            worker_data_keys (list[tuple[str, float]]): Data paths and test ratios to be preloaded
+                by workers.
+
+        Returns:
+            (ProcessPoolExecutor): Created process pool.
+        """
+
+        return ProcessPoolExecutor(self.__max_workers, mp_context = context,
+                                   initializer = SweepRunner.initialize_worker,
+                                   initargs = (self.__threads_per_worker, worker_data_keys))
+
+    def run(self) -> pd.DataFrame:
+        """
+        Runs sweep with early stopping.
+
+        Returns:
+            (pd.DataFrame): Table of results with one row per trial, ordered by trial id. Each row
+                describes the last rung trial reached, with total number of episodes and duration.
+        """
+
+        trials = list(self.__trials.values())
+        data_keys = SweepRunner.get_data_keys(trials)
+        SweepRunner.preload_data(data_keys)
+
+        # Forked workers share preloaded data with parent, spawned ones load it once each
+        start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        context = multiprocessing.get_context(start_method)
+        worker_data_keys = data_keys if start_method != 'fork' else []
+        logging.info(f'Running {len(trials)} trials in rungs of {self.__rung_episodes} episodes.')
+
+        rungs: list[dict[int, Optional[float]]] = [{} for _ in self.__rung_episodes]
+        promoted: list[set[int]] = [set() for _ in self.__rung_episodes]
+        results: dict[int, dict[str, Any]] = {}
+        durations: dict[int, float] = {trial['trial_id']: 0.0 for trial in trials}
+        waiting_trials = deque(trial['trial_id'] for trial in trials)
+        running: dict[Future, tuple[int, int]] = {}
+
+        executor = self.__create_executor(context, worker_data_keys)
+        try:
+            while True:
+                while len(running) < self.__max_workers:
+                    promotion = self.__get_promotion(rungs, promoted)
+                    if promotion is not None:
+                        trial_id, rung = promotion[0], promotion[1] + 1
+                        logging.info(f'Promoting trial {trial_id} to rung {rung}.')
+                    elif waiting_trials:
+                        trial_id, rung = waiting_trials.popleft(), 0
+                    else:
+                        break
+                    running[executor.submit(SweepRunner.run_trial, self.__create_job(trial_id, rung))] = (trial_id, rung)
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when = FIRST_COMPLETED)
+                finished_jobs, crashed_jobs = [], []
+                for future in done:
+                    job = running.pop(future)
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        crashed_jobs.append(job)
+                    else:
+                        finished_jobs.append((job, future.result()))
+
+                # Pool can not be used after any of its worker processes died, so new one is created. All
+                # jobs that were running in it are rerun one at a time, so that only the one that crashed
+                # its worker is recorded as crashed
+                if crashed_jobs:
+                    executor.shutdown(wait = True)
+                    for future, job in running.items():
+                        if isinstance(future.exception(), BrokenProcessPool):
+                            crashed_jobs.append(job)
+                        else:
+                            finished_jobs.append((job, future.result()))
+                    running.clear()
+                    logging.warning(f'Worker pool crashed, rerunning {len(crashed_jobs)} jobs one at a time.')
+                    for trial_id, rung in crashed_jobs:
+                        result = SweepRunner.run_isolated_trial(self.__create_job(trial_id, rung), context,
+                                                                self.__threads_per_worker, worker_data_keys)
+                        finished_jobs.append(((trial_id, rung), result))
+                    executor = self.__create_executor(context, worker_data_keys)
+
+                for (trial_id, rung), result in finished_jobs:
+                    durations[trial_id] += result['duration']
+                    value = result.get(self.__metric, None) if result['status'] == 'finished' else None
+                    rungs[rung][trial_id] = value
+                    results[trial_id] = {**result, 'rung': rung, 'episodes': self.__rung_episodes[rung],
+                                         'duration': durations[trial_id]}
+                    logging.info(f'Trial {trial_id} finished rung {rung} with {self.__metric}: {value}.')
+        finally:
+            executor.shutdown(wait = True)
+
+        return pd.DataFrame([results[trial_id] for trial_id in sorted(results)])
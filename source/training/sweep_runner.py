@@ -0,0 +1,305 @@
+# training/sweep_runner.py
+
+# global imports
+import copy
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional
+import pandas as pd
+
+# local imports
+from source.environment import TradingEnvironment
+from source.training import TrainingConfigFactory, TrainingHandler
+
+class SweepRunner():
+    """
+    Responsible for running hyperparameter sweeps. Search space is expanded into
+    training configs, either as full grid or as random samples, and trials are trained
+    in process pool, each worker limited to its share of CPU threads. Data set is loaded
+    once before workers are started, and failure of single trial is recorded in results
+    instead of stopping the whole sweep.
+    """
+
+    # Constants used locally
+    GRID_MODE = 'grid'
+    RANDOM_MODE = 'random'
+    MAX_ATTEMPTS = 2
+
+    def __init__(self, base_training_config: dict[str, Any], search_space: dict[str, Any],
+                 mode: str = GRID_MODE, number_of_trials: Optional[int] = None, seed: int = 0,
+                 max_workers: Optional[int] = None, threads_per_worker: Optional[int] = None) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            base_training_config (dict[str, Any]): Training config in dictionary form, as in
+                configuration files of train_model.py, that trials are derived from.
+            search_space (dict[str, Any]): Dictionary mapping parameter paths onto searched values.
+                Path is dot separated, e.g. 'window_size' or 'model_blue_print.parameters.dropout'.
+                Values are given as list of choices, or as dictionary with 'min' and 'max' keys
+                and optional 'log' and 'integer' flags, which is sampled in random mode only.
+            mode (str): Either GRID_MODE or RANDOM_MODE.
+            number_of_trials (Optional[int]): Number of sampled trials in random mode. In grid
+                mode it limits number of trials if given.
+            seed (int): Seed of random generator used for sampling.
+            max_workers (Optional[int]): Number of trials trained at once. Defaults to number of CPUs.
+            threads_per_worker (Optional[int]): Number of CPU threads used by single trial.
+                Defaults to even share of CPUs.
+
+        Raises:
+            ValueError: If mode is not supported, or search space can not be expanded in it.
+        """
+
+        if mode not in [SweepRunner.GRID_MODE, SweepRunner.RANDOM_MODE]:
+            raise ValueError(f'Invalid mode: {mode}. Use SweepRunner.GRID_MODE or SweepRunner.RANDOM_MODE.')
+        if mode == SweepRunner.GRID_MODE and any(not isinstance(values, list) for values in search_space.values()):
+            raise ValueError('Grid mode accepts only lists of values in search space!')
+        if mode == SweepRunner.RANDOM_MODE and number_of_trials is None:
+            raise ValueError('Number of trials has to be given in random mode!')
+
+        cpu_count = os.cpu_count() or 1
+        self.__base_training_config: dict[str, Any] = base_training_config
+        self.__search_space: dict[str, Any] = search_space
+        self.__mode: str = mode
+        self.__number_of_trials: Optional[int] = number_of_trials
+        self.__random: random.Random = random.Random(seed)
+        self.__max_workers: int = max_workers if max_workers is not None else cpu_count
+        self.__threads_per_worker: int = threads_per_worker if threads_per_worker is not None \
+            else max(1, cpu_count // self.__max_workers)
+
+    def __sample_value(self, values: Any) -> Any:
+        """
+        Samples single value of parameter.
+
+        Parameters:
+            values (Any): List of choices, or dictionary describing range.
+
+        Returns:
+            (Any): Sampled value.
+        """
+
+        if isinstance(values, list):
+            return self.__random.choice(values)
+
+        low, high = values['min'], values['max']
+        if values.get('log', False):
+            value = math.exp(self.__random.uniform(math.log(low), math.log(high)))
+        else:
+            value = self.__random.uniform(low, high)
+
+        return int(round(value)) if values.get('integer', False) else value
+
+    def __set_parameter(self, training_config: dict[str, Any], path: str, value: Any) -> None:
+        """
+        Sets value in nested training config dictionary.
+
+        Parameters:
+            training_config (dict[str, Any]): Training config in dictionary form, updated in place.
+            path (str): Dot separated path of parameter.
+            value (Any): Value to be set.
+        """
+
+        keys = path.split('.')
+        for key in keys[:-1]:
+            training_config = training_config.setdefault(key, {})
+        training_config[keys[-1]] = value
+
+    def generate_trials(self) -> list[dict[str, Any]]:
+        """
+        Expands search space into trials.
+
+        Returns:
+            (list[dict[str, Any]]): List of trials, each with trial id, chosen parameters
+                and training config in dictionary form.
+        """
+
+        paths = list(self.__search_space.keys())
+        if self.__mode == SweepRunner.GRID_MODE:
+            combinations = itertools.product(*[self.__search_space[path] for path in paths])
+            if self.__number_of_trials is not None:
+                combinations = itertools.islice(combinations, self.__number_of_trials)
+        else:
+            combinations = [[self.__sample_value(self.__search_space[path]) for path in paths]
+                            for _ in range(self.__number_of_trials)]
+
+        trials = []
+        for trial_id, combination in enumerate(combinations):
+            training_config = copy.deepcopy(self.__base_training_config)
+            for path, value in zip(paths, combination):
+                self.__set_parameter(training_config, path, value)
+            trials.append({'trial_id': trial_id, 'parameters': dict(zip(paths, combination)),
+                           'training_config': training_config})
+
+        return trials
+
+    @staticmethod
+    def initialize_worker(threads_per_worker: int, data_keys: list[tuple[str, float]]) -> None:
+        """
+        Prepares worker process. Limits number of threads used by TensorFlow and preloads
+        data sets, which is needed only for spawned workers. Threads are limited through
+        TensorFlow configuration only, as OpenMP reads its environment variables once, when
+        TensorFlow is imported, and forked workers inherit TensorFlow already imported.
+
+        Parameters:
+            threads_per_worker (int): Number of CPU threads that worker may use.
+            data_keys (list[tuple[str, float]]): Data paths and test ratios to be preloaded.
+        """
+
+        import tensorflow as tf
+
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(threads_per_worker)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+        except RuntimeError as e:
+            logging.warning(f'Did not managed to limit TensorFlow threads! Original error: {e}')
+
+        SweepRunner.preload_data(data_keys)
+
+    @staticmethod
+    def preload_data(data_keys: list[tuple[str, float]]) -> None:
+        """
+        Preloads data sets used by trials. Data set that can not be loaded is skipped,
+        so that only trials using it fail.
+
+        Parameters:
+            data_keys (list[tuple[str, float]]): Data paths and test ratios used by trials.
+        """
+
+        for data_path, test_ratio in data_keys:
+            try:
+                TradingEnvironment.preload_data(data_path, test_ratio)
+            except Exception as e:
+                logging.warning(f'Did not managed to preload {data_path}! Original error: {e}')
+
+    @staticmethod
+    def run_trial(trial: dict[str, Any]) -> dict[str, Any]:
+        """
+        Trains and tests single trial. Exceptions are caught and recorded in result.
+
+        Parameters:
+            trial (dict[str, Any]): Trial created by generate_trials. It may also contain
+                'weights_load_path' and 'weights_save_path' keys, used to resume training.
+
+        Returns:
+            (dict[str, Any]): Row of results, with trial id, parameters, status, duration,
+                error message and test metrics.
+        """
+
+        result = {'trial_id': trial['trial_id'], **trial['parameters'], 'status': 'failed', 'duration': 0.0,
+                  'error': ''}
+        start_time = time.perf_counter()
+        try:
+            training_config = copy.deepcopy(trial['training_config'])
+            training_handler = TrainingHandler(TrainingConfigFactory().create(training_config))
+            training_handler.run_training(weights_load_path = trial.get('weights_load_path', None),
+                                          weights_save_path = trial.get('weights_save_path', None))
+            result.update(training_handler.get_test_metrics())
+            result['status'] = 'finished'
+        except Exception as e:
+            result['error'] = str(e)
+            logging.error(f'Trial {trial["trial_id"]} failed! Original error: {e}')
+
+        result['duration'] = time.perf_counter() - start_time
+        return result
+
+    @staticmethod
+    def get_data_keys(trials: list[dict[str, Any]]) -> list[tuple[str, float]]:
+        """
+        Collects distinct data sets used by trials.
+
+        Parameters:
+            trials (list[dict[str, Any]]): Trials created by generate_trials.
+
+        Returns:
+            (list[tuple[str, float]]): Data paths and test ratios.
+        """
+
+        data_keys = []
+        for trial in trials:
+            training_config = trial['training_config']
+            data_key = (training_config.get('data_path'), training_config.get('test_ratio', 0.2))
+            if data_key[0] is not None and data_key not in data_keys:
+                data_keys.append(data_key)
+
+        return data_keys
+
+    @staticmethod
+    def run_isolated_trial(trial: dict[str, Any], context: Any, threads_per_worker: int,
+                           worker_data_keys: list[tuple[str, float]]) -> dict[str, Any]:
+        """
+        Runs trial alone in its own single worker process pool, so that crash of worker can be
+        attributed to it. Trial crashing its worker is retried up to MAX_ATTEMPTS times.
+
+        Parameters:
+            trial (dict[str, Any]): Trial accepted by run_trial.
+            context (Any): Multiprocessing context used to start worker.
+            threads_per_worker (int): Number of CPU threads that worker may use.
+            worker_data_keys (list[tuple[str, float]]): Data sets preloaded by worker.
+
+        Returns:
+            (dict[str, Any]): Row of results returned by run_trial, or row with 'crashed'
+                status if trial crashed its worker in every attempt.
+        """
+
+        for attempt in range(SweepRunner.MAX_ATTEMPTS):
+            with ProcessPoolExecutor(1, mp_context = context, initializer = SweepRunner.initialize_worker,
+                                     initargs = (threads_per_worker, worker_data_keys)) as executor:
+                try:
+                    return executor.submit(SweepRunner.run_trial, trial).result()
+                except BrokenProcessPool as e:
+                    error = e
+                    logging.error(f'Trial {trial["trial_id"]} crashed its worker in attempt {attempt + 1}!')
+
+        return {'trial_id': trial['trial_id'], **trial['parameters'], 'status': 'crashed', 'duration': 0.0,
+                'error': str(error)}
+
+    def run(self) -> pd.DataFrame:
+        """
+        Runs sweep. Crash of single worker process breaks the whole pool, so trials that did
+        not finish in it are rerun one at a time, each in its own pool. Only then crash can be
+        attributed to certain trial, which is retried up to MAX_ATTEMPTS times before it is
+        recorded as crashed.
+
+        Returns:
+            (pd.DataFrame): Table of results with one row per trial, ordered by trial id.
+        """
+
+        trials = self.generate_trials()
+        data_keys = SweepRunner.get_data_keys(trials)
+        SweepRunner.preload_data(data_keys)
+
+        # Forked workers share preloaded data with parent, spawned ones load it once each
+        start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        context = multiprocessing.get_context(start_method)
+        worker_data_keys = data_keys if start_method != 'fork' else []
+        logging.info(f'Running {len(trials)} trials with {self.__max_workers} workers, '
+                     f'{self.__threads_per_worker} threads each.')
+
+        results = {}
+        suspected_trials = []
+        with ProcessPoolExecutor(self.__max_workers, mp_context = context,
+                                 initializer = SweepRunner.initialize_worker,
+                                 initargs = (self.__threads_per_worker, worker_data_keys)) as executor:
+            futures = [(trial, executor.submit(SweepRunner.run_trial, trial)) for trial in trials]
+            for trial, future in futures:
+                try:
+                    results[trial['trial_id']] = future.result()
+                    logging.info(f'Trial {trial["trial_id"]} {results[trial["trial_id"]]["status"]}.')
+                except BrokenProcessPool:
+                    suspected_trials.append(trial)
+
+        if suspected_trials:
+            logging.warning(f'Worker pool crashed, rerunning {len(suspected_trials)} trials one at a time.')
+        for trial in suspected_trials:
+            results[trial['trial_id']] = SweepRunner.run_isolated_trial(trial, context, self.__threads_per_worker,
+                                                                        worker_data_keys)
+            logging.info(f'Trial {trial["trial_id"]} {results[trial["trial_id"]]["status"]}.')
+
+        return pd.DataFrame([results[trial_id] for trial_id in sorted(results)])
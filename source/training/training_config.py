@@ -8,6 +8,7 @@ from source.agent import AgentHandler, LearningStrategyHandlerBase, TestingStrat
 from source.environment import LabelAnnotatorBase, RewardValidatorBase, SimpleLabelAnnotator, \
     PriceRewardValidator, TradingEnvironment
 from source.model import BluePrintBase
+from source.utils import PhaseProfiler
 
 class TrainingConfig():
     """"""
@@ -92,11 +93,13 @@ class TrainingConfig():
     def instantiate_agent_handler(self) -> AgentHandler:
         """"""
 
-        environment = TradingEnvironment(self.__data_path, self.__initial_budget, self.__max_amount_of_trades,
-                                         self.__window_size, self.__validator, self.__label_annotator,
-                                         self.__sell_stop_loss, self.__sell_take_profit, self.__buy_stop_loss,
-                                         self.__buy_take_profit, self.__test_ratio, self.__penalty_starts,
-                                         self.__penalty_stops, self.__static_reward_adjustment)
+        with PhaseProfiler.measure('environment_construction'):
+            environment = TradingEnvironment(self.__data_path, self.__initial_budget, self.__max_amount_of_trades,
+                                             self.__window_size, self.__validator, self.__label_annotator,
+                                             self.__sell_stop_loss, self.__sell_take_profit, self.__buy_stop_loss,
+                                             self.__buy_take_profit, self.__test_ratio, self.__penalty_starts,
+                                             self.__penalty_stops, self.__static_reward_adjustment)
 
-        return AgentHandler(self.__model_blue_print, environment, self.__learning_strategy_handler,
-                            self.__testing_strategy_handler)
\ No newline at end of file
+        with PhaseProfiler.measure('agent_construction'):
+            return AgentHandler(self.__model_blue_print, environment, self.__learning_strategy_handler,
+                                self.__testing_strategy_handler)
\ No newline at end of file
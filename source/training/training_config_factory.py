@@ -0,0 +1,67 @@
+# training/training_config_factory.py
+
+# global imports
+import copy
+from typing import Any, Type
+
+# local imports
+from source.training import TrainingConfig
+from source.utils import ValidatorFromStringConverter, \
+    ModelBluePrintFromStringConverter, OptimizerFromStringConverter, PolicyFromStringConverter, \
+    LearningStrategyHandlerFromStringConverter, TestingStrategyHandlerFromStringConverter, \
+    LabelAnnotatorFromStringConverter
+
+class TrainingConfigFactory():
+    """
+    Responsible for creating training configs from plain dictionaries, e.g. loaded from
+    JSON configuration files. Nested dictionaries with name and parameters are converted
+    into objects with from-string converters matching their keys.
+    """
+
+    # Constants used locally
+    CONVERTER_TYPE_MAP: dict[str, Type[Any]] = {
+        'model_blue_print': ModelBluePrintFromStringConverter,
+        'validator': ValidatorFromStringConverter,
+        'optimizer': OptimizerFromStringConverter,
+        'policy': PolicyFromStringConverter,
+        'learning_strategy_handler': LearningStrategyHandlerFromStringConverter,
+        'testing_strategy_handler': TestingStrategyHandlerFromStringConverter,
+        'label_annotator': LabelAnnotatorFromStringConverter
+    }
+
+    def convert_value(self, value: Any, key: str) -> Any:
+        """
+        Converts value into object if it is dictionary describing one.
+
+        Parameters:
+            value (Any): Value from configuration.
+            key (str): Key that value is stored under, defining converter type.
+
+        Returns:
+            (Any): Converted object, or value itself if it does not describe object.
+        """
+
+        if isinstance(value, dict):
+            converter_type = TrainingConfigFactory.CONVERTER_TYPE_MAP[key]
+            name = value.get('name', None)
+            params = copy.deepcopy(value.get('parameters', None)) or {}
+            for param_key, param_value in params.items():
+                params[param_key] = self.convert_value(param_value, param_key)
+            converter_instance = converter_type(**params)
+            return converter_instance.convert_from_string(name)
+        else:
+            return value
+
+    def create(self, training_config: dict[str, Any]) -> TrainingConfig:
+        """
+        Creates training config. Given dictionary is not modified.
+
+        Parameters:
+            training_config (dict[str, Any]): Dictionary mapping TrainingConfig parameters
+                onto values or descriptions of objects.
+
+        Returns:
+            (TrainingConfig): Created training config.
+        """
+
+        return TrainingConfig(**{key: self.convert_value(value, key) for key, value in training_config.items()})
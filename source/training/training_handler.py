@@ -5,7 +5,7 @@ import logging
 import io
 import matplotlib.pyplot as plt
 from  tensorflow.keras.callbacks import Callback
-from typing import Optional
+from typing import Any, Optional
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
@@ -18,6 +18,7 @@ from source.plotting import ClassificationTestingPlotResponsibilityChain, \
     PlotTestingHistoryResponsibilityChain, PlotTrainingHistoryResponsibilityChain, \
     SummaryPlotResponsibilityChain
 from source.training import TrainingConfig
+from source.utils import PhaseProfiler
 
 class TrainingHandler():
     """
@@ -64,8 +65,10 @@ class TrainingHandler():
             ValueError: If margins dictionary doesn't contain required keys.
         """
 
-        # Training related configuration
-        self.__agent: AgentHandler = config.instantiate_agent_handler()
+        # Training related configuration, each training handler is profiled from its creation
+        PhaseProfiler.reset()
+        with PhaseProfiler.measure('setup'):
+            self.__agent: AgentHandler = config.instantiate_agent_handler()
         self.__nr_of_steps: int = config.nr_of_steps
         self.__repeat_test: int = config.repeat_test
         self.__nr_of_episodes: int = config.nr_of_episodes
@@ -101,6 +104,7 @@ class TrainingHandler():
         if not any(term in margins for term in ['left', 'right', 'top', 'bottom']):
             raise ValueError("Margins should contain 'left', 'right', 'top' and 'bottom' keys!")
 
+    @PhaseProfiler.measure('run_training')
     def run_training(self, callbacks: list[Callback] = [], weights_load_path: Optional[str] = None,
                      weights_save_path: Optional[str] = None) -> None:
         """
@@ -155,6 +159,34 @@ class TrainingHandler():
         root_logger.removeHandler(log_streamer)
         log_streamer.close()
 
+    def get_test_metrics(self) -> dict[str, float]:
+        """
+        Summarizes results of testing into scalar metrics, averaged over test repeats.
+        Classification testing yields accuracy, while performance testing yields final
+        assets value relative to initial one and solvency coefficient.
+
+        Returns:
+            (dict[str, float]): Dictionary mapping metric names onto values. Empty if
+                agent was not tested yet.
+        """
+
+        metric_values: dict[str, list[float]] = {}
+        for iteration, iteration_data in self.__generated_data['test'].items():
+            if iteration == 0:
+                continue
+            for data in iteration_data.values():
+                if not isinstance(data, dict):
+                    continue
+                if 'accuracy' in data:
+                    metric_values.setdefault('accuracy', []).append(float(data['accuracy']))
+                if data.get('assets_values'):
+                    metric_values.setdefault('final_assets_value', []).append(float(data['assets_values'][-1]))
+                if 'solvency_coefficient' in data:
+                    metric_values.setdefault('solvency_coefficient', []).append(float(data['solvency_coefficient']))
+
+        return {name: sum(values) / len(values) for name, values in metric_values.items()}
+
+    @PhaseProfiler.measure('plot_rendering')
     def __handle_plot_generation(self, data: dict) -> Optional[ImageReader]:
         """
         Generates a plot based on provided data using the responsibility chain.
@@ -267,12 +299,34 @@ class TrainingHandler():
             text_block.textLine(line)
         pdf.drawText(text_block)
 
+    def get_profile(self) -> dict[str, Any]:
+        """
+        Returns profile of phases measured since this training handler was created.
+
+        Returns:
+            (dict[str, Any]): Profile with phase timings, environment steps and samples
+                per second, and peak RSS, as returned by PhaseProfiler's get_profile.
+        """
+
+        return PhaseProfiler.get_profile()
+
+    def save_profile(self, path_to_json: str) -> None:
+        """
+        Saves profile of phases measured since this training handler was created.
+
+        Parameters:
+            path_to_json (str): File path where the JSON profile should be saved.
+        """
+
+        PhaseProfiler.save_profile(path_to_json)
+
+    @PhaseProfiler.measure('generate_report')
     def generate_report(self, path_to_pdf: str) -> None:
         """
         Generates a comprehensive PDF report of training and testing results.
 
-        Creates a multi-page report with logs, training history plots, and test
-        results visualizations based on the data collected during training.
+        Creates a multi-page report with logs, training history plots, test results
+        visualizations and profile of phases measured up to report generation.
 
         Parameters:
             path_to_pdf (str): File path where the PDF report should be saved.
@@ -329,5 +383,12 @@ class TrainingHandler():
                                   height = letter[1] - 2 * inch)
                     pdf.showPage()
 
+        # Draw profile
+        profile_lines = PhaseProfiler.format_profile(self.get_profile())
+        for profile_chunk in self.__handle_logs_preprocessing(profile_lines, max_log_length, max_lines_per_page):
+            self.__draw_caption(pdf, "Profile")
+            self.__draw_text_body(pdf, profile_chunk)
+            pdf.showPage()
+
         pdf.save()
         logging.info(f"Report generated!")
@@ -0,0 +1,136 @@
+# training/worker_client.py
+
+# global imports
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Any, Iterator, Optional
+
+class WorkerClient():
+    """
+    Responsible for submitting training jobs to WorkerDaemon through its queue directory
+    and following their progress. Only standard library is used, so that submitting a job
+    does not pay for importing TensorFlow. Queue directory contains 'pending' directory
+    with submitted jobs, 'running' directory with jobs claimed by workers, 'logs' directory
+    with output of each job and 'status' directory with final status of each job.
+    """
+
+    # Constants used locally
+    PENDING_DIRECTORY_NAME = 'pending'
+    RUNNING_DIRECTORY_NAME = 'running'
+    LOGS_DIRECTORY_NAME = 'logs'
+    STATUS_DIRECTORY_NAME = 'status'
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, queue_directory: str) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            queue_directory (str): Path to queue directory watched by WorkerDaemon.
+        """
+
+        self.__queue_directory: str = queue_directory
+        for directory_name in [WorkerClient.PENDING_DIRECTORY_NAME, WorkerClient.RUNNING_DIRECTORY_NAME,
+                               WorkerClient.LOGS_DIRECTORY_NAME, WorkerClient.STATUS_DIRECTORY_NAME]:
+            os.makedirs(os.path.join(queue_directory, directory_name), exist_ok = True)
+
+    def get_path(self, directory_name: str, job_id: str) -> str:
+        """
+        Returns path of job's file in given queue subdirectory.
+
+        Parameters:
+            directory_name (str): Name of queue subdirectory.
+            job_id (str): Id of job.
+
+        Returns:
+            (str): Path to file.
+        """
+
+        extension = '.log' if directory_name == WorkerClient.LOGS_DIRECTORY_NAME else '.json'
+        return os.path.join(self.__queue_directory, directory_name, job_id + extension)
+
+    def submit(self, job: dict[str, Any]) -> str:
+        """
+        Submits job. File is written atomically, so that daemon never reads it partially.
+
+        Parameters:
+            job (dict[str, Any]): Job in the form of train_model.py configuration, with
+                'training_config' and optionally 'data_set_name', 'callbacks',
+                'weights_file_name', 'weights_save_path' and 'report_path'. Data set and
+                weights may be given as local paths, or as S3 or public URLs fetched by daemon
+                through its artifact cache. Weights and report are saved under local paths.
+
+        Returns:
+            (str): Id of submitted job.
+        """
+
+        # Ids start with submission time, so that jobs are run in the order of submission
+        job_id = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        pending_directory = os.path.join(self.__queue_directory, WorkerClient.PENDING_DIRECTORY_NAME)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir = pending_directory, suffix = '.tmp')
+        with os.fdopen(file_descriptor, 'w') as job_file:
+            json.dump(job, job_file)
+        os.replace(temporary_path, self.get_path(WorkerClient.PENDING_DIRECTORY_NAME, job_id))
+
+        return job_id
+
+    def get_status(self, job_id: str) -> Optional[dict[str, Any]]:
+        """
+        Returns final status of job.
+
+        Parameters:
+            job_id (str): Id of job.
+
+        Returns:
+            (Optional[dict[str, Any]]): Status with 'status', 'error', 'duration' and 'metrics'
+                keys, and 'profile' of finished job, or None if job did not finish yet.
+        """
+
+        try:
+            with open(self.get_path(WorkerClient.STATUS_DIRECTORY_NAME, job_id), 'r') as status_file:
+                return json.load(status_file)
+        except FileNotFoundError:
+            return None
+
+    def stream_logs(self, job_id: str, poll_interval: float = POLL_INTERVAL,
+                    timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Yields lines of job's output as they are written, until job finishes.
+
+        Parameters:
+            job_id (str): Id of job.
+            poll_interval (float): Number of seconds between checks for new output.
+            timeout (Optional[float]): Maximal number of seconds to wait for job to finish.
+
+        Raises:
+            TimeoutError: If job did not finish within timeout.
+
+        Returns:
+            (Iterator[str]): Lines of output, without trailing new line characters.
+        """
+
+        log_path = self.get_path(WorkerClient.LOGS_DIRECTORY_NAME, job_id)
+        start_time = time.monotonic()
+        position = 0
+        partial_line = ''
+        while True:
+            # Status is checked before reading, so that output written before it is not lost
+            finished = self.get_status(job_id) is not None
+            if os.path.exists(log_path):
+                with open(log_path, 'r', errors = 'replace') as log_file:
+                    log_file.seek(position)
+                    content = partial_line + log_file.read()
+                    position = log_file.tell()
+                *lines, partial_line = content.split('\n')
+                yield from lines
+
+            if finished:
+                if partial_line:
+                    yield partial_line
+                return
+            if timeout is not None and time.monotonic() - start_time > timeout:
+                raise TimeoutError(f'Job {job_id} did not finish within {timeout} seconds!')
+            time.sleep(poll_interval)
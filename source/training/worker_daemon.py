@@ -0,0 +1,373 @@
+# training/worker_daemon.py
+
+# global imports
+import contextlib
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import time
+import urllib.parse
+from typing import Any, Optional
+
+# local imports
+from source.aws import AWSHandler
+from source.training import SweepRunner, TrainingConfigFactory, TrainingHandler, WorkerClient
+from source.utils import ArtifactCache, CallbackFromStringConverter, FileLock
+
+class WorkerDaemon():
+    """
+    Responsible for running training jobs in long-lived process that keeps heavy modules
+    and data sets loaded between jobs. Jobs are taken from queue directory filled by
+    WorkerClient, and each of them is run in worker forked from the daemon, so it starts
+    with everything already imported and loaded, while being isolated from other jobs.
+    Output of each job is written into its log file, and its final status into status file.
+    Data sets and weights given as S3 or public URLs are fetched through artifact cache.
+    Running job is guarded by file lock held by daemon that claimed it, and by its worker.
+    Job left in running directory with lock released, e.g. by daemon killed together with
+    its workers, is recorded as crashed by any daemon watching queue, so that clients
+    following it do not wait forever.
+    """
+
+    # Constants used locally
+    PRELOADED_MODULES = ['tensorflow', 'rl.agents', 'reportlab.pdfgen.canvas', 'boto3', 'matplotlib.pyplot']
+    POLL_INTERVAL = 0.5
+    CACHE_DIRECTORY_NAME = '.artifact_cache'
+
+    def __init__(self, queue_directory: str, max_workers: int = 1, data_paths: Optional[list[str]] = None,
+                 test_ratio: float = 0.2, threads_per_worker: Optional[int] = None,
+                 cache_directory: Optional[str] = None) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            queue_directory (str): Path to queue directory that jobs are submitted to.
+            max_workers (int): Number of jobs run at once.
+            data_paths (Optional[list[str]]): Paths or S3 / public URLs of data sets that should be preloaded.
+            test_ratio (float): Test ratio that data sets are preloaded with. Jobs using
+                other test ratio load data set on their own.
+            threads_per_worker (Optional[int]): Number of CPU threads used by single job.
+                Defaults to even share of CPUs.
+            cache_directory (Optional[str]): Path to artifact cache that remote data sets and
+                weights are fetched into. Defaults to directory inside queue directory, so it is
+                shared by all daemons watching queue.
+
+        Raises:
+            RuntimeError: If forking processes is not supported on current platform.
+        """
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError('WorkerDaemon requires platform supporting fork!')
+
+        self.__client: WorkerClient = WorkerClient(queue_directory)
+        self.__queue_directory: str = queue_directory
+        self.__max_workers: int = max_workers
+        self.__data_paths: list[str] = data_paths if data_paths is not None else []
+        self.__test_ratio: float = test_ratio
+        self.__threads_per_worker: int = threads_per_worker if threads_per_worker is not None \
+            else max(1, (os.cpu_count() or 1) // max_workers)
+        self.__context = multiprocessing.get_context('fork')
+        self.__workers: dict[str, multiprocessing.Process] = {}
+        self.__job_locks: dict[str, FileLock] = {}
+        self.__cache_directory: str = cache_directory if cache_directory is not None \
+            else os.path.join(queue_directory, WorkerDaemon.CACHE_DIRECTORY_NAME)
+        self.__stopped: bool = False
+
+    def preload(self) -> None:
+        """
+        Imports heavy modules and loads data sets, so that forked workers inherit them.
+        TensorFlow runtime itself is not initialized, as it is not safe to fork afterwards.
+        """
+
+        for module_name in WorkerDaemon.PRELOADED_MODULES:
+            try:
+                importlib.import_module(module_name)
+            except ImportError as e:
+                logging.warning(f'Did not managed to preload {module_name}! Original error: {e}')
+
+        artifact_cache = WorkerDaemon.create_artifact_cache(self.__cache_directory)
+        SweepRunner.preload_data([(WorkerDaemon.get_local_path(data_path, artifact_cache), self.__test_ratio)
+                                  for data_path in self.__data_paths])
+
+    def stop(self, *args: Any) -> None:
+        """
+        Makes daemon stop taking new jobs. Running jobs are finished first.
+
+        Parameters:
+            *args (Any): Ignored, allows to use this method as signal handler.
+        """
+
+        logging.info('Stopping worker daemon...')
+        self.__stopped = True
+
+    def __get_lock_path(self, job_id: str) -> str:
+        """
+        Returns path of lock file guarding running job.
+
+        Parameters:
+            job_id (str): Id of job.
+
+        Returns:
+            (str): Path to lock file.
+        """
+
+        return os.path.join(self.__queue_directory, WorkerClient.RUNNING_DIRECTORY_NAME, job_id + '.lock')
+
+    def __release_job(self, job_id: str, lock: FileLock) -> None:
+        """
+        Removes job from running directory and releases its lock.
+
+        Parameters:
+            job_id (str): Id of job.
+            lock (FileLock): Acquired lock of job.
+        """
+
+        running_path = self.__client.get_path(WorkerClient.RUNNING_DIRECTORY_NAME, job_id)
+        if os.path.exists(running_path):
+            os.remove(running_path)
+        lock.release()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.__get_lock_path(job_id))
+
+    def __claim_job(self) -> Optional[str]:
+        """
+        Claims the oldest pending job by locking it and moving it into running directory.
+        Moving is atomic, so that job is never claimed twice, even by many daemons sharing
+        queue directory.
+
+        Returns:
+            (Optional[str]): Id of claimed job, None if there are no pending jobs.
+        """
+
+        pending_directory = os.path.join(self.__queue_directory, WorkerClient.PENDING_DIRECTORY_NAME)
+        for file_name in sorted(os.listdir(pending_directory)):
+            if not file_name.endswith('.json'):
+                continue
+
+            job_id = file_name[:-len('.json')]
+            lock = FileLock(self.__get_lock_path(job_id))
+            if not lock.try_acquire():
+                continue
+            try:
+                os.rename(os.path.join(pending_directory, file_name),
+                          self.__client.get_path(WorkerClient.RUNNING_DIRECTORY_NAME, job_id))
+            except FileNotFoundError:
+                self.__release_job(job_id, lock)
+                continue
+
+            self.__job_locks[job_id] = lock
+            return job_id
+
+        return None
+
+    def __recover_orphaned_jobs(self) -> None:
+        """
+        Records jobs left in running directory without any process holding their lock as
+        crashed. Job that managed to write its status before its daemon died is only removed
+        from running directory.
+        """
+
+        running_directory = os.path.join(self.__queue_directory, WorkerClient.RUNNING_DIRECTORY_NAME)
+        for file_name in sorted(os.listdir(running_directory)):
+            job_id = file_name[:-len('.json')]
+            if not file_name.endswith('.json') or job_id in self.__job_locks:
+                continue
+
+            lock = FileLock(self.__get_lock_path(job_id))
+            if not lock.try_acquire():
+                continue
+
+            status_path = self.__client.get_path(WorkerClient.STATUS_DIRECTORY_NAME, job_id)
+            if os.path.exists(os.path.join(running_directory, file_name)) and not os.path.exists(status_path):
+                logging.warning(f'Job {job_id} was left running by daemon that exited, marking it as crashed.')
+                WorkerDaemon.write_status(status_path, {'status': 'crashed', 'duration': 0.0, 'metrics': {},
+                                                        'error': 'Daemon running job exited before it finished.'})
+            self.__release_job(job_id, lock)
+
+    @staticmethod
+    def create_artifact_cache(cache_directory: str) -> ArtifactCache:
+        """
+        Creates artifact cache fetching S3 artifacts with handler of role given by ROLE_NAME.
+
+        Parameters:
+            cache_directory (str): Path to artifact cache.
+
+        Returns:
+            (ArtifactCache): Artifact cache.
+        """
+
+        return ArtifactCache(cache_directory,
+                             aws_handler_factory = lambda: AWSHandler.get_handler(os.getenv('ROLE_NAME')))
+
+    @staticmethod
+    def get_local_path(path: str, artifact_cache: ArtifactCache) -> str:
+        """
+        Returns local path of data set or weights. S3 and public URLs, as used in train_model.py
+        configuration, are fetched through artifact cache, local paths are returned as they are.
+
+        Parameters:
+            path (str): Local path, S3 URL or public URL.
+            artifact_cache (ArtifactCache): Artifact cache that remote files are fetched into.
+
+        Returns:
+            (str): Local path.
+        """
+
+        if urllib.parse.urlparse(path).scheme == '':
+            return path
+
+        return artifact_cache.get_local_path(path, os.getenv('BUCKET_NAME'))
+
+    @staticmethod
+    def write_status(status_path: str, status: dict[str, Any]) -> None:
+        """
+        Writes status of job atomically.
+
+        Parameters:
+            status_path (str): Path to status file.
+            status (dict[str, Any]): Status of job.
+        """
+
+        file_descriptor, temporary_path = tempfile.mkstemp(dir = os.path.dirname(status_path), suffix = '.tmp')
+        with os.fdopen(file_descriptor, 'w') as status_file:
+            json.dump(status, status_file)
+        os.replace(temporary_path, status_path)
+
+    @staticmethod
+    def run_job(job_path: str, log_path: str, status_path: str, threads_per_worker: int,
+                cache_directory: str) -> None:
+        """
+        Runs single job in forked worker. Whole output of worker, including progress printed
+        by Keras, is redirected into log file.
+
+        Parameters:
+            job_path (str): Path to job file.
+            log_path (str): Path to log file.
+            status_path (str): Path to status file.
+            threads_per_worker (int): Number of CPU threads that job may use.
+            cache_directory (str): Path to artifact cache that remote data set and weights are fetched into.
+        """
+
+        log_file = open(log_path, 'a', buffering = 1)
+        os.dup2(log_file.fileno(), sys.stdout.fileno())
+        os.dup2(log_file.fileno(), sys.stderr.fileno())
+        root_logger = logging.getLogger()
+        for handler in list(root_logger.handlers):
+            root_logger.removeHandler(handler)
+        log_handler = logging.StreamHandler(log_file)
+        log_handler.setFormatter(logging.Formatter('{asctime} | {levelname} | {message}', style = '{',
+                                                   datefmt = '%Y-%m-%d %H:%M:%S'))
+        root_logger.addHandler(log_handler)
+        root_logger.setLevel(logging.INFO)
+
+        status = {'status': 'failed', 'error': '', 'duration': 0.0, 'metrics': {}}
+        start_time = time.perf_counter()
+        try:
+            SweepRunner.initialize_worker(threads_per_worker, [])
+            with open(job_path, 'r') as job_file:
+                job = json.load(job_file)
+
+            artifact_cache = WorkerDaemon.create_artifact_cache(cache_directory)
+            training_config = job['training_config']
+            if 'data_path' not in training_config:
+                training_config['data_path'] = WorkerDaemon.get_local_path(job['data_set_name'], artifact_cache)
+            weights_load_path = job.get('weights_file_name', None)
+            if weights_load_path is not None:
+                weights_load_path = WorkerDaemon.get_local_path(weights_load_path, artifact_cache)
+
+            callbacks = []
+            for key, value in job.get('callbacks', {}).items():
+                callbacks.append(CallbackFromStringConverter(**value).convert_from_string(key))
+
+            training_handler = TrainingHandler(TrainingConfigFactory().create(training_config))
+            training_handler.run_training(callbacks = callbacks,
+                                          weights_load_path = weights_load_path,
+                                          weights_save_path = job.get('weights_save_path', None))
+            if job.get('report_path', None) is not None:
+                training_handler.generate_report(job['report_path'])
+
+            status.update({'status': 'finished', 'metrics': training_handler.get_test_metrics(),
+                           'profile': training_handler.get_profile()})
+        except Exception as e:
+            logging.exception(f'Job failed! Original error: {e}')
+            status['error'] = str(e)
+
+        status['duration'] = time.perf_counter() - start_time
+        sys.stdout.flush()
+        sys.stderr.flush()
+        WorkerDaemon.write_status(status_path, status)
+
+    def __start_job(self, job_id: str) -> None:
+        """
+        Forks worker running job.
+
+        Parameters:
+            job_id (str): Id of job.
+        """
+
+        logging.info(f'Starting job {job_id}.')
+        worker = self.__context.Process(target = WorkerDaemon.run_job,
+                                        args = (self.__client.get_path(WorkerClient.RUNNING_DIRECTORY_NAME, job_id),
+                                                self.__client.get_path(WorkerClient.LOGS_DIRECTORY_NAME, job_id),
+                                                self.__client.get_path(WorkerClient.STATUS_DIRECTORY_NAME, job_id),
+                                                self.__threads_per_worker, self.__cache_directory))
+        worker.start()
+        self.__workers[job_id] = worker
+
+    def __reap_workers(self) -> None:
+        """
+        Cleans up after workers that exited. Status of worker that died without writing
+        it, e.g. killed by out of memory killer, is written on its behalf.
+        """
+
+        for job_id, worker in list(self.__workers.items()):
+            if worker.is_alive():
+                continue
+
+            worker.join()
+            del self.__workers[job_id]
+            status_path = self.__client.get_path(WorkerClient.STATUS_DIRECTORY_NAME, job_id)
+            if not os.path.exists(status_path):
+                WorkerDaemon.write_status(status_path, {'status': 'crashed', 'duration': 0.0, 'metrics': {},
+                                                        'error': f'Worker exited with code {worker.exitcode}.'})
+
+            self.__release_job(job_id, self.__job_locks.pop(job_id))
+            logging.info(f'Job {job_id} done.')
+
+    def serve(self, max_jobs: Optional[int] = None, poll_interval: float = POLL_INTERVAL) -> None:
+        """
+        Runs jobs from queue until stopped. Jobs orphaned by other daemons are looked for
+        on every check, including the first one after restart.
+
+        Parameters:
+            max_jobs (Optional[int]): Number of jobs after which daemon stops. Runs
+                until stopped by signal if not given.
+            poll_interval (float): Number of seconds between checks for new jobs.
+        """
+
+        previous_handlers = {signal_number: signal.signal(signal_number, self.stop)
+                             for signal_number in [signal.SIGTERM, signal.SIGINT]}
+        logging.info(f'Worker daemon watching {self.__queue_directory}.')
+
+        try:
+            nr_of_jobs = 0
+            while not self.__stopped or self.__workers:
+                self.__reap_workers()
+                self.__recover_orphaned_jobs()
+                while not self.__stopped and len(self.__workers) < self.__max_workers:
+                    job_id = self.__claim_job()
+                    if job_id is None:
+                        break
+                    self.__start_job(job_id)
+                    nr_of_jobs += 1
+                    if max_jobs is not None and nr_of_jobs >= max_jobs:
+                        self.__stopped = True
+
+                time.sleep(poll_interval)
+        finally:
+            for signal_number, handler in previous_handlers.items():
+                signal.signal(signal_number, handler)
@@ -1,12 +1,34 @@
 # utils/__init__.py
 
-from .granularity import Granularity
-from .callback_from_string_converter import CallbackFromStringConverter
-from .model_blue_print_from_string_converter import ModelBluePrintFromStringConverter
-from .optimizer_from_string_converter import OptimizerFromStringConverter
-from .policy_from_string_converter import PolicyFromStringConverter
-from .validator_from_string_converter import ValidatorFromStringConverter
-from .from_string_converter_base import FromStringConverterBase
-from .testing_strategy_handler_from_string_converter import TestingStrategyHandlerFromStringConverter
-from .learning_strategy_handler_from_string_converter import LearningStrategyHandlerFromStringConverter
-from .label_annotator_from_string_converter import LabelAnnotatorFromStringConverter
\ No newline at end of file
+from .lazy_loader import LazyLoader
+
+"""
+Names exported by package, mapped onto modules they are defined in. Modules are
+imported only on first access, as some of them load TensorFlow, keras-rl or reportlab.
+"""
+__exports = {
+    'Granularity': '.granularity',
+    'CallbackFromStringConverter': '.callback_from_string_converter',
+    'ModelBluePrintFromStringConverter': '.model_blue_print_from_string_converter',
+    'OptimizerFromStringConverter': '.optimizer_from_string_converter',
+    'PolicyFromStringConverter': '.policy_from_string_converter',
+    'ValidatorFromStringConverter': '.validator_from_string_converter',
+    'FromStringConverterBase': '.from_string_converter_base',
+    'TestingStrategyHandlerFromStringConverter': '.testing_strategy_handler_from_string_converter',
+    'LearningStrategyHandlerFromStringConverter': '.learning_strategy_handler_from_string_converter',
+    'LabelAnnotatorFromStringConverter': '.label_annotator_from_string_converter',
+    'CompressionHandler': '.compression_handler',
+    'ArtifactCache': '.artifact_cache',
+    'IndexedDataSetWriter': '.indexed_data_set',
+    'IndexedDataSetReader': '.indexed_data_set',
+    'IndexedDataSetView': '.indexed_data_set',
+    'INDEXED_DATA_SET_EXTENSION': '.indexed_data_set',
+    'PhaseProfiler': '.phase_profiler',
+    'FileLock': '.file_lock',
+    'MetricsExporter': '.metrics_exporter',
+    'MetricsCallback': '.metrics_callback'
+}
+__all__ = list(__exports)
+__lazy_loader = LazyLoader(__name__, __exports)
+__getattr__ = __lazy_loader.load
+__dir__ = __lazy_loader.list_names
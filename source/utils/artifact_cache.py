@@ -0,0 +1,341 @@
+# utils/artifact_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from typing import Any, Callable, Optional
+
+from .compression_handler import CompressionHandler
+from .file_lock import FileLock
+
+class ArtifactCache():
+    """
+    Responsible for caching artifacts, e.g. configuration files, data sets and weights,
+    fetched from S3 bucket or public URL. Artifacts are stored under hash of their
+    decompressed content, and each source is mapped onto content together with validator
+    taken from cheap HEAD request, i.e. S3 entity tag or HTTP ETag / Last-Modified header.
+    Artifact is downloaded again only if validator changed. All files are written
+    atomically, and least recently used artifacts are evicted once cache exceeds its size.
+    Index is updated and artifacts are evicted under file lock, so cache can be shared by
+    many concurrent processes, while downloads themselves run without holding it.
+    """
+
+    # Constants used locally
+    DEFAULT_MAX_SIZE = 10 * 1024 ** 3
+    INDEX_FILE_NAME = 'index.json'
+    LOCK_FILE_NAME = '.lock'
+    LOCK_TIMEOUT = 60
+    OBJECTS_DIRECTORY_NAME = 'objects'
+    HASH_BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_directory: str, max_size: int = DEFAULT_MAX_SIZE,
+                 aws_handler_factory: Optional[Callable[[], Any]] = None) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            cache_directory (str): Path to directory that artifacts are stored in.
+            max_size (int): Maximal number of bytes taken by cached artifacts.
+            aws_handler_factory (Optional[Callable[[], Any]]): Function returning AWSHandler,
+                called only when artifact from S3 bucket is requested.
+        """
+
+        self.__cache_directory: str = cache_directory
+        self.__objects_directory: str = os.path.join(cache_directory, ArtifactCache.OBJECTS_DIRECTORY_NAME)
+        self.__index_path: str = os.path.join(cache_directory, ArtifactCache.INDEX_FILE_NAME)
+        self.__lock_path: str = os.path.join(cache_directory, ArtifactCache.LOCK_FILE_NAME)
+        self.__max_size: int = max_size
+        self.__aws_handler_factory: Optional[Callable[[], Any]] = aws_handler_factory
+        self.__aws_handler: Optional[Any] = None
+        self.__compression_handler: CompressionHandler = CompressionHandler()
+        os.makedirs(self.__objects_directory, exist_ok = True)
+
+    def __get_aws_handler(self) -> Any:
+        """
+        Creates AWSHandler on first use.
+
+        Raises:
+            RuntimeError: If no AWSHandler factory was given.
+
+        Returns:
+            (AWSHandler): Handler used to communicate with S3 bucket.
+        """
+
+        if self.__aws_handler is None:
+            if self.__aws_handler_factory is None:
+                raise RuntimeError('AWSHandler factory is needed to cache artifacts from S3 bucket!')
+            self.__aws_handler = self.__aws_handler_factory()
+
+        return self.__aws_handler
+
+    def __load_index(self) -> dict[str, dict]:
+        """
+        Loads index mapping sources onto cached artifacts.
+
+        Returns:
+            (dict[str, dict]): Index entries, empty if index does not exist or is corrupted.
+        """
+
+        try:
+            with open(self.__index_path, 'r') as index_file:
+                return json.load(index_file)
+        except (OSError, ValueError):
+            return {}
+
+    def __save_index(self, index: dict[str, dict]) -> None:
+        """
+        Saves index atomically.
+
+        Parameters:
+            index (dict[str, dict]): Index entries.
+        """
+
+        file_descriptor, temporary_path = tempfile.mkstemp(dir = self.__cache_directory, suffix = '.tmp')
+        with os.fdopen(file_descriptor, 'w') as index_file:
+            json.dump(index, index_file, indent = 2)
+        os.replace(temporary_path, self.__index_path)
+
+    def __hash_file(self, file_path: str) -> str:
+        """
+        Calculates SHA-256 hash of file content.
+
+        Parameters:
+            file_path (str): Path to file.
+
+        Returns:
+            (str): Hexadecimal digest.
+        """
+
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            while block := file.read(ArtifactCache.HASH_BLOCK_SIZE):
+                digest.update(block)
+
+        return digest.hexdigest()
+
+    def __get_object_path(self, entry: dict) -> str:
+        """
+        Returns path of cached artifact described by index entry.
+
+        Parameters:
+            entry (dict): Index entry.
+
+        Returns:
+            (str): Path to artifact.
+        """
+
+        return os.path.join(self.__objects_directory, entry['content_hash'] + entry['suffix'])
+
+    def __get_validator(self, source: str, bucket_name: Optional[str]) -> Optional[str]:
+        """
+        Fetches validator of current source content with HEAD request.
+
+        Parameters:
+            source (str): S3 URL or public URL of artifact.
+            bucket_name (Optional[str]): Name of S3 bucket that S3 artifacts are stored in.
+
+        Returns:
+            (Optional[str]): Validator, or None if source does not provide any.
+        """
+
+        if urllib.parse.urlparse(source).scheme == 's3':
+            return self.__get_aws_handler().get_s3_object_etag(bucket_name, self.__get_s3_key(source))
+
+        request = urllib.request.Request(source, method = 'HEAD')
+        with urllib.request.urlopen(request) as response:
+            return response.headers.get('ETag') or response.headers.get('Last-Modified')
+
+    def __get_s3_key(self, source: str) -> str:
+        """
+        Extracts key of S3 object from S3 URL, e.g. s3://bucket/path/file.csv.
+
+        Parameters:
+            source (str): S3 URL of artifact.
+
+        Returns:
+            (str): Key of S3 object.
+        """
+
+        return '/'.join(source.split('/')[3:])
+
+    def __download(self, source: str, bucket_name: Optional[str], destination_path: str) -> None:
+        """
+        Streams artifact into file, decompressing it on the fly if needed.
+
+        Parameters:
+            source (str): S3 URL or public URL of artifact.
+            bucket_name (Optional[str]): Name of S3 bucket that S3 artifacts are stored in.
+            destination_path (str): Path to file that artifact should be written to.
+        """
+
+        if urllib.parse.urlparse(source).scheme == 's3':
+            stream = self.__get_aws_handler().open_s3_object_stream(bucket_name, self.__get_s3_key(source))
+        else:
+            stream = urllib.request.urlopen(source)
+
+        with stream:
+            self.__compression_handler.decompress_to_file(stream, destination_path)
+
+    def __is_intact(self, entry: dict) -> bool:
+        """
+        Checks if cached artifact still exists and was not truncated.
+
+        Parameters:
+            entry (dict): Index entry.
+
+        Returns:
+            (bool): True if artifact can be used, False otherwise.
+        """
+
+        object_path = self.__get_object_path(entry)
+        return os.path.exists(object_path) and os.path.getsize(object_path) == entry['size']
+
+    def __store(self, source: str, bucket_name: Optional[str], validator: Optional[str]) -> tuple[dict, str]:
+        """
+        Downloads artifact into temporary file and hashes its content. File is moved
+        into cache under that hash only together with index update.
+
+        Parameters:
+            source (str): S3 URL or public URL of artifact.
+            bucket_name (Optional[str]): Name of S3 bucket that S3 artifacts are stored in.
+            validator (Optional[str]): Validator of downloaded content.
+
+        Returns:
+            (tuple[dict, str]): Index entry describing downloaded artifact and path to
+                temporary file holding it.
+        """
+
+        file_name = self.__compression_handler.strip_extension(source.rstrip('/').split('/')[-1])
+        file_descriptor, temporary_path = tempfile.mkstemp(dir = self.__cache_directory, suffix = '.tmp')
+        os.close(file_descriptor)
+        try:
+            self.__download(source, bucket_name, temporary_path)
+            entry = {'source': source, 'validator': validator, 'content_hash': self.__hash_file(temporary_path),
+                     'suffix': os.path.splitext(file_name)[1], 'size': os.path.getsize(temporary_path)}
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        return entry, temporary_path
+
+    def __update_index(self, key: str, entry: dict, temporary_path: Optional[str] = None) -> bool:
+        """
+        Records access to artifact in index and evicts artifacts exceeding cache size.
+        Index is loaded, modified and saved under file lock, so entries added by other
+        processes are neither lost nor evicted while their artifacts are being moved in.
+
+        Parameters:
+            key (str): Key of index entry.
+            entry (dict): Index entry describing artifact.
+            temporary_path (Optional[str]): Path to freshly downloaded artifact, moved into
+                cache while lock is held.
+
+        Raises:
+            RuntimeError: If lock could not be acquired within lock timeout.
+
+        Returns:
+            (bool): True if artifact is in cache, False if it was evicted by other process
+                before lock was acquired.
+        """
+
+        lock = FileLock(self.__lock_path)
+        lock.acquire(ArtifactCache.LOCK_TIMEOUT)
+        try:
+            if temporary_path is not None:
+                os.replace(temporary_path, self.__get_object_path(entry))
+            elif not self.__is_intact(entry):
+                return False
+
+            entry['last_access'] = time.time()
+            index = self.__load_index()
+            index[key] = entry
+            self.__evict(index, key)
+            self.__save_index(index)
+        finally:
+            lock.release()
+
+        return True
+
+    def __evict(self, index: dict[str, dict], protected_key: str) -> None:
+        """
+        Removes least recently used artifacts until cache fits within its size.
+        Artifact shared by many sources is removed together with all of them.
+
+        Parameters:
+            index (dict[str, dict]): Index entries, updated in place.
+            protected_key (str): Key of entry that should never be evicted.
+        """
+
+        object_entries: dict[str, list[str]] = {}
+        for key, entry in index.items():
+            object_entries.setdefault(self.__get_object_path(entry), []).append(key)
+
+        last_accesses = {path: max(index[key]['last_access'] for key in keys) for path, keys in object_entries.items()}
+        sizes = {path: index[keys[0]]['size'] for path, keys in object_entries.items()}
+        total_size = sum(sizes.values())
+        protected_path = self.__get_object_path(index[protected_key])
+
+        for path in sorted(last_accesses, key = last_accesses.get):
+            if total_size <= self.__max_size:
+                break
+            if path == protected_path:
+                continue
+
+            logging.info(f'Evicting {path} from artifact cache.')
+            for key in object_entries[path]:
+                del index[key]
+            if os.path.exists(path):
+                os.remove(path)
+            total_size -= sizes[path]
+
+    def get_local_path(self, source: str, bucket_name: Optional[str] = None) -> str:
+        """
+        Returns local path to cached artifact, downloading it only if it is not cached
+        yet or its content changed. If source can not be reached, cached artifact is used.
+
+        Parameters:
+            source (str): S3 URL or public URL of artifact.
+            bucket_name (Optional[str]): Name of S3 bucket that S3 artifacts are stored in.
+
+        Raises:
+            RuntimeError: If artifact is neither cached nor could be downloaded.
+
+        Returns:
+            (str): Path to decompressed artifact. Its extension matches the source one
+                with compression extension removed.
+        """
+
+        key = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        entry = self.__load_index().get(key)
+        if entry is not None and not self.__is_intact(entry):
+            entry = None
+
+        try:
+            validator = self.__get_validator(source, bucket_name)
+        except Exception as e:
+            if entry is None:
+                raise RuntimeError(f'Did not managed to reach {source}! Original error: {e}')
+            logging.warning(f'Could not validate {source}, using cached artifact. Original error: {e}')
+            validator = entry['validator']
+
+        if entry is not None and validator is not None and entry['validator'] == validator:
+            if self.__update_index(key, entry):
+                logging.info(f'Using cached artifact for {source}.')
+                return self.__get_object_path(entry)
+            logging.info(f'Cached artifact for {source} was evicted by other process.')
+
+        logging.info(f'Downloading {source} into artifact cache...')
+        entry, temporary_path = self.__store(source, bucket_name, validator)
+        try:
+            self.__update_index(key, entry, temporary_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+        return self.__get_object_path(entry)
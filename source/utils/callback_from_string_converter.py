@@ -4,6 +4,7 @@ from typing import Any, Type
 from  tensorflow.keras.callbacks import Callback, ReduceLROnPlateau, EarlyStopping
 
 from .from_string_converter_base import FromStringConverterBase
+from .metrics_callback import MetricsCallback
 
 class CallbackFromStringConverter(FromStringConverterBase):
     """
@@ -26,5 +27,6 @@ class CallbackFromStringConverter(FromStringConverterBase):
         self._kwargs: dict[str, Any] = kwargs
         self._value_map: dict[str, Type[Callback]] = {
             'reduce_lr_on_plateau': ReduceLROnPlateau,
-            'early_stopping': EarlyStopping
+            'early_stopping': EarlyStopping,
+            'metrics': MetricsCallback
         }
\ No newline at end of file
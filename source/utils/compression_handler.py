@@ -0,0 +1,210 @@
+# utils/compression_handler.py
+
+import bz2
+import lzma
+import zlib
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+class CompressionHandler():
+    """
+    Responsible for compressing and decompressing data sets with codecs available in
+    standard library. Data is processed block by block, so it is never held in memory
+    as a whole. Compression is detected from leading bytes instead of file extension.
+    """
+
+    # Constants used locally
+    BLOCK_SIZE = 1024 * 1024
+    GZIP = 'gzip'
+    BZ2 = 'bz2'
+    XZ = 'xz'
+    EXTENSIONS = {GZIP: '.gz', BZ2: '.bz2', XZ: '.xz'}
+    MAGIC_BYTES = {GZIP: b'\x1f\x8b', BZ2: b'BZh', XZ: b'\xfd7zXZ\x00'}
+
+    def __init__(self, block_size: int = BLOCK_SIZE) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            block_size (int): Number of bytes processed at once.
+        """
+
+        self.__block_size: int = block_size
+
+    def __create_compressor(self, compression: str):
+        """
+        Creates incremental compressor for given codec.
+
+        Parameters:
+            compression (str): Name of codec.
+
+        Raises:
+            ValueError: If codec is not supported.
+
+        Returns:
+            (Any): Compressor object with compress and flush methods.
+        """
+
+        if compression == CompressionHandler.GZIP:
+            return zlib.compressobj(wbits = 31)
+        if compression == CompressionHandler.BZ2:
+            return bz2.BZ2Compressor()
+        if compression == CompressionHandler.XZ:
+            return lzma.LZMACompressor()
+
+        raise ValueError(f'Compression {compression} is not supported!')
+
+    def __create_decompressor(self, compression: str):
+        """
+        Creates incremental decompressor for given codec.
+
+        Parameters:
+            compression (str): Name of codec.
+
+        Raises:
+            ValueError: If codec is not supported.
+
+        Returns:
+            (Any): Decompressor object with decompress method, eof and unused_data attributes.
+        """
+
+        if compression == CompressionHandler.GZIP:
+            return zlib.decompressobj(wbits = 31)
+        if compression == CompressionHandler.BZ2:
+            return bz2.BZ2Decompressor()
+        if compression == CompressionHandler.XZ:
+            return lzma.LZMADecompressor()
+
+        raise ValueError(f'Compression {compression} is not supported!')
+
+    def get_extension(self, compression: Optional[str]) -> str:
+        """
+        Returns file extension denoting given codec.
+
+        Parameters:
+            compression (Optional[str]): Name of codec, or None if data is not compressed.
+
+        Returns:
+            (str): File extension, empty for not compressed data.
+        """
+
+        return CompressionHandler.EXTENSIONS.get(compression, '') if compression else ''
+
+    def strip_extension(self, file_name: str) -> str:
+        """
+        Removes extension denoting any supported codec from file name.
+
+        Parameters:
+            file_name (str): Name of file, e.g. 'data.csv.gz'.
+
+        Returns:
+            (str): Name of file without codec extension, e.g. 'data.csv'.
+        """
+
+        for extension in CompressionHandler.EXTENSIONS.values():
+            if file_name.endswith(extension):
+                return file_name[:-len(extension)]
+
+        return file_name
+
+    def detect_compression(self, header: bytes) -> Optional[str]:
+        """
+        Detects codec from leading bytes of data.
+
+        Parameters:
+            header (bytes): Leading bytes of data.
+
+        Returns:
+            (Optional[str]): Name of codec, or None if data is not compressed.
+        """
+
+        for compression, magic_bytes in CompressionHandler.MAGIC_BYTES.items():
+            if header.startswith(magic_bytes):
+                return compression
+
+        return None
+
+    def detect_file_compression(self, file_path: str) -> Optional[str]:
+        """
+        Detects codec that file is compressed with.
+
+        Parameters:
+            file_path (str): Path to file.
+
+        Returns:
+            (Optional[str]): Name of codec, or None if file is not compressed.
+        """
+
+        with open(file_path, 'rb') as file:
+            return self.detect_compression(file.read(8))
+
+    def read_file_chunks(self, file_path: str) -> Iterator[bytes]:
+        """
+        Reads file block by block.
+
+        Parameters:
+            file_path (str): Path to file.
+
+        Returns:
+            (Iterator[bytes]): Blocks of file content.
+        """
+
+        with open(file_path, 'rb') as file:
+            while block := file.read(self.__block_size):
+                yield block
+
+    def compress_chunks(self, chunks: Iterable[Union[str, bytes]], compression: Optional[str]) -> Iterator[bytes]:
+        """
+        Compresses chunks of data on the fly.
+
+        Parameters:
+            chunks (Iterable[Union[str, bytes]]): Chunks of data, strings are encoded as UTF-8.
+            compression (Optional[str]): Name of codec. If None, chunks are only encoded.
+
+        Raises:
+            ValueError: If codec is not supported.
+
+        Returns:
+            (Iterator[bytes]): Compressed data.
+        """
+
+        compressor = self.__create_compressor(compression) if compression else None
+        for chunk in chunks:
+            chunk = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+            if compressor is None:
+                yield chunk
+            elif compressed_chunk := compressor.compress(chunk):
+                yield compressed_chunk
+
+        if compressor is not None:
+            yield compressor.flush()
+
+    def decompress_to_file(self, source: BinaryIO, destination_path: str) -> Optional[str]:
+        """
+        Writes data read from file object into file, decompressing it on the fly if it
+        turns out to be compressed. Data concatenated from many compressed streams is
+        decompressed as a whole.
+
+        Parameters:
+            source (BinaryIO): File object, e.g. opened file or HTTP response.
+            destination_path (str): Path to file that decompressed data should be written to.
+
+        Returns:
+            (Optional[str]): Name of detected codec, or None if data was not compressed.
+        """
+
+        block = source.read(self.__block_size)
+        compression = self.detect_compression(block)
+        decompressor = self.__create_decompressor(compression) if compression else None
+        with open(destination_path, 'wb') as destination:
+            while block:
+                if decompressor is None:
+                    destination.write(block)
+                else:
+                    while block:
+                        if decompressor.eof:
+                            decompressor = self.__create_decompressor(compression)
+                        destination.write(decompressor.decompress(block))
+                        block = decompressor.unused_data if decompressor.eof else b''
+                block = source.read(self.__block_size)
+
+        return compression
@@ -0,0 +1,114 @@
+# utils/file_lock.py
+
+import os
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+class FileLock():
+    """
+    Responsible for exclusive locking between processes sharing a directory, e.g. workers
+    of a sweep writing to the same store or cache. Lock is held on lock file with flock,
+    or with msvcrt locking on Windows, so it is released by operating system once process
+    holding it dies and never has to be broken. Lock file itself is never removed, as
+    removing it would let two processes lock different files under the same path.
+    """
+
+    # Constants used locally
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, path: str) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            path (str): Path to lock file. It is created if it does not exist.
+        """
+
+        self.__path: str = path
+        self.__descriptor: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        """
+        Attempts to acquire lock without waiting.
+
+        Raises:
+            RuntimeError: If lock is already held by this object.
+
+        Returns:
+            (bool): True if lock was acquired, False if it is held by someone else.
+        """
+
+        if self.__descriptor is not None:
+            raise RuntimeError(f'Lock {self.__path} is already acquired!')
+
+        descriptor = os.open(self.__path, os.O_CREAT | os.O_RDWR)
+        try:
+            if fcntl is not None:
+                fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(descriptor, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(descriptor)
+            return False
+
+        self.__descriptor = descriptor
+        return True
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """
+        Acquires lock, waiting until it is released by someone else.
+
+        Parameters:
+            timeout (Optional[float]): Maximal number of seconds to wait. Waits indefinitely if None.
+
+        Raises:
+            RuntimeError: If lock could not be acquired within timeout.
+        """
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self.try_acquire():
+            if deadline is not None and time.monotonic() > deadline:
+                raise RuntimeError(f'Did not managed to acquire lock {self.__path} within {timeout} seconds!')
+            time.sleep(FileLock.POLL_INTERVAL)
+
+    def release(self) -> None:
+        """
+        Releases lock. Does nothing if lock is not held.
+        """
+
+        if self.__descriptor is None:
+            return
+
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.__descriptor, fcntl.LOCK_UN)
+            else:
+                os.lseek(self.__descriptor, 0, os.SEEK_SET)
+                msvcrt.locking(self.__descriptor, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self.__descriptor)
+            self.__descriptor = None
+
+    def __enter__(self) -> 'FileLock':
+        """
+        Acquires lock when entering context.
+
+        Returns:
+            (FileLock): Lock itself.
+        """
+
+        self.acquire()
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        """
+        Releases lock when leaving context.
+        """
+
+        self.release()
@@ -0,0 +1,415 @@
+# utils/indexed_data_set.py
+
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Optional
+import numpy as np
+import pandas as pd
+
+"""
+Leading and trailing bytes of indexed data set file. Layout of file is following:
+magic bytes, compressed blocks of rows, JSON footer indexing blocks, footer length
+and magic bytes again, so footer can be located with single range read of file end.
+"""
+INDEXED_DATA_SET_MAGIC_BYTES = b'CEIDS\x00\x01\n'
+INDEXED_DATA_SET_EXTENSION = '.ids'
+
+class IndexedDataSetWriter():
+    """
+    Responsible for writing data sets in indexed binary layout. Rows are split into
+    blocks of fixed number of rows, each block stores its columns one after another
+    and is compressed separately, and footer records byte range of every block. Thanks
+    to that any range of rows can be read without reading the whole data set.
+    """
+
+    # Constants used locally
+    ROWS_PER_BLOCK = 4096
+    DATETIME_DTYPE = 'datetime64[ns]'
+
+    def __init__(self, rows_per_block: int = ROWS_PER_BLOCK) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            rows_per_block (int): Number of rows stored in single block.
+        """
+
+        self.__rows_per_block: int = rows_per_block
+
+    def __prepare_columns(self, data: pd.DataFrame) -> dict[str, tuple[str, np.ndarray]]:
+        """
+        Converts columns into arrays of 8 byte values. Index other than default one,
+        e.g. time index of candles, is stored as regular column.
+
+        Parameters:
+            data (pd.DataFrame): Data set to be written.
+
+        Raises:
+            ValueError: If column is neither numeric nor convertible to dates.
+
+        Returns:
+            (dict[str, tuple[str, np.ndarray]]): Dictionary mapping column names onto
+                stored dtype and values.
+        """
+
+        if not isinstance(data.index, pd.RangeIndex):
+            data = data.reset_index()
+
+        columns = {}
+        for column in data.columns:
+            values = data[column]
+            if pd.api.types.is_bool_dtype(values) or pd.api.types.is_integer_dtype(values):
+                columns[str(column)] = ('int64', values.values.astype(np.int64))
+            elif pd.api.types.is_numeric_dtype(values):
+                columns[str(column)] = ('float64', values.values.astype(np.float64))
+            else:
+                try:
+                    dates = pd.DatetimeIndex(pd.to_datetime(values))
+                except (ValueError, TypeError) as e:
+                    raise ValueError(f'Column {column} is neither numeric nor date column!') from e
+                if dates.tz is not None:
+                    dates = dates.tz_convert('UTC').tz_localize(None)
+                columns[str(column)] = (IndexedDataSetWriter.DATETIME_DTYPE, dates.values.astype(np.int64))
+
+        return columns
+
+    def generate_chunks(self, data: pd.DataFrame) -> Iterator[bytes]:
+        """
+        Encodes data set block by block, e.g. to be uploaded as stream.
+
+        Parameters:
+            data (pd.DataFrame): Data set to be written.
+
+        Raises:
+            ValueError: If column is neither numeric nor convertible to dates.
+
+        Returns:
+            (Iterator[bytes]): Consecutive parts of encoded data set.
+        """
+
+        columns = self.__prepare_columns(data)
+        yield INDEXED_DATA_SET_MAGIC_BYTES
+
+        blocks = []
+        offset = len(INDEXED_DATA_SET_MAGIC_BYTES)
+        for start in range(0, len(data), self.__rows_per_block):
+            stop = min(start + self.__rows_per_block, len(data))
+            block = zlib.compress(b''.join(values[start:stop].tobytes() for _, values in columns.values()))
+            blocks.append([offset, len(block), stop - start])
+            offset += len(block)
+            yield block
+
+        footer = json.dumps({
+            'columns': list(columns.keys()),
+            'dtypes': [dtype for dtype, _ in columns.values()],
+            'number_of_rows': len(data),
+            'rows_per_block': self.__rows_per_block,
+            'blocks': blocks
+        }).encode('utf-8')
+        yield footer + struct.pack('<Q', len(footer)) + INDEXED_DATA_SET_MAGIC_BYTES
+
+    def write(self, data: pd.DataFrame, file_path: str) -> None:
+        """
+        Writes data set into file.
+
+        Parameters:
+            data (pd.DataFrame): Data set to be written.
+            file_path (str): Path to file.
+
+        Raises:
+            ValueError: If column is neither numeric nor convertible to dates.
+        """
+
+        with open(file_path, 'wb') as file:
+            for chunk in self.generate_chunks(data):
+                file.write(chunk)
+
+class IndexedDataSetReader():
+    """
+    Responsible for reading rows of data sets stored in indexed binary layout. Only
+    blocks covering requested rows are fetched, with consecutive missing blocks fetched
+    by single range read, and recently used blocks are kept in LRU cache. Bytes are
+    read by given function, so data set can be stored locally or e.g. in S3 bucket.
+    """
+
+    # Constants used locally
+    CACHE_SIZE = 64
+    TRAILER_SIZE = 8 + len(INDEXED_DATA_SET_MAGIC_BYTES)
+
+    def __init__(self, read_range: Callable[[int, int], bytes], size: int, cache_size: int = CACHE_SIZE) -> None:
+        """
+        Class constructor. Reads footer of data set.
+
+        Parameters:
+            read_range (Callable[[int, int], bytes]): Function returning bytes from given
+                start offset up to given stop offset (exclusive).
+            size (int): Size of data set in bytes.
+            cache_size (int): Number of decoded blocks kept in cache.
+
+        Raises:
+            ValueError: If data is not indexed data set.
+        """
+
+        self.__read_range: Callable[[int, int], bytes] = read_range
+        self.__cache_size: int = cache_size
+        self.__cache: OrderedDict[int, dict[str, np.ndarray]] = OrderedDict()
+        self.__lock: threading.Lock = threading.Lock()
+        self.fetched_bytes: int = 0
+
+        if size < IndexedDataSetReader.TRAILER_SIZE:
+            raise ValueError('Data is not indexed data set!')
+        trailer = self.__fetch(size - IndexedDataSetReader.TRAILER_SIZE, size)
+        if not trailer.endswith(INDEXED_DATA_SET_MAGIC_BYTES):
+            raise ValueError('Data is not indexed data set!')
+
+        footer_size = struct.unpack('<Q', trailer[:8])[0]
+        footer_start = size - IndexedDataSetReader.TRAILER_SIZE - footer_size
+        footer = json.loads(self.__fetch(footer_start, footer_start + footer_size).decode('utf-8'))
+        self.columns: list[str] = footer['columns']
+        self.__dtypes: list[str] = footer['dtypes']
+        self.__number_of_rows: int = footer['number_of_rows']
+        self.__rows_per_block: int = footer['rows_per_block']
+        self.__blocks: list[list[int]] = footer['blocks']
+
+    @classmethod
+    def from_file(cls, file_path: str, cache_size: int = CACHE_SIZE) -> 'IndexedDataSetReader':
+        """
+        Creates reader of data set stored in local file.
+
+        Parameters:
+            file_path (str): Path to file.
+            cache_size (int): Number of decoded blocks kept in cache.
+
+        Returns:
+            (IndexedDataSetReader): Reader of data set.
+        """
+
+        def read_range(start: int, stop: int) -> bytes:
+            with open(file_path, 'rb') as file:
+                file.seek(start)
+                return file.read(stop - start)
+
+        return cls(read_range, os.path.getsize(file_path), cache_size)
+
+    @classmethod
+    def from_s3(cls, aws_handler: Any, bucket_name: str, file_name: str,
+                cache_size: int = CACHE_SIZE) -> 'IndexedDataSetReader':
+        """
+        Creates reader of data set stored in S3 bucket, fetching blocks with byte range requests.
+
+        Parameters:
+            aws_handler (AWSHandler): Handler used to communicate with S3 bucket.
+            bucket_name (str): The name of the S3 bucket.
+            file_name (str): The key/path of the file in the S3 bucket.
+            cache_size (int): Number of decoded blocks kept in cache.
+
+        Returns:
+            (IndexedDataSetReader): Reader of data set.
+        """
+
+        return cls(lambda start, stop: aws_handler.read_s3_object_range(bucket_name, file_name, start, stop),
+                   aws_handler.get_s3_object_size(bucket_name, file_name), cache_size)
+
+    @staticmethod
+    def is_indexed_data_set(file_path: str) -> bool:
+        """
+        Checks if local file is stored in indexed binary layout.
+
+        Parameters:
+            file_path (str): Path to file.
+
+        Returns:
+            (bool): True if file is indexed data set, False otherwise.
+        """
+
+        with open(file_path, 'rb') as file:
+            return file.read(len(INDEXED_DATA_SET_MAGIC_BYTES)) == INDEXED_DATA_SET_MAGIC_BYTES
+
+    def __len__(self) -> int:
+        """
+        Returns number of rows in data set.
+
+        Returns:
+            (int): Number of rows.
+        """
+
+        return self.__number_of_rows
+
+    def __fetch(self, start: int, stop: int) -> bytes:
+        """
+        Reads bytes and counts them.
+
+        Parameters:
+            start (int): Start offset.
+            stop (int): Stop offset (exclusive).
+
+        Returns:
+            (bytes): Read bytes.
+        """
+
+        data = self.__read_range(start, stop)
+        self.fetched_bytes += len(data)
+
+        return data
+
+    def __decode_block(self, block: bytes, number_of_rows: int) -> dict[str, np.ndarray]:
+        """
+        Decodes compressed block into column arrays.
+
+        Parameters:
+            block (bytes): Compressed block.
+            number_of_rows (int): Number of rows stored in block.
+
+        Returns:
+            (dict[str, np.ndarray]): Dictionary mapping column names onto values.
+        """
+
+        buffer = zlib.decompress(block)
+        columns = {}
+        for i, (column, dtype) in enumerate(zip(self.columns, self.__dtypes)):
+            values = np.frombuffer(buffer, dtype = np.int64 if dtype != 'float64' else np.float64,
+                                   count = number_of_rows, offset = i * number_of_rows * 8)
+            columns[column] = values.view(dtype) if dtype == IndexedDataSetWriter.DATETIME_DTYPE else values
+
+        return columns
+
+    def __get_blocks(self, block_numbers: range) -> dict[int, dict[str, np.ndarray]]:
+        """
+        Returns decoded blocks, fetching runs of consecutive missing blocks with single read each.
+
+        Parameters:
+            block_numbers (range): Numbers of requested blocks.
+
+        Returns:
+            (dict[int, dict[str, np.ndarray]]): Dictionary mapping block numbers onto decoded blocks.
+        """
+
+        with self.__lock:
+            blocks = {}
+            missing_block_numbers = []
+            for block_number in block_numbers:
+                if block_number in self.__cache:
+                    self.__cache.move_to_end(block_number)
+                    blocks[block_number] = self.__cache[block_number]
+                else:
+                    missing_block_numbers.append(block_number)
+
+            runs = []
+            for block_number in missing_block_numbers:
+                if runs and runs[-1][-1] == block_number - 1:
+                    runs[-1].append(block_number)
+                else:
+                    runs.append([block_number])
+
+            for run in runs:
+                run_start = self.__blocks[run[0]][0]
+                run_stop = self.__blocks[run[-1]][0] + self.__blocks[run[-1]][1]
+                run_data = self.__fetch(run_start, run_stop)
+                for block_number in run:
+                    offset, length, number_of_rows = self.__blocks[block_number]
+                    blocks[block_number] = self.__decode_block(run_data[offset - run_start:offset - run_start + length],
+                                                               number_of_rows)
+                    self.__cache[block_number] = blocks[block_number]
+                    if len(self.__cache) > self.__cache_size:
+                        self.__cache.popitem(last = False)
+
+            return blocks
+
+    def read_rows(self, start: int, stop: int) -> pd.DataFrame:
+        """
+        Reads range of rows.
+
+        Parameters:
+            start (int): Index of the first row.
+            stop (int): Index of row after the last one.
+
+        Returns:
+            (pd.DataFrame): Rows indexed by their position in data set.
+        """
+
+        start, stop = max(start, 0), min(stop, self.__number_of_rows)
+        if start >= stop:
+            return pd.DataFrame({column: np.empty(0, dtype = dtype) for column, dtype in zip(self.columns, self.__dtypes)},
+                                index = pd.RangeIndex(start, start))
+
+        first_block, last_block = start // self.__rows_per_block, (stop - 1) // self.__rows_per_block
+        blocks = self.__get_blocks(range(first_block, last_block + 1))
+        block_start = first_block * self.__rows_per_block
+        data = {column: np.concatenate([blocks[block_number][column]
+                                        for block_number in range(first_block, last_block + 1)])
+                [start - block_start:stop - block_start] for column in self.columns}
+
+        return pd.DataFrame(data, index = pd.RangeIndex(start, stop))
+
+class IndexedDataSetView():
+    """
+    Represents contiguous range of rows of indexed data set, e.g. its training or testing
+    part. Rows are fetched only once they are requested, and are indexed relatively to
+    the start of the view.
+    """
+
+    def __init__(self, reader: IndexedDataSetReader, start: int, stop: int) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            reader (IndexedDataSetReader): Reader of data set.
+            start (int): Index of the first row of view.
+            stop (int): Index of row after the last one of view.
+        """
+
+        self.__reader: IndexedDataSetReader = reader
+        self.__start: int = start
+        self.__stop: int = stop
+
+    def __len__(self) -> int:
+        """
+        Returns number of rows in view.
+
+        Returns:
+            (int): Number of rows.
+        """
+
+        return self.__stop - self.__start
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """
+        Returns shape of view, like in case of data frame.
+
+        Returns:
+            (tuple[int, int]): Number of rows and columns.
+        """
+
+        return (len(self), len(self.__reader.columns))
+
+    def get_rows(self, start: Optional[int], stop: Optional[int]) -> pd.DataFrame:
+        """
+        Reads range of rows of view. Negative or missing bounds are interpreted like in slices.
+
+        Parameters:
+            start (Optional[int]): Index of the first row, relative to view start.
+            stop (Optional[int]): Index of row after the last one, relative to view start.
+
+        Returns:
+            (pd.DataFrame): Rows indexed relatively to view start.
+        """
+
+        start, stop, _ = slice(start, stop).indices(len(self))
+        data = self.__reader.read_rows(self.__start + start, self.__start + max(start, stop))
+
+        return data.set_axis(pd.RangeIndex(start, start + len(data)), axis = 0)
+
+    def to_data_frame(self) -> pd.DataFrame:
+        """
+        Reads all rows of view.
+
+        Returns:
+            (pd.DataFrame): Rows indexed relatively to view start.
+        """
+
+        return self.get_rows(0, len(self))
@@ -0,0 +1,60 @@
+# utils/lazy_loader.py
+
+import importlib
+import sys
+from typing import Any
+
+class LazyLoader():
+    """
+    Responsible for lazy loading of names exported by package. Package's module level
+    __getattr__ and __dir__ are delegated to it, so that module defining exported name
+    is imported only on its first access. It lets entry points that use only light parts
+    of package, e.g. data set creation, avoid importing TensorFlow, keras-rl or reportlab.
+    """
+
+    def __init__(self, package_name: str, exports: dict[str, str]) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            package_name (str): Name of package that names are exported from.
+            exports (dict[str, str]): Dictionary mapping exported names onto modules, relative
+                to package, that they are defined in.
+        """
+
+        self.__package_name: str = package_name
+        self.__exports: dict[str, str] = exports
+
+    def load(self, name: str) -> Any:
+        """
+        Imports module defining exported name and caches that name in package, so that
+        further accesses do not go through this method.
+
+        Parameters:
+            name (str): Exported name.
+
+        Raises:
+            AttributeError: If name is not exported by package.
+
+        Returns:
+            (Any): Exported object.
+        """
+
+        module_name = self.__exports.get(name)
+        if module_name is None:
+            raise AttributeError(f'module {self.__package_name!r} has no attribute {name!r}')
+
+        value = getattr(importlib.import_module(module_name, self.__package_name), name)
+        setattr(sys.modules[self.__package_name], name, value)
+
+        return value
+
+    def list_names(self) -> list[str]:
+        """
+        Lists names available in package, including not yet loaded ones.
+
+        Returns:
+            (list[str]): Sorted names.
+        """
+
+        return sorted(set(vars(sys.modules[self.__package_name])) | set(self.__exports))
@@ -0,0 +1,54 @@
+# utils/metrics_callback.py
+
+import time
+from typing import Optional
+from tensorflow.keras.callbacks import Callback
+
+from .metrics_exporter import MetricsExporter
+
+class MetricsCallback(Callback):
+    """
+    Keras callback recording durations of training epochs and batches with MetricsExporter.
+    It does nothing while exporter is disabled. Batch hooks are the ones that both Keras fit
+    and keras-rl agents call, the latter treating each environment step as batch and each
+    episode as epoch.
+    """
+
+    def __init__(self) -> None:
+        """
+        Class constructor.
+        """
+
+        super().__init__()
+        self.__epoch_start_time: Optional[float] = None
+        self.__batch_start_time: Optional[float] = None
+
+    def on_epoch_begin(self, epoch: int, logs: Optional[dict] = None) -> None:
+        """
+        Starts timing of epoch.
+        """
+
+        self.__epoch_start_time = time.perf_counter()
+
+    def on_epoch_end(self, epoch: int, logs: Optional[dict] = None) -> None:
+        """
+        Records duration of epoch.
+        """
+
+        if self.__epoch_start_time is not None:
+            MetricsExporter.observe_keras_epoch(time.perf_counter() - self.__epoch_start_time)
+
+    def on_batch_begin(self, batch: int, logs: Optional[dict] = None) -> None:
+        """
+        Starts timing of training batch, or of agent step.
+        """
+
+        self.__batch_start_time = time.perf_counter()
+
+    def on_batch_end(self, batch: int, logs: Optional[dict] = None) -> None:
+        """
+        Records duration of training batch, or of agent step.
+        """
+
+        if self.__batch_start_time is not None:
+            MetricsExporter.observe_keras_batch(time.perf_counter() - self.__batch_start_time)
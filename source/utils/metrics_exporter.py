@@ -0,0 +1,225 @@
+# utils/metrics_exporter.py
+
+import time
+from typing import Any, Optional
+
+"""
+Buckets of histograms, in seconds. Environment step takes from tens of microseconds
+to milliseconds, requests and batches from milliseconds to seconds, while epochs can
+take even hours.
+"""
+STEP_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 1.0)
+REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BATCH_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+EPOCH_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0, 1800.0, 3600.0, 10800.0)
+
+class MetricsExporter():
+    """
+    Responsible for exporting Prometheus metrics of training and environment hot paths,
+    i.e. environment step latency and rate, orders placed and closed by broker, latency
+    and retries of Coinbase requests, and Keras epoch and batch times. Metrics are shared
+    by the whole process and exposed over local HTTP endpoint. Exporter is disabled by
+    default, in which case every observation returns right away, and prometheus-client
+    is not even imported.
+    """
+
+    # Constants used locally
+    DEFAULT_PORT = 8000
+    DEFAULT_ADDRESS = '127.0.0.1'
+    NAMESPACE = 'crypto_evolution'
+    STEPS_RATE_WINDOW = 1.0
+
+    # State shared by the whole process
+    __metrics: Optional[dict[str, Any]] = None
+    __registry: Optional[Any] = None
+    __steps_window_start: float = 0.0
+    __steps_window_count: int = 0
+
+    @classmethod
+    def enable(cls, port: Optional[int] = DEFAULT_PORT, address: str = DEFAULT_ADDRESS) -> None:
+        """
+        Creates metrics and starts HTTP endpoint serving them. Does nothing if exporter
+        is already enabled.
+
+        Parameters:
+            port (Optional[int]): Port of HTTP endpoint. Endpoint is not started if None,
+                e.g. when metrics are only read from registry.
+            address (str): Address that HTTP endpoint is bound to.
+
+        Raises:
+            RuntimeError: If prometheus-client is not installed.
+        """
+
+        if cls.__metrics is not None:
+            return
+
+        try:
+            from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+        except ImportError as e:
+            raise RuntimeError(f'Metrics require prometheus-client to be installed! Original error: {e}')
+
+        registry = CollectorRegistry()
+        common = {'namespace': MetricsExporter.NAMESPACE, 'registry': registry}
+        metrics = {
+            'environment_step_duration': Histogram('environment_step_duration_seconds',
+                                                   'Duration of trading environment step.',
+                                                   buckets = STEP_BUCKETS, **common),
+            'environment_steps_per_second': Gauge('environment_steps_per_second',
+                                                  'Number of trading environment steps per second.', **common),
+            'broker_orders_placed': Counter('broker_orders_placed_total', 'Number of orders placed by broker.',
+                                            ['side'], **common),
+            'broker_orders_closed': Counter('broker_orders_closed_total', 'Number of orders closed by broker.',
+                                            ['reason'], **common),
+            'coinbase_request_duration': Histogram('coinbase_request_duration_seconds',
+                                                   'Duration of single attempt of Coinbase API request.',
+                                                   buckets = REQUEST_BUCKETS, **common),
+            'coinbase_request_retries': Counter('coinbase_request_retries_total',
+                                                'Number of retried Coinbase API requests.', ['reason'], **common),
+            'keras_epoch_duration': Histogram('keras_epoch_duration_seconds', 'Duration of Keras training epoch.',
+                                              buckets = EPOCH_BUCKETS, **common),
+            'keras_batch_duration': Histogram('keras_batch_duration_seconds', 'Duration of Keras training batch.',
+                                              buckets = BATCH_BUCKETS, **common)
+        }
+
+        if port is not None:
+            start_http_server(port, address, registry)
+
+        cls.__registry = registry
+        cls.__steps_window_start = time.perf_counter()
+        cls.__steps_window_count = 0
+        cls.__metrics = metrics
+
+    @classmethod
+    def disable(cls) -> None:
+        """
+        Stops collecting metrics. Already started HTTP endpoint keeps serving last values.
+        """
+
+        cls.__metrics = None
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """
+        Checks if metrics are collected.
+
+        Returns:
+            (bool): True if exporter is enabled, False otherwise.
+        """
+
+        return cls.__metrics is not None
+
+    @classmethod
+    def get_registry(cls) -> Optional[Any]:
+        """
+        Returns registry holding metrics.
+
+        Returns:
+            (Optional[CollectorRegistry]): Registry, None if exporter was never enabled.
+        """
+
+        return cls.__registry
+
+    @classmethod
+    def observe_environment_step(cls, duration: float) -> None:
+        """
+        Records environment step and updates steps rate once per rate window.
+
+        Parameters:
+            duration (float): Duration of step in seconds.
+        """
+
+        if cls.__metrics is None:
+            return
+
+        cls.__metrics['environment_step_duration'].observe(duration)
+        cls.__steps_window_count += 1
+        now = time.perf_counter()
+        elapsed = now - cls.__steps_window_start
+        if elapsed >= MetricsExporter.STEPS_RATE_WINDOW:
+            cls.__metrics['environment_steps_per_second'].set(cls.__steps_window_count / elapsed)
+            cls.__steps_window_start = now
+            cls.__steps_window_count = 0
+
+    @classmethod
+    def count_placed_order(cls, is_buy_order: bool) -> None:
+        """
+        Records order placed by broker.
+
+        Parameters:
+            is_buy_order (bool): Indicates whether order is buy (long) or sell (short) position.
+        """
+
+        if cls.__metrics is None:
+            return
+
+        cls.__metrics['broker_orders_placed'].labels('buy' if is_buy_order else 'sell').inc()
+
+    @classmethod
+    def count_closed_order(cls, reason: str) -> None:
+        """
+        Records order closed by broker.
+
+        Parameters:
+            reason (str): Reason of closing, e.g. 'take_profit' or 'stop_loss'.
+        """
+
+        if cls.__metrics is None:
+            return
+
+        cls.__metrics['broker_orders_closed'].labels(reason).inc()
+
+    @classmethod
+    def observe_coinbase_request(cls, duration: float) -> None:
+        """
+        Records single attempt of Coinbase API request.
+
+        Parameters:
+            duration (float): Duration of attempt in seconds.
+        """
+
+        if cls.__metrics is None:
+            return
+
+        cls.__metrics['coinbase_request_duration'].observe(duration)
+
+    @classmethod
+    def count_coinbase_retry(cls, reason: str) -> None:
+        """
+        Records retry of Coinbase API request.
+
+        Parameters:
+            reason (str): Reason of retry, e.g. 'rate_limited', 'server_error' or 'connection_error'.
+        """
+
+        if cls.__metrics is None:
+            return
+
+        cls.__metrics['coinbase_request_retries'].labels(reason).inc()
+
+    @classmethod
+    def observe_keras_epoch(cls, duration: float) -> None:
+        """
+        Records Keras training epoch.
+
+        Parameters:
+            duration (float): Duration of epoch in seconds.
+        """
+
+        if cls.__metrics is None:
+            return
+
+        cls.__metrics['keras_epoch_duration'].observe(duration)
+
+    @classmethod
+    def observe_keras_batch(cls, duration: float) -> None:
+        """
+        Records Keras training batch.
+
+        Parameters:
+            duration (float): Duration of batch in seconds.
+        """
+
+        if cls.__metrics is None:
+            return
+
+        cls.__metrics['keras_batch_duration'].observe(duration)
@@ -0,0 +1,197 @@
+# utils/phase_profiler.py
+
+import contextlib
+import json
+import sys
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+class PhaseProfiler():
+    """
+    Responsible for profiling phases of training, e.g. environment construction, model fit
+    or plot rendering. Phases are measured with nested timers shared by the whole process,
+    so that they can be started deep in call stack without passing profiler around. Counters,
+    e.g. environment steps or training samples, are attributed to every phase active while
+    they were counted, which allows calculating throughput of each phase.
+    """
+
+    # Constants used locally
+    PATH_SEPARATOR = '/'
+    ENVIRONMENT_STEPS = 'environment_steps'
+    SAMPLES = 'samples'
+
+    # State shared by the whole process
+    __lock: threading.Lock = threading.Lock()
+    __phases: dict[str, dict[str, Any]] = {}
+    __stack: list[str] = []
+    __counters: dict[str, int] = {}
+    __start_time: float = time.perf_counter()
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Clears all measured phases and counters. Phases that are still running are
+        kept, so that phases started within them remain nested.
+        """
+
+        with cls.__lock:
+            cls.__phases = {path: {'calls': 0, 'total_time': 0.0, 'child_time': 0.0, 'counters': {}}
+                            for path in cls.__stack}
+            cls.__counters = {}
+            cls.__start_time = time.perf_counter()
+
+    @classmethod
+    @contextlib.contextmanager
+    def measure(cls, name: str) -> Iterator[None]:
+        """
+        Measures phase executed within context, or within decorated function. Phase started
+        within other phase is nested in it, and phases with the same path are accumulated
+        over calls.
+
+        Parameters:
+            name (str): Name of phase.
+
+        Returns:
+            (Iterator[None]): Context manager measuring phase.
+        """
+
+        parent_path = cls.__stack[-1] if cls.__stack else None
+        path = name if parent_path is None else parent_path + PhaseProfiler.PATH_SEPARATOR + name
+        with cls.__lock:
+            cls.__phases.setdefault(path, {'calls': 0, 'total_time': 0.0, 'child_time': 0.0, 'counters': {}})
+        cls.__stack.append(path)
+        start_counters = dict(cls.__counters)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start_time
+            cls.__stack.pop()
+            with cls.__lock:
+                phase = cls.__phases[path]
+                phase['calls'] += 1
+                phase['total_time'] += duration
+                for counter_name, value in cls.__counters.items():
+                    counted = value - start_counters.get(counter_name, 0)
+                    if counted:
+                        phase['counters'][counter_name] = phase['counters'].get(counter_name, 0) + counted
+                if parent_path is not None:
+                    cls.__phases[parent_path]['child_time'] += duration
+
+    @classmethod
+    def count(cls, name: str, amount: int = 1) -> None:
+        """
+        Increases counter. It is cheap enough to be called on every environment step.
+
+        Parameters:
+            name (str): Name of counter.
+            amount (int): Value that counter is increased by.
+        """
+
+        cls.__counters[name] = cls.__counters.get(name, 0) + amount
+
+    @staticmethod
+    def get_peak_rss() -> Optional[int]:
+        """
+        Returns peak resident set size of current process.
+
+        Returns:
+            (Optional[int]): Peak RSS in bytes, None if platform does not provide it.
+        """
+
+        if resource is None:
+            return None
+
+        # Linux reports peak RSS in kilobytes, while macOS in bytes
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+    @classmethod
+    def get_profile(cls) -> dict[str, Any]:
+        """
+        Returns profile of phases measured since last reset. Throughput of each counter is
+        calculated over the shortest phase that it was fully counted in, or over the whole
+        profiled time if there is no such phase.
+
+        Returns:
+            (dict[str, Any]): Profile with total time, list of finished phases in order of their
+                first start, counters, throughput per second and peak RSS in bytes.
+        """
+
+        with cls.__lock:
+            phases = []
+            for path, phase in cls.__phases.items():
+                if phase['calls'] == 0:
+                    continue
+                phases.append({
+                    'path': path,
+                    'depth': path.count(PhaseProfiler.PATH_SEPARATOR),
+                    'calls': phase['calls'],
+                    'total_time': phase['total_time'],
+                    'self_time': phase['total_time'] - phase['child_time'],
+                    'counters': dict(phase['counters']),
+                    'throughput': {f'{name}_per_second': value / phase['total_time']
+                                   for name, value in phase['counters'].items() if phase['total_time'] > 0}
+                })
+            counters = dict(cls.__counters)
+            total_time = time.perf_counter() - cls.__start_time
+
+        throughput = {}
+        for name, value in counters.items():
+            covering_times = [phase['total_time'] for phase in phases
+                              if phase['counters'].get(name, 0) == value and phase['total_time'] > 0]
+            throughput[f'{name}_per_second'] = value / min(covering_times, default = total_time)
+
+        return {
+            'total_time': total_time,
+            'phases': phases,
+            'counters': counters,
+            'throughput': throughput,
+            'peak_rss_bytes': PhaseProfiler.get_peak_rss()
+        }
+
+    @classmethod
+    def save_profile(cls, path: str) -> None:
+        """
+        Saves profile in JSON format.
+
+        Parameters:
+            path (str): Path to JSON file.
+        """
+
+        with open(path, 'w') as profile_file:
+            json.dump(cls.get_profile(), profile_file, indent = 2)
+
+    @staticmethod
+    def format_profile(profile: dict[str, Any]) -> list[str]:
+        """
+        Formats profile into human readable table, e.g. for report.
+
+        Parameters:
+            profile (dict[str, Any]): Profile returned by get_profile.
+
+        Returns:
+            (list[str]): Lines of table.
+        """
+
+        lines = [f"{'Phase':<48}{'Calls':>7}{'Total [s]':>12}{'Self [s]':>12}{'Share':>8}"]
+        for phase in profile['phases']:
+            name = '  ' * phase['depth'] + phase['path'].split(PhaseProfiler.PATH_SEPARATOR)[-1]
+            share = phase['total_time'] / profile['total_time'] if profile['total_time'] > 0 else 0.0
+            lines.append(f"{name:<48}{phase['calls']:>7}{phase['total_time']:>12.2f}"
+                         f"{phase['self_time']:>12.2f}{share:>8.1%}")
+
+        lines.append('')
+        lines.append(f"Total time: {profile['total_time']:.2f} s")
+        for name, value in profile['counters'].items():
+            lines.append(f"{name}: {value} ({profile['throughput'][f'{name}_per_second']:.1f}/s)")
+        if profile['peak_rss_bytes'] is not None:
+            lines.append(f"Peak RSS: {profile['peak_rss_bytes'] / 1024 ** 2:.1f} MiB")
+
+        return lines
@@ -0,0 +1,266 @@
+# tests/mock_coinbase_server.py
+
+import asyncio
+import json
+import math
+import random
+import time
+from collections import deque
+from typing import Optional
+from aiohttp import web
+from source.coinbase import CoinBaseHandler
+from source.utils import Granularity
+
+class MockCoinbaseServer():
+    """
+    Implements local HTTP server standing in for Coinbase API. It mimics /products and
+    /products/{id}/candles endpoints, replaying recorded candles or generating synthetic
+    ones for products that were not recorded. Latency, rate limiting and errors can be
+    configured, so fetching can be tested and benchmarked without network access.
+    """
+
+    # Constants used locally
+    MAX_NUMBER_OF_CANDLES_PER_REQUEST = 300
+    DEFAULT_PRODUCTS = ['BTC-USD', 'ETH-USD', 'ETH-BTC']
+
+    def __init__(self, recorded_candles: Optional[dict[str, list[list]]] = None,
+                 products: list[str] = DEFAULT_PRODUCTS, latency: float = 0.0,
+                 max_requests_per_second: Optional[int] = None, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = 0) -> None:
+        """
+        Class constructor.
+
+        Parameters:
+            recorded_candles (Optional[dict[str, list[list]]]): Dictionary mapping product ids
+                onto candles in Coinbase format, i.e. [time, low, high, open, close, volume].
+            products (list[str]): Product ids returned by /products endpoint. Products with
+                recorded candles are always included.
+            latency (float): Number of seconds that every response is delayed by.
+            max_requests_per_second (Optional[int]): Number of requests accepted within any
+                second, exceeding requests are rejected with 429 status. Not limited if None.
+            error_rate (float): Probability of responding with 500 status.
+            rate_limit_rate (float): Probability of responding with rate limit message
+                regardless of actual request rate.
+            seed (int): Seed of random generator used for errors injection.
+        """
+
+        self.recorded_candles = {product_id: sorted(candles, reverse = True)
+                                 for product_id, candles in (recorded_candles or {}).items()}
+        self.products = sorted(set(products) | set(self.recorded_candles.keys()))
+        self.latency = latency
+        self.max_requests_per_second = max_requests_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.request_count = 0
+        self.rejected_request_count = 0
+        self.__random = random.Random(seed)
+        self.__request_times = deque()
+        self.__runner: Optional[web.AppRunner] = None
+        self.__port: Optional[int] = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Returns URL address that server listens at, to be passed to CoinBaseHandler.
+
+        Returns:
+            (str): Base URL address of server.
+        """
+
+        return f'http://127.0.0.1:{self.__port}'
+
+    @staticmethod
+    def generate_candles(start: int, end: int, granularity: int) -> list[list]:
+        """
+        Generates deterministic synthetic candles from given range.
+
+        Parameters:
+            start (int): Start timestamp of range.
+            end (int): End timestamp (inclusive) of range.
+            granularity (int): Number of seconds between candles.
+
+        Returns:
+            (list[list]): Candles in Coinbase format, starting from the newest one.
+        """
+
+        candles = []
+        for timestamp in range(end // granularity * granularity, start - 1, -granularity):
+            price = 100 + 10 * math.sin(timestamp / 86400)
+            candles.append([timestamp, price - 1, price + 1, price - 0.5, price + 0.5,
+                            1000 + timestamp // granularity % 100])
+
+        return candles
+
+    @staticmethod
+    def save_recording(path: str, recorded_candles: dict[str, list[list]]) -> None:
+        """
+        Saves recorded candles into JSON file.
+
+        Parameters:
+            path (str): Path to JSON file.
+            recorded_candles (dict[str, list[list]]): Dictionary mapping product ids onto candles.
+        """
+
+        with open(path, 'w') as file:
+            json.dump(recorded_candles, file)
+
+    @staticmethod
+    def load_recording(path: str) -> dict[str, list[list]]:
+        """
+        Loads recorded candles from JSON file.
+
+        Parameters:
+            path (str): Path to JSON file.
+
+        Returns:
+            (dict[str, list[list]]): Dictionary mapping product ids onto candles.
+        """
+
+        with open(path, 'r') as file:
+            return json.load(file)
+
+    @staticmethod
+    async def record(path: str, trading_pairs: list[str], start_date: str, end_date: str,
+                     granularity: Granularity) -> None:
+        """
+        Records candles from actual Coinbase API, so they can be replayed offline later.
+
+        Parameters:
+            path (str): Path to JSON file that candles should be saved in.
+            trading_pairs (list[str]): List of unique trainding pair symbols.
+            start_date (str): String representing date that recorded data should start from.
+            end_date (str): String representing date that recorded data should finish at.
+            granularity (Granularity): Enum specifying resolution of recorded data.
+        """
+
+        recorded_candles = {}
+        async with CoinBaseHandler() as handler:
+            for trading_pair in trading_pairs:
+                data = await handler.get_candles_for(trading_pair, start_date, end_date, granularity)
+                timestamps = data.index.values.astype('datetime64[s]').astype(int)
+                recorded_candles[trading_pair] = [[int(timestamp), *row] for timestamp, row in
+                                                  zip(timestamps, data[['low', 'high', 'open', 'close', 'volume']].values.tolist())]
+
+        MockCoinbaseServer.save_recording(path, recorded_candles)
+
+    def __is_rate_limited(self) -> bool:
+        """
+        Checks if current request exceeds configured number of requests per second.
+
+        Returns:
+            (bool): True if request should be rejected, False otherwise.
+        """
+
+        if self.max_requests_per_second is None:
+            return False
+
+        now = time.monotonic()
+        while self.__request_times and now - self.__request_times[0] >= 1:
+            self.__request_times.popleft()
+        if len(self.__request_times) >= self.max_requests_per_second:
+            return True
+
+        self.__request_times.append(now)
+        return False
+
+    @web.middleware
+    async def __inject_failures(self, request: web.Request, handler) -> web.Response:
+        """
+        Delays every response and rejects requests according to configuration.
+
+        Parameters:
+            request (web.Request): Received request.
+            handler (Callable): Handler of requested endpoint.
+
+        Returns:
+            (web.Response): Response sent back.
+        """
+
+        self.request_count += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+        if self.__is_rate_limited() or self.__random.random() < self.rate_limit_rate:
+            self.rejected_request_count += 1
+            return web.json_response({'message': 'Public rate limit exceeded'}, status = 429)
+        if self.__random.random() < self.error_rate:
+            self.rejected_request_count += 1
+            return web.json_response({'message': 'Internal server error'}, status = 500)
+
+        return await handler(request)
+
+    async def __get_products(self, request: web.Request) -> web.Response:
+        """
+        Responds with list of products.
+        """
+
+        return web.json_response([{'id': product_id, 'base_currency': product_id.split('-')[0],
+                                   'quote_currency': product_id.split('-')[1]} for product_id in self.products])
+
+    async def __get_candles(self, request: web.Request) -> web.Response:
+        """
+        Responds with candles of requested product, starting from the newest one.
+        """
+
+        product_id = request.match_info['product_id']
+        if product_id not in self.products:
+            return web.json_response({'message': 'NotFound'}, status = 404)
+
+        try:
+            start = int(request.query['start'])
+            end = int(request.query['end'])
+            granularity = int(request.query['granularity'])
+        except (KeyError, ValueError):
+            return web.json_response({'message': 'Invalid parameters'}, status = 400)
+
+        if (end - start) // granularity > MockCoinbaseServer.MAX_NUMBER_OF_CANDLES_PER_REQUEST:
+            return web.json_response({'message': 'granularity too small for the requested time range'}, status = 400)
+
+        if product_id in self.recorded_candles:
+            candles = [candle for candle in self.recorded_candles[product_id] if start <= candle[0] <= end]
+        else:
+            candles = MockCoinbaseServer.generate_candles(start, end, granularity)
+
+        return web.json_response(candles)
+
+    async def start(self) -> None:
+        """
+        Starts server on free local port.
+        """
+
+        app = web.Application(middlewares = [self.__inject_failures])
+        app.router.add_get('/products', self.__get_products)
+        app.router.add_get('/products/{product_id}/candles', self.__get_candles)
+
+        self.__runner = web.AppRunner(app)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, '127.0.0.1', 0)
+        await site.start()
+        self.__port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """
+        Stops server.
+        """
+
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def __aenter__(self) -> 'MockCoinbaseServer':
+        """
+        Starts server when entering context.
+
+        Returns:
+            (MockCoinbaseServer): Server itself.
+        """
+
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exception_info) -> None:
+        """
+        Stops server when leaving context.
+        """
+
+        await self.stop()
@@ -3,7 +3,9 @@
 import os
 import io
 import tempfile
+from datetime import datetime, timedelta, timezone
 import boto3
+import pytest
 from unittest.mock import patch
 from moto import mock_aws
 
@@ -122,4 +124,170 @@ def test_download_file_from_s3():
 
     os.remove(download_path)
 
-    assert downloaded_content == TEST_CONTENT
\ No newline at end of file
+    assert downloaded_content == TEST_CONTENT
+
+@mock_aws
+@patch.dict(os.environ, {
+    'AWS_ACCESS_KEY_ID': 'access_key',
+    'AWS_SECRET_ACCESS_KEY': 'secret_key',
+    'ACCOUNT_ID': '123456789012'
+})
+def test_upload_stream_to_s3():
+    """
+    Tests the upload_stream_to_s3 method of AWSHandler.
+
+    Verifies that method successfully uploads data produced by generator to an S3 bucket,
+    both as multipart upload of many parts and as single object when data fits into
+    single part. It mocks AWS S3 to create a bucket and handle the uploads.
+
+    Asserts:
+        The content of the uploaded files in the S3 bucket matches the generated content.
+        Data exceeding part size is uploaded in many parts.
+    """
+
+    mocked_bucket_name = 'mocked-bucket'
+    mocked_region = 'us-east-1'
+    mocked_s3_client = boto3.client('s3', region_name = mocked_region)
+    mocked_s3_client.create_bucket(Bucket = mocked_bucket_name)
+
+    part_size = 5 * 1024 * 1024
+    lines = [f'{i},{TEST_CONTENT}\n' for i in range(400000)]
+    handler = AWSHandler('mocked_bucket-user-role')
+    handler.upload_stream_to_s3(mocked_bucket_name, (line for line in lines), TEST_FILE_NAME,
+                                part_size = part_size, max_workers = 2)
+    handler.upload_stream_to_s3(mocked_bucket_name, iter([TEST_CONTENT]), 'small_' + TEST_FILE_NAME)
+
+    mocked_s3_resource = boto3.resource('s3', region_name = mocked_region)
+    object = mocked_s3_resource.Object(mocked_bucket_name, TEST_FILE_NAME)
+    file_content = object.get()['Body'].read().decode('utf-8')
+    small_object = mocked_s3_resource.Object(mocked_bucket_name, 'small_' + TEST_FILE_NAME)
+    small_file_content = small_object.get()['Body'].read().decode('utf-8')
+
+    assert file_content == ''.join(lines)
+    assert object.e_tag.strip('"').endswith(f'-{-(-len(file_content) // part_size)}')
+    assert small_file_content == TEST_CONTENT
+
+@mock_aws
+@patch.dict(os.environ, {
+    'AWS_ACCESS_KEY_ID': 'access_key',
+    'AWS_SECRET_ACCESS_KEY': 'secret_key',
+    'ACCOUNT_ID': '123456789012'
+})
+def test_get_handler():
+    """
+    Tests the get_handler method of AWSHandler.
+
+    Verifies that handler, together with its S3 client, is created once per role
+    and region and shared afterwards, so role is not assumed again for every transfer.
+
+    Asserts:
+        The same handler and S3 client are returned for the same role.
+        Different handler is returned for different role or after clearing handlers.
+        Shared handler is able to upload file.
+    """
+
+    mocked_bucket_name = 'mocked-bucket'
+    mocked_s3_client = boto3.client('s3', region_name = 'us-east-1')
+    mocked_s3_client.create_bucket(Bucket = mocked_bucket_name)
+
+    AWSHandler.clear_handlers()
+    handler = AWSHandler.get_handler('mocked_bucket-user-role')
+    same_handler = AWSHandler.get_handler('mocked_bucket-user-role')
+    other_handler = AWSHandler.get_handler('other-user-role')
+
+    assert handler is same_handler
+    assert handler.aws_s3_resource is same_handler.aws_s3_resource
+    assert handler is not other_handler
+
+    AWSHandler.clear_handlers()
+    assert AWSHandler.get_handler('mocked_bucket-user-role') is not handler
+
+    same_handler.upload_buffer_to_s3(mocked_bucket_name, io.StringIO(TEST_CONTENT), TEST_FILE_NAME)
+    file_content = mocked_s3_client.get_object(Bucket = mocked_bucket_name, Key = TEST_FILE_NAME)['Body'].read()
+    assert file_content.decode('utf-8') == TEST_CONTENT
+    AWSHandler.clear_handlers()
+
+@mock_aws
+@patch.dict(os.environ, {
+    'AWS_ACCESS_KEY_ID': 'access_key',
+    'AWS_SECRET_ACCESS_KEY': 'secret_key',
+    'ACCOUNT_ID': '123456789012'
+})
+def test_refreshable_credentials():
+    """
+    Tests refreshing of credentials of assumed role used by AWSHandler.
+
+    Verifies that once credentials of assumed role expire, role is assumed again by
+    botocore on the next request, so long-lived handler keeps working. Expiry is forced
+    by moving expiry time of current credentials into the past.
+
+    Asserts:
+        Role is not assumed again while credentials are valid.
+        Role is assumed again after credentials expire and new credentials are used.
+        Upload succeeds with refreshed credentials.
+    """
+
+    mocked_bucket_name = 'mocked-bucket'
+    mocked_s3_client = boto3.client('s3', region_name = 'us-east-1')
+    mocked_s3_client.create_bucket(Bucket = mocked_bucket_name)
+
+    handler = AWSHandler('mocked_bucket-user-role')
+    sts_client = handler._AWSHandler__sts_client
+    credentials = handler.aws_s3_resource._request_signer._credentials
+    with patch.object(sts_client, 'assume_role', wraps = sts_client.assume_role) as assume_role:
+        handler.upload_buffer_to_s3(mocked_bucket_name, io.StringIO(TEST_CONTENT), TEST_FILE_NAME)
+        assert assume_role.call_count == 0
+
+        expired_access_key = credentials.access_key
+        credentials._expiry_time = datetime.now(timezone.utc) - timedelta(minutes = 1)
+        handler.upload_buffer_to_s3(mocked_bucket_name, io.StringIO(TEST_CONTENT), 'refreshed_' + TEST_FILE_NAME)
+
+    assert assume_role.call_count == 1
+    assert credentials.access_key != expired_access_key
+    file_content = mocked_s3_client.get_object(Bucket = mocked_bucket_name,
+                                               Key = 'refreshed_' + TEST_FILE_NAME)['Body'].read()
+    assert file_content.decode('utf-8') == TEST_CONTENT
+
+@mock_aws
+@patch.dict(os.environ, {
+    'AWS_ACCESS_KEY_ID': 'access_key',
+    'AWS_SECRET_ACCESS_KEY': 'secret_key',
+    'ACCOUNT_ID': '123456789012'
+})
+def test_background_uploads():
+    """
+    Tests the enqueue_file_upload, enqueue_buffer_upload and flush methods of AWSHandler.
+
+    Verifies that files and buffers enqueued for upload end up in an S3 bucket once
+    flushed, and that uploads failing despite retries are reported by flush.
+
+    Asserts:
+        The content of the uploaded files in the S3 bucket matches the expected content.
+        Buffer can be modified right after being enqueued.
+        Flush raises RuntimeError if upload failed.
+    """
+
+    mocked_bucket_name = 'mocked-bucket'
+    mocked_s3_client = boto3.client('s3', region_name = 'us-east-1')
+    mocked_s3_client.create_bucket(Bucket = mocked_bucket_name)
+
+    with tempfile.NamedTemporaryFile(delete = False) as tmp_file:
+        tmp_file.write(TEST_CONTENT.encode('utf-8'))
+        mocked_file_path = tmp_file.name
+
+    handler = AWSHandler('mocked_bucket-user-role')
+    buffer = io.StringIO(TEST_CONTENT)
+    handler.enqueue_file_upload(mocked_bucket_name, mocked_file_path, TEST_FILE_NAME)
+    handler.enqueue_buffer_upload(mocked_bucket_name, buffer, 'buffer_' + TEST_FILE_NAME)
+    buffer.write('modified')
+    handler.flush()
+    os.remove(mocked_file_path)
+
+    for file_name in [TEST_FILE_NAME, 'buffer_' + TEST_FILE_NAME]:
+        file_content = mocked_s3_client.get_object(Bucket = mocked_bucket_name, Key = file_name)['Body'].read()
+        assert file_content.decode('utf-8') == TEST_CONTENT
+
+    handler.enqueue_buffer_upload('not-existing-bucket', io.StringIO(TEST_CONTENT), TEST_FILE_NAME,
+                                  retries = 1, retry_delay = 0)
+    with pytest.raises(RuntimeError):
+        handler.flush()
@@ -1,8 +1,12 @@
 # tests/test_coinbase.py
 
+import asyncio
+import time
 import pandas as pd
-from source.coinbase import CoinBaseHandler
+from unittest.mock import patch
+from source.coinbase import CoinBaseHandler, YahooFinanceHandler, TokenBucketRateLimiter
 from source.utils import Granularity
+from mock_coinbase_server import MockCoinbaseServer
 import pytest
 
 @pytest.mark.asyncio
@@ -51,3 +55,132 @@ async def test_get_possible_pairs():
     handler = CoinBaseHandler()
     result = await handler.get_possible_pairs()
     pd.testing.assert_frame_equal(result[:3], expected)
+
+@pytest.mark.asyncio
+async def test_get_candles_for__decodes_responses_in_order_without_duplicates():
+    """
+    Tests decoding of responses in the get_candles_for method of CoinBaseHandler.
+
+    Verifies that candles returned from the newest one, in consecutive requests sharing
+    boundary candles, are decoded into data frame ordered by time without duplicates.
+    Requests sent towards Coinbase API are mocked to return candles for requested range.
+
+    Asserts:
+        The result DataFrame matches the expected DataFrame.
+    """
+
+    async def mock_send_request_to_coinbase(self, session, url, pid):
+        query = dict(parameter.split('=') for parameter in url.split('?')[1].split('&'))
+        start, end, granularity = int(query['start']), int(query['end']), int(query['granularity'])
+        return [[timestamp, 1.0, 3.0, 2.0, 2.5, timestamp / granularity]
+                for timestamp in range(end, start - 1, -granularity)]
+
+    with patch.object(CoinBaseHandler, '_CoinBaseHandler__send_request_to_coinbase', mock_send_request_to_coinbase):
+        handler = CoinBaseHandler()
+        result = await handler.get_candles_for('BTC-USD', '2020-01-01 00:00:00', '2020-02-01 00:00:00',
+                                               Granularity.ONE_HOUR)
+
+    expected_index = pd.date_range('2020-01-01', '2020-02-01', freq = 'H', name = 'time')
+    expected = pd.DataFrame(data={
+        'low': 1.0,
+        'high': 3.0,
+        'open': 2.0,
+        'close': 2.5,
+        'volume': expected_index.astype('int64') // 10**9 / Granularity.ONE_HOUR.value
+    }, index = expected_index)
+    pd.testing.assert_frame_equal(result, expected, check_freq = False)
+
+@pytest.mark.asyncio
+async def test_token_bucket_rate_limiter_acquire():
+    """
+    Tests the acquire method of TokenBucketRateLimiter.
+
+    Verifies that tokens exceeding bucket capacity are handed out no faster than
+    the configured rate, even if they are requested concurrently.
+
+    Asserts:
+        Acquiring tokens over capacity takes at least time needed to refill them.
+    """
+
+    rate, capacity, nr_of_tokens = 50, 5, 20
+    rate_limiter = TokenBucketRateLimiter(rate, capacity)
+
+    start = time.monotonic()
+    await asyncio.gather(*[rate_limiter.acquire() for _ in range(nr_of_tokens)])
+    elapsed = time.monotonic() - start
+
+    assert elapsed >= (nr_of_tokens - capacity) / rate * 0.9
+
+@pytest.mark.asyncio
+async def test_yahoo_finance_get_candles_for_many__chunks_and_splits_symbols():
+    """
+    Tests the get_candles_for_many method of YahooFinanceHandler.
+
+    Verifies that range exceeding limit of intraday interval is downloaded in chunks,
+    each being single batched request for all symbols, and that downloaded data is
+    split back into separate data frame for each symbol. Yahoo Finance download is
+    mocked to return hourly candles for requested chunk.
+
+    Asserts:
+        Download is called once per chunk with all symbols.
+        Each symbol gets complete, ordered data without duplicates.
+        Download threads are shut down once handler is closed.
+    """
+
+    def mock_download(symbols, start, end, interval, **kwargs):
+        index = pd.date_range(start, end, freq = 'H', inclusive = 'left', name = 'Datetime')
+        columns = pd.MultiIndex.from_product([symbols, ['Open', 'High', 'Low', 'Close', 'Volume']],
+                                             names = ['Ticker', 'Price'])
+        data = [[symbols.index(symbol) + 1.0 for symbol, _ in columns] for _ in index]
+        return pd.DataFrame(data, index = index, columns = columns)
+
+    with patch('source.coinbase.yahoo_finance_handler.yf.download', side_effect = mock_download) as download:
+        handler = YahooFinanceHandler(max_workers = 2)
+        result = await handler.get_candles_for_many(['AAPL', 'MSFT'], '2020-01-01 00:00:00', '2022-06-01 00:00:00',
+                                                    Granularity.ONE_HOUR)
+        executor = handler._YahooFinanceHandler__executor
+        await handler.close()
+
+    assert handler._YahooFinanceHandler__executor is None
+    assert executor._threads and not any(thread.is_alive() for thread in executor._threads)
+
+    expected_index = pd.date_range('2020-01-01', '2022-06-01', freq = 'H', inclusive = 'left', name = 'Datetime')
+    assert download.call_count == 2
+    assert all(call.args[0] == ['AAPL', 'MSFT'] for call in download.call_args_list)
+    for i, symbol in enumerate(['AAPL', 'MSFT']):
+        assert list(result[symbol].columns) == ['open', 'high', 'low', 'close', 'volume']
+        pd.testing.assert_index_equal(result[symbol].index, expected_index, check_exact = True, exact = False)
+        assert (result[symbol]['close'] == i + 1.0).all()
+
+@pytest.mark.asyncio
+async def test_get_candles_for__mock_server_with_rate_limits_and_errors():
+    """
+    Tests the get_candles_for and get_possible_pairs methods of CoinBaseHandler against
+    local server standing in for Coinbase API.
+
+    Verifies that candles are collected completely although server delays responses,
+    rejects requests exceeding its rate and injects errors. Server replays synthetic
+    candles, so expected data is generated the same way.
+
+    Asserts:
+        Some requests were rejected and repeated.
+        The result DataFrame matches synthetic candles.
+        Products offered by server are returned.
+    """
+
+    async with MockCoinbaseServer(latency = 0.01, max_requests_per_second = 10, error_rate = 0.2) as server:
+        handler = CoinBaseHandler(requests_per_second = 12, requests_burst = 12, max_retries = 20, backoff_base = 0.05,
+                                  backoff_cap = 1, base_url = server.base_url)
+        async with handler:
+            result = await handler.get_candles_for('BTC-USD', '2020-01-01 00:00:00', '2020-03-01 00:00:00',
+                                                   Granularity.FIFTEEN_MINUTES)
+            possible_pairs = await handler.get_possible_pairs()
+
+    candles = MockCoinbaseServer.generate_candles(1577836800, 1583020800, Granularity.FIFTEEN_MINUTES.value)[::-1]
+    expected = pd.DataFrame(candles, columns = ['time', 'low', 'high', 'open', 'close', 'volume'], dtype = float)
+    expected.index = pd.DatetimeIndex(pd.to_datetime(expected.pop('time').astype(int), unit = 's'), name = 'time')
+
+    assert server.rejected_request_count > 0
+    assert server.request_count > server.rejected_request_count
+    pd.testing.assert_frame_equal(result, expected)
+    assert list(possible_pairs.index) == sorted(MockCoinbaseServer.DEFAULT_PRODUCTS)
\ No newline at end of file
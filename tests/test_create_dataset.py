@@ -0,0 +1,77 @@
+# tests/test_create_dataset.py
+
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock, patch
+
+from scripts.create_dataset import main_batch
+
+FAILING_TRADING_PAIR = 'ETH-USD'
+
+class MockDataHandler():
+    """
+    Mock of DataHandler returning generated candles instead of fetching them. Preparing
+    data for failing trading pair raises exception.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.coverage_statistics = {}
+
+    async def __aenter__(self) -> 'MockDataHandler':
+        return self
+
+    async def __aexit__(self, *exception_info) -> None:
+        pass
+
+    async def prepare_data(self, trading_pair, start_date, end_date, granularity) -> pd.DataFrame:
+        await asyncio.sleep(0)
+        if trading_pair == FAILING_TRADING_PAIR:
+            raise ValueError(f'Trading pair {trading_pair} is not recognized!')
+
+        index = pd.date_range(start_date, end_date, freq = pd.Timedelta(seconds = granularity.value), name = 'time')
+        self.coverage_statistics[trading_pair] = {'coverage': 1.0}
+        return pd.DataFrame({column: np.linspace(1, 2, len(index)) for column in
+                             ['low', 'high', 'open', 'close', 'volume']}, index = index)
+
+@pytest.mark.asyncio
+@patch('scripts.create_dataset.DataHandler', MockDataHandler)
+@patch('scripts.create_dataset.AWSHandler.get_handler')
+async def test_main_batch__failing_trading_pair(mock_get_handler, caplog):
+    """
+    Tests the main_batch function of create_dataset script.
+
+    Verifies that data set of trading pair that failed does not stop data sets of other
+    trading pairs and granularities from being built in process pool and uploaded in
+    thread pool. DataHandler and AWSHandler are mocked.
+
+    Asserts:
+        Batch is reported as unsuccessful.
+        Data sets of all other trading pairs and granularities are uploaded.
+        Failure and its error are listed in status summary.
+    """
+
+    uploaded_files = {}
+    mock_get_handler.return_value = Mock(upload_stream_to_s3 = Mock(side_effect = lambda bucket_name, chunks, file_name:
+                                                                    uploaded_files.update({file_name: b''.join(chunks)})))
+
+    with caplog.at_level(logging.INFO):
+        result = await main_batch(['BTC-USD', FAILING_TRADING_PAIR, 'LTC-USD'], '2020-03-01 00:00:00',
+                                  '2020-03-10 00:00:00', ['1h', '1d'], 'ema', max_workers = 2)
+
+    assert result is False
+    assert sorted(uploaded_files) == sorted([f'DS_{trading_pair}_2020-03-01_00_00_00_2020-03-10_00_00_00_'
+                                             f'{granularity}_ema.csv'
+                                             for trading_pair in ['BTC-USD', 'LTC-USD']
+                                             for granularity in ['1h', '1d']])
+    assert all(b'EMA_20' in content.splitlines()[0] for content in uploaded_files.values())
+
+    summary = [record.getMessage() for record in caplog.records if record.getMessage().startswith(
+        ('BTC-USD', FAILING_TRADING_PAIR, 'LTC-USD'))]
+    assert len(summary) == 6
+    failures = [line for line in summary if line.startswith(FAILING_TRADING_PAIR)]
+    assert len(failures) == 2
+    assert all('failed' in line and 'is not recognized' in line for line in failures)
+    assert all('uploaded' in line for line in summary if not line.startswith(FAILING_TRADING_PAIR))
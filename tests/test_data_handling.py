@@ -1,11 +1,17 @@
 # tests/test_data_handling.py
 
 import pytest
+import numpy as np
 import pandas as pd
-from unittest.mock import AsyncMock, patch
-from source.data_handling import DataHandler
+from unittest.mock import AsyncMock, Mock, patch
+from source.data_handling import DataHandler, CandleStore, TradingPairCatalogue, GapDetector, \
+    CandleResampler
+from source.indicators import DonchainChannelsIndicatorHandler, ExponentialMovingAverageIndicatorHandler, \
+    OnBalanceVolumeIndicatorHandler, RelativeStrengthIndexIndicatorHandler
+from source.coinbase import CoinBaseHandler
 from source.utils import Granularity
 from mock_indicator import MockIndicatorHandler
+from mock_coinbase_server import MockCoinbaseServer
 
 MOCKED_COINBASE_HANDLER_DATA = pd.DataFrame(data={
     'low': [8400.00, 8487.33, 8635.31],
@@ -73,4 +79,509 @@ async def test_prepare_data__with_indicators(mock_get_candles_for):
     handler = DataHandler(indicators)
     result = await handler.prepare_data('BTC-USD', '2020-03-01 00:00:00', '2020-03-03 00:00:00', Granularity.ONE_DAY)
     pd.testing.assert_frame_equal(result, expected)
-    mock_get_candles_for.assert_called()
\ No newline at end of file
+    mock_get_candles_for.assert_called()
+
+@pytest.mark.asyncio
+@patch('source.data_handling.TradingPairCatalogue.get_source_of', new_callable=AsyncMock,
+       return_value = TradingPairCatalogue.COINBASE_SOURCE)
+@patch('source.coinbase.CoinBaseHandler.get_candles_for', new_callable=AsyncMock)
+async def test_prepare_panel_data__with_indicators(mock_get_candles_for, mock_get_source_of):
+    """
+    Tests the prepare_panel_data method of DataHandler with indicators.
+
+    Verifies that data prepared in panel mode for many trading pairs is the same as
+    data prepared separately for each of them. The get_candles_for method of CoinBaseHandler
+    is mocked to return differently scaled data for each trading pair, and trading pairs are
+    recognized as Coinbase ones without asking Coinbase API.
+
+    Asserts:
+        For each trading pair, the result DataFrame matches the DataFrame returned by prepare_data.
+    """
+
+    mocked_data = {
+        'BTC-USD': MOCKED_COINBASE_HANDLER_DATA,
+        'ETH-USD': MOCKED_COINBASE_HANDLER_DATA / 20
+    }
+    mock_get_candles_for.side_effect = lambda trading_pair, *args: mocked_data[trading_pair]
+
+    mean_high_lambda = lambda data: data['high'].rolling(window = 2).mean().to_frame(name='mean_high')
+    handler = DataHandler([MockIndicatorHandler(mean_high_lambda)])
+    result = await handler.prepare_panel_data(list(mocked_data.keys()), '2020-03-01 00:00:00',
+                                              '2020-03-03 00:00:00', Granularity.ONE_DAY)
+
+    assert list(result.keys()) == list(mocked_data.keys())
+    for trading_pair in mocked_data.keys():
+        expected = await handler.prepare_data(trading_pair, '2020-03-01 00:00:00',
+                                              '2020-03-03 00:00:00', Granularity.ONE_DAY)
+        pd.testing.assert_frame_equal(result[trading_pair], expected)
+
+@pytest.mark.asyncio
+@patch('source.data_handling.TradingPairCatalogue.get_source_of', new_callable=AsyncMock,
+       return_value = TradingPairCatalogue.COINBASE_SOURCE)
+@patch('source.coinbase.CoinBaseHandler.get_candles_for', new_callable=AsyncMock)
+async def test_prepare_panel_data__with_misaligned_indices(mock_get_candles_for, mock_get_source_of):
+    """
+    Tests the prepare_panel_data method of DataHandler for trading pairs with different
+    time indices.
+
+    Verifies that rolling indicators of trading pair missing some candles are not affected
+    by other trading pairs. The get_candles_for method of CoinBaseHandler is mocked to return
+    data with three days missing for one of trading pairs and shorter data for another, and
+    trading pairs are recognized as Coinbase ones without asking Coinbase API.
+
+    Asserts:
+        For each trading pair, the result DataFrame matches the DataFrame returned by prepare_data.
+    """
+
+    random_generator = np.random.default_rng(1)
+    close = 100 + random_generator.normal(size = 20).cumsum()
+    full_data = pd.DataFrame(data={
+        'low': close - 1,
+        'high': close + 1,
+        'open': close + random_generator.normal(size = 20) / 2,
+        'close': close,
+        'volume': random_generator.uniform(10, 20, size = 20)
+    }, index = pd.date_range('2020-01-01', periods = 20, freq = 'D', name = 'time'))
+    mocked_data = {
+        'BTC-USD': full_data,
+        'ETH-USD': full_data.drop(full_data.index[4:7]) / 20,
+        'SOL-USD': full_data.iloc[8:] * 2,
+        'ADA-USD': full_data / 10
+    }
+    mock_get_candles_for.side_effect = lambda trading_pair, *args: mocked_data[trading_pair]
+
+    handler = DataHandler([ExponentialMovingAverageIndicatorHandler(3), OnBalanceVolumeIndicatorHandler(),
+                           RelativeStrengthIndexIndicatorHandler(3)])
+    result = await handler.prepare_panel_data(list(mocked_data.keys()), '2020-01-01 00:00:00',
+                                              '2020-01-20 00:00:00', Granularity.ONE_DAY)
+
+    assert list(result.keys()) == list(mocked_data.keys())
+    for trading_pair in mocked_data.keys():
+        expected = await handler.prepare_data(trading_pair, '2020-01-01 00:00:00',
+                                              '2020-01-20 00:00:00', Granularity.ONE_DAY)
+        pd.testing.assert_frame_equal(result[trading_pair], expected)
+
+@pytest.mark.asyncio
+@patch('source.data_handling.TradingPairCatalogue.get_source_of', new_callable=AsyncMock,
+       return_value = TradingPairCatalogue.COINBASE_SOURCE)
+@patch('source.coinbase.CoinBaseHandler.get_candles_for', new_callable=AsyncMock)
+async def test_stream_data_to_file__matches_prepared_data(mock_get_candles_for, mock_get_source_of, tmp_path):
+    """
+    Tests the stream_data_to_file method of DataHandler with indicators.
+
+    Verifies that data streamed chunk by chunk and extended with indicators over
+    warm-up rows is the same as data prepared at once. Streaming of candles from
+    CoinBaseHandler is mocked to yield predefined data in small chunks, and trading pair
+    is recognized as Coinbase one without asking Coinbase API.
+
+    Asserts:
+        Number of written rows matches number of candles.
+        Written data matches the DataFrame returned by prepare_data.
+    """
+
+    random_generator = np.random.default_rng(0)
+    close = 100 + random_generator.normal(size = 50).cumsum()
+    mocked_data = pd.DataFrame(data={
+        'low': close - 1,
+        'high': close + 1,
+        'open': close + random_generator.normal(size = 50) / 2,
+        'close': close,
+        'volume': random_generator.uniform(1, 10, size = 50)
+    }, index = pd.date_range('2020-03-01', periods = 50, freq = 'D', name = 'time'))
+    mock_get_candles_for.return_value = mocked_data
+
+    async def mock_stream_candles_for(self, *args):
+        for i in range(0, len(mocked_data), 7):
+            yield mocked_data.iloc[i:i + 7]
+
+    indicators = [DonchainChannelsIndicatorHandler(5), ExponentialMovingAverageIndicatorHandler(3),
+                  OnBalanceVolumeIndicatorHandler(), RelativeStrengthIndexIndicatorHandler(4)]
+    handler = DataHandler(indicators)
+    file_path = str(tmp_path / 'BTC-USD.csv')
+    with patch('source.coinbase.CoinBaseHandler.stream_candles_for', new = mock_stream_candles_for):
+        number_of_rows = await handler.stream_data_to_file('BTC-USD', '2020-03-01 00:00:00', '2020-04-19 00:00:00',
+                                                           Granularity.ONE_DAY, file_path)
+
+    expected = await handler.prepare_data('BTC-USD', '2020-03-01 00:00:00', '2020-04-19 00:00:00', Granularity.ONE_DAY)
+    result = pd.read_csv(file_path, index_col = 'time', parse_dates = True)
+    assert number_of_rows == len(mocked_data)
+    pd.testing.assert_frame_equal(result, expected, check_freq = False, check_dtype = False)
+
+@pytest.mark.asyncio
+@patch('source.data_handling.TradingPairCatalogue.get_source_of', new_callable=AsyncMock,
+       return_value = TradingPairCatalogue.COINBASE_SOURCE)
+@patch('source.coinbase.CoinBaseHandler.get_candles_for', new_callable=AsyncMock)
+async def test_prepare_appended_data__matches_prepared_data(mock_get_candles_for, mock_get_source_of, tmp_path):
+    """
+    Tests the read_data_tail and prepare_appended_data methods of DataHandler.
+
+    Verifies that data appended to existing data set, with indicators calculated only
+    over warm-up rows read from its tail, is the same as data prepared at once. The
+    get_candles_for method of CoinBaseHandler is mocked to return requested range of
+    predefined data, and trading pair is recognized as Coinbase one without asking Coinbase API.
+
+    Asserts:
+        Appended data contains only new rows and matches the DataFrame returned by prepare_data.
+        Seam mismatch is detected.
+    """
+
+    random_generator = np.random.default_rng(1)
+    close = 100 + random_generator.normal(size = 60).cumsum()
+    mocked_data = pd.DataFrame(data={
+        'low': close - 1,
+        'high': close + 1,
+        'open': close + random_generator.normal(size = 60) / 2,
+        'close': close,
+        'volume': random_generator.uniform(1, 10, size = 60)
+    }, index = pd.date_range('2020-03-01', periods = 60, freq = 'D', name = 'time'))
+    mock_get_candles_for.side_effect = lambda trading_pair, start_date, end_date, granularity: \
+        mocked_data.loc[start_date:end_date]
+
+    indicators = [DonchainChannelsIndicatorHandler(5), ExponentialMovingAverageIndicatorHandler(3),
+                  OnBalanceVolumeIndicatorHandler(), RelativeStrengthIndexIndicatorHandler(4)]
+    handler = DataHandler(indicators)
+    file_path = str(tmp_path / 'BTC-USD.csv')
+    existing_data = await handler.prepare_data('BTC-USD', '2020-03-01 00:00:00', '2020-04-09 00:00:00', Granularity.ONE_DAY)
+    existing_data.to_csv(file_path)
+
+    existing_tail = handler.read_data_tail(file_path, handler.get_warm_up_period() + 1, block_size = 256)
+    result = await handler.prepare_appended_data(existing_tail, 'BTC-USD', '2020-04-29 00:00:00', Granularity.ONE_DAY)
+    expected = await handler.prepare_data('BTC-USD', '2020-03-01 00:00:00', '2020-04-29 00:00:00', Granularity.ONE_DAY)
+
+    assert len(existing_tail) == handler.get_warm_up_period() + 1
+    pd.testing.assert_frame_equal(result, expected.iloc[40:], check_freq = False)
+
+    existing_tail.iloc[-1, existing_tail.columns.get_loc('OBV')] += 1
+    with pytest.raises(RuntimeError):
+        await handler.prepare_appended_data(existing_tail, 'BTC-USD', '2020-04-29 00:00:00', Granularity.ONE_DAY)
+
+@pytest.mark.asyncio
+async def test_candle_store_get_candles_for__fetches_only_missing_ranges(tmp_path):
+    """
+    Tests the get_candles_for method of CandleStore.
+
+    Verifies that candles already kept in the store are not fetched again. The first
+    call covers the beginning of the range, the second call extends it by one day, so
+    only that day should be requested from data source.
+
+    Asserts:
+        Data source is requested only for missing ranges.
+        The result DataFrame matches mocked data for the whole range.
+    """
+
+    fetch_function = AsyncMock(side_effect = lambda symbol, start_date, end_date, granularity:
+                               MOCKED_COINBASE_HANDLER_DATA.loc[start_date:end_date])
+    candle_store = CandleStore(str(tmp_path), partition_size = 2)
+
+    result = await candle_store.get_candles_for('coinbase', 'BTC-USD', '2020-03-01 00:00:00', '2020-03-02 00:00:00',
+                                                Granularity.ONE_DAY, fetch_function)
+    pd.testing.assert_frame_equal(result, MOCKED_COINBASE_HANDLER_DATA.iloc[:2])
+
+    result = await candle_store.get_candles_for('coinbase', 'BTC-USD', '2020-03-01 00:00:00', '2020-03-03 00:00:00',
+                                                Granularity.ONE_DAY, fetch_function)
+    pd.testing.assert_frame_equal(result, MOCKED_COINBASE_HANDLER_DATA)
+
+    assert fetch_function.call_count == 2
+    fetch_function.assert_called_with('BTC-USD', '2020-03-03 00:00:00', '2020-03-04 00:00:00', Granularity.ONE_DAY)
+
+@pytest.mark.asyncio
+async def test_candle_store_get_candles_for__unfinished_candles_not_covered(tmp_path):
+    """
+    Tests the get_candles_for method of CandleStore for ranges reaching current time.
+
+    Verifies that range containing not yet finished candle is not marked as covered,
+    so it is fetched again on the next call.
+
+    Asserts:
+        Data source is requested twice for the same range.
+    """
+
+    fetch_function = AsyncMock(return_value = MOCKED_COINBASE_HANDLER_DATA)
+    candle_store = CandleStore(str(tmp_path))
+    now = int(pd.Timestamp('2020-03-03 12:00:00').timestamp())
+
+    for _ in range(2):
+        await candle_store.get_candles_for('coinbase', 'BTC-USD', '2020-03-01 00:00:00', '2020-03-03 00:00:00',
+                                           Granularity.ONE_DAY, fetch_function, now = now)
+
+    assert fetch_function.call_count == 2
+    fetch_function.assert_called_with('BTC-USD', '2020-03-03 00:00:00', '2020-03-04 00:00:00', Granularity.ONE_DAY)
+
+@pytest.mark.asyncio
+async def test_candle_store_get_candles_for__short_fetch_covers_only_returned_candles(tmp_path):
+    """
+    Tests the get_candles_for method of CandleStore for data source returning less than requested.
+
+    Verifies that range is marked as covered only up to the last returned candle, so that
+    candles missing due to empty or short response are fetched again on the next call.
+
+    Asserts:
+        Data source is requested again only for candles missing from the first response.
+        The result DataFrame matches mocked data for the whole range once it is returned.
+    """
+
+    responses = [MOCKED_COINBASE_HANDLER_DATA.iloc[:0], MOCKED_COINBASE_HANDLER_DATA.iloc[:1],
+                 MOCKED_COINBASE_HANDLER_DATA.iloc[1:]]
+    fetch_function = AsyncMock(side_effect = responses)
+    candle_store = CandleStore(str(tmp_path))
+
+    for _ in range(3):
+        result = await candle_store.get_candles_for('coinbase', 'BTC-USD', '2020-03-01 00:00:00',
+                                                    '2020-03-03 00:00:00', Granularity.ONE_DAY, fetch_function)
+
+    pd.testing.assert_frame_equal(result, MOCKED_COINBASE_HANDLER_DATA)
+    assert fetch_function.call_count == 3
+    assert fetch_function.call_args_list[1].args[1] == '2020-03-01 00:00:00'
+    assert fetch_function.call_args_list[2].args[1] == '2020-03-02 00:00:00'
+
+@pytest.mark.asyncio
+async def test_gap_detector_backfill__requests_only_missing_ranges():
+    """
+    Tests the find_gaps, get_coverage_statistics and backfill methods of GapDetector.
+
+    Verifies that gaps inside and at the end of requested range are found, that only
+    missing ranges are requested again, and that coverage statistics reflect filled data.
+    Data source is mocked to return full data for any requested range.
+
+    Asserts:
+        Gaps and coverage statistics are found correctly.
+        Data source is requested once per gap.
+        Backfilled data matches full data.
+    """
+
+    full_data = pd.DataFrame(data={column: range(10) for column in ['low', 'high', 'open', 'close', 'volume']},
+                             index = pd.date_range('2020-03-01', periods = 10, freq = 'D', name = 'time'))
+    data = full_data.drop(full_data.index[[2, 3, 6, 9]])
+    fetch_function = AsyncMock(side_effect = lambda trading_pair, start_date, end_date, granularity:
+                               full_data.loc[start_date:end_date])
+
+    gap_detector = GapDetector()
+    gaps = gap_detector.find_gaps(data, Granularity.ONE_DAY, '2020-03-01 00:00:00', '2020-03-10 00:00:00')
+    statistics = gap_detector.get_coverage_statistics(data, Granularity.ONE_DAY, '2020-03-01 00:00:00',
+                                                      '2020-03-10 00:00:00')
+    result = await gap_detector.backfill(data, 'BTC-USD', Granularity.ONE_DAY, fetch_function,
+                                         '2020-03-01 00:00:00', '2020-03-10 00:00:00')
+
+    assert gaps == [(pd.Timestamp('2020-03-03'), pd.Timestamp('2020-03-04')),
+                    (pd.Timestamp('2020-03-07'), pd.Timestamp('2020-03-07')),
+                    (pd.Timestamp('2020-03-10'), pd.Timestamp('2020-03-10'))]
+    assert statistics == {'expected_candles': 10, 'present_candles': 6, 'missing_candles': 4, 'coverage': 0.6,
+                          'number_of_gaps': 3, 'largest_gap': 2}
+    assert fetch_function.call_count == 3
+    pd.testing.assert_frame_equal(result, full_data, check_freq = False)
+    assert gap_detector.get_coverage_statistics(result, Granularity.ONE_DAY)['coverage'] == 1.0
+
+def create_minute_candles(tz = None) -> pd.DataFrame:
+    """
+    Creates random one minute candles spanning ten hours, with two hours of candles missing.
+
+    Parameters:
+        tz (Optional[str]): Time zone of candles index. Index is naive if not given.
+
+    Returns:
+        (pd.DataFrame): Candles indexed by time.
+    """
+
+    random_generator = np.random.default_rng(2)
+    index = pd.date_range('2020-03-01', periods = 600, freq = 'T', name = 'time', tz = tz)
+    return pd.DataFrame(data={
+        'low': random_generator.uniform(90, 95, size = 600),
+        'high': random_generator.uniform(105, 110, size = 600),
+        'open': random_generator.uniform(95, 105, size = 600),
+        'close': random_generator.uniform(95, 105, size = 600),
+        'volume': random_generator.uniform(1, 10, size = 600)
+    }, index = index).drop(index[130:250])
+
+@pytest.mark.parametrize('tz', [None, 'UTC', 'Europe/Warsaw'])
+@pytest.mark.parametrize('target_granularity, frequency', [(Granularity.FIFTEEN_MINUTES, '15T'),
+                                                           (Granularity.ONE_HOUR, 'H')])
+def test_candle_resampler_resample__matches_pandas_resampling(tz, target_granularity, frequency):
+    """
+    Tests the resample method of CandleResampler.
+
+    Verifies that candles resampled from one minute into coarser granularity are the same
+    as candles aggregated with pandas, including buckets with missing candles and candles
+    given out of order. Time zone of given candles is kept.
+
+    Asserts:
+        The result DataFrame matches DataFrame aggregated with pandas, including time zone.
+        Mismatched granularities are rejected.
+    """
+
+    data = create_minute_candles(tz)
+
+    result = CandleResampler().resample(data.sample(frac = 1, random_state = 0), target_granularity,
+                                        Granularity.ONE_MINUTE)
+    expected = data.resample(frequency).agg({'low': 'min', 'high': 'max', 'open': 'first', 'close': 'last',
+                                             'volume': 'sum'}).dropna()
+    pd.testing.assert_frame_equal(result, expected, check_freq = False)
+    assert result.index.tz == data.index.tz
+
+    with pytest.raises(ValueError):
+        CandleResampler().resample(data, target_granularity, Granularity.SIX_HOURS)
+
+@pytest.mark.asyncio
+@patch('source.data_handling.TradingPairCatalogue.get_source_of', new_callable=AsyncMock,
+       return_value = TradingPairCatalogue.COINBASE_SOURCE)
+@patch('source.coinbase.CoinBaseHandler.get_candles_for', new_callable=AsyncMock)
+async def test_prepare_data__resampled_from_finer_granularity(mock_get_candles_for, mock_get_source_of):
+    """
+    Tests the prepare_data method of DataHandler configured to resample candles.
+
+    Verifies that DataHandler collects one minute candles only and resamples them into
+    requested one hour granularity. The get_candles_for method of CoinBaseHandler is mocked
+    to return requested range of predefined data.
+
+    Asserts:
+        The result DataFrame matches candles resampled by CandleResampler.
+        DataHandler collects candles with finer granularity.
+    """
+
+    mocked_data = create_minute_candles()
+    mock_get_candles_for.side_effect = lambda trading_pair, start_date, end_date, granularity: \
+        mocked_data.loc[start_date:end_date]
+
+    handler = DataHandler(resample_from = Granularity.ONE_MINUTE)
+    prepared_data = await handler.prepare_data('BTC-USD', '2020-03-01 00:00:00', '2020-03-01 09:00:00', Granularity.ONE_HOUR)
+    pd.testing.assert_frame_equal(prepared_data, CandleResampler().resample(mocked_data, Granularity.ONE_HOUR),
+                                  check_freq = False)
+    assert mock_get_candles_for.call_args_list[0].args[2:] == ('2020-03-01 09:59:00', Granularity.ONE_MINUTE)
+
+@pytest.mark.asyncio
+@patch('source.data_handling.TradingPairCatalogue.get_source_of', new_callable=AsyncMock,
+       return_value = TradingPairCatalogue.COINBASE_SOURCE)
+@patch('source.coinbase.CoinBaseHandler.get_candles_for', new_callable=AsyncMock)
+async def test_prepare_data__backfilled_gaps_kept_in_candle_store(mock_get_candles_for, mock_get_source_of,
+                                                                  tmp_path):
+    """
+    Tests the prepare_data method of DataHandler with candle store and gap backfill enabled.
+
+    Verifies that candles backfilled into gap are written into candle store, so the next
+    data handler using the same store neither requests them again nor finds the gap. The
+    get_candles_for method of CoinBaseHandler is mocked to leave out two days in the first
+    response and return full data afterwards.
+
+    Asserts:
+        Data source is requested once for the whole range and once for the gap.
+        Both data handlers return full data without gaps.
+    """
+
+    full_data = pd.DataFrame(data={column: np.arange(10, dtype = float) for column in CandleStore.CANDLE_COLUMNS},
+                             index = pd.date_range('2020-03-01', periods = 10, freq = 'D', name = 'time'))
+    responses = iter([full_data.drop(full_data.index[3:5])])
+    mock_get_candles_for.side_effect = lambda trading_pair, start_date, end_date, granularity: \
+        next(responses, full_data.loc[start_date:end_date])
+
+    for _ in range(2):
+        handler = DataHandler(candle_store = CandleStore(str(tmp_path)), backfill_gaps = True)
+        result = await handler.prepare_data('BTC-USD', '2020-03-01 00:00:00', '2020-03-10 00:00:00',
+                                            Granularity.ONE_DAY)
+        pd.testing.assert_frame_equal(result, full_data, check_freq = False)
+        assert handler.coverage_statistics['BTC-USD']['missing_candles'] == 0
+
+    assert mock_get_candles_for.call_count == 2
+
+@pytest.mark.asyncio
+async def test_trading_pair_catalogue__cached_in_memory_and_on_disk(tmp_path):
+    """
+    Tests caching of TradingPairCatalogue.
+
+    Verifies that trading pairs are fetched from data sources only once. Subsequent
+    lookups are served from memory, and after clearing memory cache they are read from
+    disk cache. Data sources are mocked to return predefined trading pairs.
+
+    Asserts:
+        Trading pairs are mapped onto proper data sources.
+        Data sources are requested only once.
+    """
+
+    coinbase_handler = AsyncMock()
+    coinbase_handler.get_base_url = Mock(return_value = 'https://api.exchange.coinbase.com')
+    coinbase_handler.get_possible_pairs.return_value = pd.DataFrame(index = pd.Index(['BTC-USD', 'ETH-USD'], name = 'id'))
+    yahoo_finance_handler = AsyncMock()
+    yahoo_finance_handler.get_possible_pairs.return_value = pd.DataFrame(index = pd.Index(['AAPL'], name = 'id'))
+    cache_path = str(tmp_path / 'trading_pairs.json')
+
+    catalogue = TradingPairCatalogue(coinbase_handler, yahoo_finance_handler, cache_path = cache_path)
+    assert await catalogue.get_source_of('BTC-USD') == TradingPairCatalogue.COINBASE_SOURCE
+    assert await catalogue.get_source_of('AAPL') == TradingPairCatalogue.YAHOO_FINANCE_SOURCE
+
+    TradingPairCatalogue.clear_memory_cache()
+    catalogue = TradingPairCatalogue(coinbase_handler, yahoo_finance_handler, cache_path = cache_path)
+    assert await catalogue.contains('ETH-USD')
+    assert not await catalogue.contains('XYZ-USD')
+
+    coinbase_handler.get_possible_pairs.assert_called_once()
+    yahoo_finance_handler.get_possible_pairs.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_trading_pair_catalogue__cached_separately_for_base_urls(tmp_path):
+    """
+    Tests caching of TradingPairCatalogue for Coinbase handlers with different base URLs.
+
+    Verifies that trading pairs of real Coinbase API and local server standing in for it
+    do not overwrite each other, neither in memory nor on disk.
+
+    Asserts:
+        Each catalogue recognizes only trading pairs of its own base URL.
+    """
+
+    yahoo_finance_handler = AsyncMock()
+    yahoo_finance_handler.get_possible_pairs.return_value = pd.DataFrame(index = pd.Index([], name = 'id'))
+    coinbase_handlers = []
+    for base_url, trading_pair in [('https://api.exchange.coinbase.com', 'BTC-USD'), ('http://127.0.0.1:8080', 'MOCK-USD')]:
+        coinbase_handler = AsyncMock()
+        coinbase_handler.get_base_url = Mock(return_value = base_url)
+        coinbase_handler.get_possible_pairs.return_value = pd.DataFrame(index = pd.Index([trading_pair], name = 'id'))
+        coinbase_handlers.append(coinbase_handler)
+
+    for cache_path in [None, str(tmp_path / 'trading_pairs.json')]:
+        TradingPairCatalogue.clear_memory_cache()
+        for _ in range(2):
+            real_catalogue = TradingPairCatalogue(coinbase_handlers[0], yahoo_finance_handler, cache_path = cache_path)
+            mock_catalogue = TradingPairCatalogue(coinbase_handlers[1], yahoo_finance_handler, cache_path = cache_path)
+            assert await real_catalogue.contains('BTC-USD') and not await real_catalogue.contains('MOCK-USD')
+            assert await mock_catalogue.contains('MOCK-USD') and not await mock_catalogue.contains('BTC-USD')
+
+@pytest.mark.asyncio
+async def test_data_handler_context__closes_own_coinbase_session():
+    """
+    Tests the context manager of DataHandler without Coinbase handler given.
+
+    Asserts:
+        Coinbase session is opened when entering context and closed when leaving it.
+    """
+
+    async with DataHandler() as handler:
+        session = handler.coinbase._CoinBaseHandler__session
+        assert session is not None and not session.closed
+
+    assert session.closed
+
+@pytest.mark.asyncio
+async def test_data_handler_context__reuses_shared_coinbase_session():
+    """
+    Tests the context manager of DataHandler with Coinbase handler shared by many data handlers.
+
+    Verifies that data handlers reuse session of shared handler against local server standing
+    in for Coinbase API, and that leaving context of one of them does not close it.
+
+    Asserts:
+        Requests of both data handlers are sent with the same session.
+        Session stays open after leaving contexts of data handlers, until shared handler is closed.
+    """
+
+    async with MockCoinbaseServer() as server:
+        coinbase_handler = CoinBaseHandler(base_url = server.base_url)
+        async with coinbase_handler:
+            session = coinbase_handler._CoinBaseHandler__session
+            async with DataHandler(coinbase_handler = coinbase_handler) as first_handler:
+                await first_handler.coinbase.get_possible_pairs()
+            async with DataHandler(coinbase_handler = coinbase_handler) as second_handler:
+                possible_pairs = await second_handler.coinbase.get_possible_pairs()
+
+            assert coinbase_handler._CoinBaseHandler__session is session
+            assert not session.closed
+            assert list(possible_pairs.index) == sorted(MockCoinbaseServer.DEFAULT_PRODUCTS)
+
+        assert session.closed
@@ -1,7 +1,10 @@
 # tests/test_indicators.py  
 
 import pandas as pd
-from source.indicators import VolumeProfileIndicatorHandler, StochasticOscillatorIndicatorHandler, DonchainChannelsIndicatorHandler, MovingVolumeProfileIndicatorHandler
+import pytest
+from source.indicators import VolumeProfileIndicatorHandler, StochasticOscillatorIndicatorHandler, DonchainChannelsIndicatorHandler, MovingVolumeProfileIndicatorHandler, \
+    ExponentialMovingAverageIndicatorHandler, MACDIndicatorHandler, BollingerBandsIndicatorHandler, OnBalanceVolumeIndicatorHandler, \
+    RelativeStrengthIndexIndicatorHandler, VolatilityIndicatorHandler
 
 INPUT_DATA = pd.DataFrame(data={
     'low': [20000.0, 20500.0, 20100.0, 20100.0, 20000.0],
@@ -99,4 +102,38 @@ def test_moving_biggest_volume_price_indicator():
         
     indicator = MovingVolumeProfileIndicatorHandler(window_size = 3, number_of_steps = 5)
     result = indicator.calculate(data=INPUT_DATA)
-    pd.testing.assert_frame_equal(result, expected)
\ No newline at end of file
+    pd.testing.assert_frame_equal(result, expected)
+
+@pytest.mark.parametrize('indicator', [
+    StochasticOscillatorIndicatorHandler(window_size = 3, d_period = 2),
+    DonchainChannelsIndicatorHandler(window_size = 3),
+    MovingVolumeProfileIndicatorHandler(window_size = 3, number_of_steps = 5),
+    ExponentialMovingAverageIndicatorHandler(window_size = 3),
+    MACDIndicatorHandler(fast_period = 2, slow_period = 3, signal_period = 2),
+    BollingerBandsIndicatorHandler(window_size = 3),
+    OnBalanceVolumeIndicatorHandler(),
+    RelativeStrengthIndexIndicatorHandler(window_size = 3),
+    VolatilityIndicatorHandler(window_size = 3)
+])
+def test_indicator_panel_calculation(indicator):
+    """
+    Tests the calculate_panel method of indicators.
+
+    Verifies that calculating indicator over panel of symbols gives the same values
+    as calculating it separately for each symbol. Second symbol is created by
+    scaling input data, so its indicator values differ from the first one.
+
+    Asserts:
+        For each symbol, panel output matches the output of calculate method.
+    """
+
+    scaled_input_data = INPUT_DATA * [0.5, 0.6, 0.55, 0.4, 2.0]
+    symbols_data = {'SYMBOL-A': INPUT_DATA, 'SYMBOL-B': scaled_input_data}
+    panel = {column: pd.DataFrame({symbol: data[column] for symbol, data in symbols_data.items()})
+             for column in INPUT_DATA.columns}
+
+    result = indicator.calculate_panel(panel)
+    for symbol, data in symbols_data.items():
+        expected = indicator.calculate(data)
+        symbol_result = pd.DataFrame({column: frame[symbol] for column, frame in result.items()})
+        pd.testing.assert_frame_equal(symbol_result, expected, check_dtype = False)
\ No newline at end of file
@@ -0,0 +1,84 @@
+# tests/test_startup_time.py
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+PACKAGE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['tensorflow', 'rl', 'reportlab']
+MEASURE_IMPORT_SCRIPT = '''
+import json, sys, time
+start_time = time.perf_counter()
+{imports}
+duration = time.perf_counter() - start_time
+loaded = [name for name in {heavy_modules} if name in sys.modules]
+start_time = time.perf_counter()
+import tensorflow
+print(json.dumps({{'duration': duration, 'loaded': loaded,
+                  'tensorflow_duration': time.perf_counter() - start_time}}))
+'''
+
+def measure_import(imports: str) -> dict:
+    """
+    Imports modules in fresh interpreter, and then imports TensorFlow in the same interpreter
+    as reference. Both imports run under the same load of the machine, so their durations
+    can be compared.
+
+    Parameters:
+        imports (str): Import statements.
+
+    Returns:
+        (dict): Import duration in seconds, list of heavy modules that got loaded and duration
+            of TensorFlow import that followed it.
+    """
+
+    script = MEASURE_IMPORT_SCRIPT.format(imports = imports, heavy_modules = HEAVY_MODULES)
+    environment = {**os.environ, 'PYTHONPATH': PACKAGE_DIRECTORY}
+    output = subprocess.run([sys.executable, '-c', script], cwd = PACKAGE_DIRECTORY, env = environment,
+                            capture_output = True, text = True, check = True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+@pytest.mark.parametrize('imports', [
+    'import source.utils, source.agent, source.model, source.training',
+    'from source.environment import TradingEnvironment, Broker',
+    'from source.indicators import MACDIndicatorHandler',
+    'from source.data_handling import DataHandler, CandleStore',
+    'from source.utils import Granularity, CompressionHandler, IndexedDataSetWriter',
+    'from source.training import WorkerClient'
+])
+def test_data_only_imports_do_not_load_heavy_modules(imports: str):
+    """
+    Tests that data-only entry points do not import TensorFlow, keras-rl or reportlab.
+
+    Verifies that importing packages used by dataset creation, indicators and the broker
+    loads neither of heavy modules, and takes less time than importing TensorFlow afterwards
+    in the same interpreter. Modules shared with TensorFlow, e.g. NumPy, are then already
+    loaded, so the reference is conservative.
+
+    Asserts:
+        No heavy module is loaded.
+        Import takes less time than subsequent import of TensorFlow.
+    """
+
+    result = measure_import(imports)
+
+    assert result['loaded'] == []
+    assert result['duration'] < result['tensorflow_duration']
+
+def test_lazy_exports_are_loaded_on_access():
+    """
+    Tests that names exported lazily are loaded on first access.
+
+    Asserts:
+        Exported name is available after access and is listed by dir.
+        Unknown name raises AttributeError.
+    """
+
+    import source.agent
+
+    assert 'AgentHandler' in dir(source.agent)
+    assert source.agent.AgentHandler.__name__ == 'AgentHandler'
+    with pytest.raises(AttributeError):
+        source.agent.NotExportedName
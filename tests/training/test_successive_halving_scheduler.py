@@ -0,0 +1,214 @@
+# tests/training/test_successive_halving_scheduler.py
+
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Optional
+from unittest import TestCase
+from unittest.mock import patch
+from ddt import ddt, data, unpack
+
+from source.training import SuccessiveHalvingScheduler, SweepRunner
+
+BASE_TRAINING_CONFIG = {
+    'nr_of_steps': 90,
+    'nr_of_episodes': 9,
+    'quality': 0
+}
+
+class MockTrainingHandler():
+    """
+    Mocked TrainingHandler whose metric grows with quality of trial and number of trained
+    episodes. Number of episodes and steps of each rung are saved as weights, so that resuming
+    can be verified.
+    """
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        self.__config = config
+        self.__episodes = 0
+        self.__rung_steps = []
+
+    def run_training(self, weights_load_path: Optional[str] = None, weights_save_path: Optional[str] = None) -> None:
+        if weights_load_path is not None:
+            with open(weights_load_path, 'r') as weights_file:
+                weights = json.load(weights_file)
+            self.__episodes, self.__rung_steps = weights['episodes'], weights['rung_steps']
+        self.__episodes += self.__config['nr_of_episodes']
+        self.__rung_steps.append(self.__config['nr_of_steps'])
+        with open(weights_save_path, 'w') as weights_file:
+            json.dump({'episodes': self.__episodes, 'rung_steps': self.__rung_steps}, weights_file)
+
+    def get_test_metrics(self) -> dict[str, Any]:
+        return {'score': self.__config['quality'] * self.__episodes, 'trained_episodes': self.__episodes,
+                'rung_steps': self.__rung_steps}
+
+class MockCrashingTrainingHandler(MockTrainingHandler):
+    """
+    Mocked TrainingHandler that kills its process for trial of quality 4. Other trials
+    take a while, so that they are still running when it crashes.
+    """
+
+    def run_training(self, weights_load_path: Optional[str] = None, weights_save_path: Optional[str] = None) -> None:
+        if self._MockTrainingHandler__config['quality'] == 4:
+            os._exit(1)
+        time.sleep(0.2)
+        super().run_training(weights_load_path, weights_save_path)
+
+class MockTrainingConfigFactory():
+    """
+    Mocked TrainingConfigFactory passing configuration through.
+    """
+
+    def create(self, training_config: dict[str, Any]) -> dict[str, Any]:
+        return training_config
+
+@ddt
+class SuccessiveHalvingSchedulerTestCase(TestCase):
+    """
+    Test case for SuccessiveHalvingScheduler class. Stores all the test cases
+    and allows for convenient test case execution.
+    """
+
+    def setUp(self) -> None:
+        """
+        Setup function responsible for creation of system under
+        test (sut) for this class.
+        """
+
+        logging.info("Setting up test environment.")
+        self.__temporary_directory = tempfile.TemporaryDirectory()
+        self.__trials = SweepRunner(BASE_TRAINING_CONFIG, {'quality': list(range(9))}).generate_trials()
+
+    def tearDown(self) -> None:
+        """
+        Tear down function responsible for cleaning up all the
+        needed dependencies between test cases.
+        """
+
+        logging.info("Tearing down test environment.")
+        self.__temporary_directory.cleanup()
+
+    @data((1, 3, None, [1, 3, 9]), (2, 2, None, [2, 4, 8, 9]), (1, 3, 27, [1, 3, 9, 27]), (9, 3, None, [9]))
+    @unpack
+    def test_successive_halving_scheduler_get_rung_episodes(self, min_episodes: int, reduction_factor: int,
+                                                            max_episodes: Optional[int],
+                                                            expected_result: list[int]) -> None:
+        """
+        Tests SuccessiveHalvingScheduler's get_rung_episodes functionality.
+
+        Parameters:
+            min_episodes (int): Number of episodes in the first rung.
+            reduction_factor (int): Reduction factor between rungs.
+            max_episodes (Optional[int]): Number of episodes in the last rung.
+            expected_result (list[int]): Expected number of episodes per rung.
+
+        Asserts:
+            Episodes grow geometrically and are capped by max episodes.
+        """
+
+        sut = SuccessiveHalvingScheduler(self.__trials, self.__temporary_directory.name, 'score',
+                                         min_episodes = min_episodes, reduction_factor = reduction_factor,
+                                         max_episodes = max_episodes)
+
+        logging.info("Validating expected result.")
+        self.assertEqual(sut.get_rung_episodes(), expected_result)
+
+    @data(0, 10)
+    def test_successive_halving_scheduler_invalid_min_episodes(self, min_episodes: int) -> None:
+        """
+        Tests SuccessiveHalvingScheduler's validation of min episodes.
+
+        Parameters:
+            min_episodes (int): Number of episodes in the first rung.
+
+        Asserts:
+            ValueError is raised for min episodes outside of valid range.
+        """
+
+        logging.info("Validating expected exception.")
+        with self.assertRaises(ValueError):
+            SuccessiveHalvingScheduler(self.__trials, self.__temporary_directory.name, 'score',
+                                       min_episodes = min_episodes)
+
+    @patch('source.training.sweep_runner.TrainingConfigFactory', MockTrainingConfigFactory)
+    @patch('source.training.sweep_runner.TrainingHandler', MockTrainingHandler)
+    def test_successive_halving_scheduler_run(self) -> None:
+        """
+        Tests SuccessiveHalvingScheduler's run functionality.
+
+        Verifies that only the best trials are promoted and that promoted
+        trials resume training instead of starting from scratch.
+
+        Asserts:
+            The best trial reaches the last rung and is trained for max episodes in total.
+            The worst trial is stopped after the first rung.
+            Fewer trials reach each next rung.
+        """
+
+        sut = SuccessiveHalvingScheduler(self.__trials, self.__temporary_directory.name, 'score',
+                                         max_workers = 2, threads_per_worker = 1)
+        logging.info("Attempt to run sweep for SuccessiveHalvingScheduler.")
+        results = sut.run().set_index('quality')
+
+        logging.info("Validating expected result.")
+        self.assertEqual(len(results), 9)
+        self.assertTrue(all(results['status'] == 'finished'))
+        self.assertEqual(results.loc[8, 'rung'], 2)
+        self.assertEqual(results.loc[8, 'trained_episodes'], 9)
+        self.assertEqual(results.loc[8, 'score'], 72)
+        self.assertEqual(results.loc[0, 'rung'], 0)
+        self.assertTrue(all((results['trained_episodes'] == results['episodes'])))
+        rung_sizes = [sum(results['rung'] >= rung) for rung in range(3)]
+        self.assertEqual(rung_sizes[0], 9)
+        self.assertLess(rung_sizes[2], rung_sizes[1])
+        self.assertLess(rung_sizes[1], rung_sizes[0])
+        self.assertTrue(os.path.exists(os.path.join(self.__temporary_directory.name, 'trial_8_rung_2.h5')))
+
+    @patch('source.training.sweep_runner.TrainingConfigFactory', MockTrainingConfigFactory)
+    @patch('source.training.sweep_runner.TrainingHandler', MockTrainingHandler)
+    def test_successive_halving_scheduler_run_splits_steps(self) -> None:
+        """
+        Tests SuccessiveHalvingScheduler's splitting of steps between rungs.
+
+        Asserts:
+            Each rung is trained for steps proportional to its episodes.
+            Trial reaching the last rung is trained for nr_of_steps in total.
+        """
+
+        sut = SuccessiveHalvingScheduler(self.__trials, self.__temporary_directory.name, 'score',
+                                         max_workers = 2, threads_per_worker = 1)
+        logging.info("Attempt to run sweep for SuccessiveHalvingScheduler.")
+        results = sut.run().set_index('quality')
+
+        logging.info("Validating expected result.")
+        self.assertEqual(results.loc[8, 'rung_steps'], [10, 20, 60])
+        self.assertEqual(results.loc[0, 'rung_steps'], [10])
+        for _, result in results.iterrows():
+            self.assertEqual(sum(result['rung_steps']), 10 * result['trained_episodes'])
+
+    @patch('source.training.sweep_runner.TrainingConfigFactory', MockTrainingConfigFactory)
+    @patch('source.training.sweep_runner.TrainingHandler', MockCrashingTrainingHandler)
+    def test_successive_halving_scheduler_run_isolates_crashes(self) -> None:
+        """
+        Tests SuccessiveHalvingScheduler's run functionality with trial that crashes
+        its worker process.
+
+        Asserts:
+            Only crashing trial is recorded as crashed, trials running next to it are not affected.
+            The best trial still reaches the last rung.
+        """
+
+        sut = SuccessiveHalvingScheduler(self.__trials, self.__temporary_directory.name, 'score',
+                                         max_workers = 3, threads_per_worker = 1)
+        logging.info("Attempt to run sweep for SuccessiveHalvingScheduler.")
+        results = sut.run().set_index('quality')
+
+        logging.info("Validating expected result.")
+        self.assertEqual(len(results), 9)
+        self.assertEqual(results.loc[4, 'status'], 'crashed')
+        self.assertEqual(results.loc[4, 'rung'], 0)
+        self.assertTrue(all(results.drop(index = 4)['status'] == 'finished'))
+        self.assertEqual(results.loc[8, 'rung'], 2)
+        self.assertEqual(results.loc[8, 'trained_episodes'], 9)
@@ -0,0 +1,204 @@
+# tests/training/test_sweep_runner.py
+
+import logging
+import os
+from typing import Any, Optional
+from unittest import TestCase
+from unittest.mock import patch
+from ddt import ddt, data
+
+from source.training import SweepRunner
+
+BASE_TRAINING_CONFIG = {
+    'nr_of_steps': 100,
+    'nr_of_episodes': 1,
+    'data_path': 'mock/path/to/data/set',
+    'initial_budget': 1000.0,
+    'max_amount_of_trades': 5,
+    'window_size': 10,
+    'model_blue_print': {
+        'name': 'VGGceptionCnnBluePrint',
+        'parameters': {
+            'dropout': 0.2
+        }
+    }
+}
+
+class MockTrainingHandler():
+    """
+    Mocked TrainingHandler that kills its process for window size of 20.
+    """
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        self.__config = config
+
+    def run_training(self, weights_load_path: Optional[str] = None, weights_save_path: Optional[str] = None) -> None:
+        if self.__config['window_size'] == 20:
+            os._exit(1)
+
+    def get_test_metrics(self) -> dict[str, float]:
+        return {'accuracy': 0.5}
+
+class MockTrainingConfigFactory():
+    """
+    Mocked TrainingConfigFactory passing configuration through.
+    """
+
+    def create(self, training_config: dict[str, Any]) -> dict[str, Any]:
+        return training_config
+
+@ddt
+class SweepRunnerTestCase(TestCase):
+    """
+    Test case for SweepRunner class. Stores all the test cases
+    and allows for convenient test case execution.
+    """
+
+    def setUp(self) -> None:
+        """
+        Setup function responsible for creation of system under
+        test (sut) for this class.
+        """
+
+        logging.info("Setting up test environment.")
+
+    def tearDown(self) -> None:
+        """
+        Tear down function responsible for cleaning up all the
+        needed dependencies between test cases.
+        """
+
+        logging.info("Tearing down test environment.")
+
+    def test_sweep_runner_generate_grid_trials(self) -> None:
+        """
+        Tests SweepRunner's generate_trials functionality in grid mode.
+
+        Asserts:
+            Every combination of searched values is generated once.
+            Nested parameters are set without modifying base config.
+        """
+
+        sut = SweepRunner(BASE_TRAINING_CONFIG, {'window_size': [10, 20, 30],
+                                                 'model_blue_print.parameters.dropout': [0.1, 0.3]})
+        logging.info("Attempt to generate grid trials for SweepRunner.")
+        trials = sut.generate_trials()
+
+        logging.info("Validating expected result.")
+        self.assertEqual(len(trials), 6)
+        self.assertEqual([trial['trial_id'] for trial in trials], list(range(6)))
+        combinations = {(trial['training_config']['window_size'],
+                         trial['training_config']['model_blue_print']['parameters']['dropout']) for trial in trials}
+        self.assertEqual(combinations, {(w, d) for w in [10, 20, 30] for d in [0.1, 0.3]})
+        self.assertEqual(BASE_TRAINING_CONFIG['window_size'], 10)
+        self.assertEqual(BASE_TRAINING_CONFIG['model_blue_print']['parameters']['dropout'], 0.2)
+
+    @data(0, 1, 2)
+    def test_sweep_runner_generate_random_trials(self, seed: int) -> None:
+        """
+        Tests SweepRunner's generate_trials functionality in random mode.
+
+        Parameters:
+            seed (int): Seed of random generator.
+
+        Asserts:
+            Requested number of trials is sampled within given ranges.
+            The same seed gives the same trials.
+        """
+
+        search_space = {'window_size': {'min': 10, 'max': 50, 'integer': True},
+                        'model_blue_print.parameters.dropout': {'min': 0.01, 'max': 0.5, 'log': True},
+                        'initial_budget': [500.0, 1000.0]}
+        sut = SweepRunner(BASE_TRAINING_CONFIG, search_space, SweepRunner.RANDOM_MODE, 8, seed)
+        logging.info("Attempt to generate random trials for SweepRunner.")
+        trials = sut.generate_trials()
+
+        logging.info("Validating expected result.")
+        self.assertEqual(len(trials), 8)
+        for trial in trials:
+            parameters = trial['parameters']
+            self.assertIsInstance(parameters['window_size'], int)
+            self.assertTrue(10 <= parameters['window_size'] <= 50)
+            self.assertTrue(0.01 <= parameters['model_blue_print.parameters.dropout'] <= 0.5)
+            self.assertIn(parameters['initial_budget'], [500.0, 1000.0])
+        self.assertEqual(trials, SweepRunner(BASE_TRAINING_CONFIG, search_space, SweepRunner.RANDOM_MODE,
+                                             8, seed).generate_trials())
+
+    def test_sweep_runner_invalid_search_space(self) -> None:
+        """
+        Tests SweepRunner's validation of search space.
+
+        Asserts:
+            Ranges are rejected in grid mode.
+            Random mode requires number of trials.
+        """
+
+        logging.info("Validating expected exceptions.")
+        with self.assertRaises(ValueError):
+            SweepRunner(BASE_TRAINING_CONFIG, {'window_size': {'min': 10, 'max': 50}})
+        with self.assertRaises(ValueError):
+            SweepRunner(BASE_TRAINING_CONFIG, {'window_size': [10]}, SweepRunner.RANDOM_MODE)
+
+    @patch('source.training.sweep_runner.TrainingConfigFactory')
+    @patch('source.training.sweep_runner.TrainingHandler')
+    def test_sweep_runner_run_trial(self, mock_training_handler, mock_training_config_factory) -> None:
+        """
+        Tests SweepRunner's run_trial functionality.
+
+        Asserts:
+            Test metrics of finished trial are included in its result.
+            Exception raised by trial is recorded in its result.
+        """
+
+        trial = SweepRunner(BASE_TRAINING_CONFIG, {'window_size': [10]}).generate_trials()[0]
+        mock_training_handler.return_value.get_test_metrics.return_value = {'accuracy': 0.5}
+        logging.info("Attempt to run trial for SweepRunner.")
+        result = SweepRunner.run_trial(trial)
+
+        logging.info("Validating expected result.")
+        self.assertEqual(result['status'], 'finished')
+        self.assertEqual(result['accuracy'], 0.5)
+        self.assertEqual(result['window_size'], 10)
+
+        mock_training_handler.return_value.run_training.side_effect = RuntimeError('Mocked failure')
+        result = SweepRunner.run_trial(trial)
+        self.assertEqual(result['status'], 'failed')
+        self.assertEqual(result['error'], 'Mocked failure')
+
+    def test_sweep_runner_run_isolates_failures(self) -> None:
+        """
+        Tests SweepRunner's run functionality with trials that fail.
+
+        Asserts:
+            Failed trials do not stop the sweep and are recorded in results table.
+        """
+
+        sut = SweepRunner(BASE_TRAINING_CONFIG, {'window_size': [10, 20]}, max_workers = 2, threads_per_worker = 1)
+        logging.info("Attempt to run sweep for SweepRunner.")
+        results = sut.run()
+
+        logging.info("Validating expected result.")
+        self.assertEqual(list(results['trial_id']), [0, 1])
+        self.assertEqual(list(results['window_size']), [10, 20])
+        self.assertEqual(list(results['status']), ['failed', 'failed'])
+        self.assertTrue(all(results['error'] != ''))
+
+    @patch('source.training.sweep_runner.TrainingConfigFactory', MockTrainingConfigFactory)
+    @patch('source.training.sweep_runner.TrainingHandler', MockTrainingHandler)
+    def test_sweep_runner_run_isolates_crashes(self) -> None:
+        """
+        Tests SweepRunner's run functionality with trial that crashes its worker process.
+
+        Asserts:
+            Only crashing trial is recorded as crashed, other trials from broken pool finish.
+        """
+
+        sut = SweepRunner(BASE_TRAINING_CONFIG, {'window_size': [10, 20, 30, 40]}, max_workers = 2,
+                          threads_per_worker = 1)
+        logging.info("Attempt to run sweep for SweepRunner.")
+        results = sut.run()
+
+        logging.info("Validating expected result.")
+        self.assertEqual(list(results['trial_id']), [0, 1, 2, 3])
+        self.assertEqual(list(results['status']), ['finished', 'crashed', 'finished', 'finished'])
+        self.assertEqual(list(results['accuracy'].isna()), [False, True, False, False])
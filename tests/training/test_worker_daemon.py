@@ -0,0 +1,180 @@
+# tests/training/test_worker_daemon.py
+
+import logging
+import os
+import tempfile
+from typing import Any, Optional
+from unittest import TestCase
+from unittest.mock import patch
+
+from source.training import WorkerClient, WorkerDaemon
+from source.utils import FileLock
+
+class MockTrainingHandler():
+    """
+    Mocked TrainingHandler that prints progress and fails for negative number of episodes.
+    """
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        self.__config = config
+
+    def run_training(self, callbacks: list = [], weights_load_path: Optional[str] = None,
+                     weights_save_path: Optional[str] = None) -> None:
+        if self.__config['nr_of_episodes'] < 0:
+            raise ValueError('Mocked failure')
+        for episode in range(self.__config['nr_of_episodes']):
+            print(f'Episode {episode}')
+        logging.info(f"Process {os.getpid()} trained on {self.__config['data_path']}.")
+        if weights_load_path is not None:
+            logging.info(f'Loaded weights from {weights_load_path}.')
+
+    def get_test_metrics(self) -> dict[str, float]:
+        return {'accuracy': 0.5}
+
+    def get_profile(self) -> dict[str, Any]:
+        return {'phases': []}
+
+class MockTrainingConfigFactory():
+    """
+    Mocked TrainingConfigFactory passing configuration through.
+    """
+
+    def create(self, training_config: dict[str, Any]) -> dict[str, Any]:
+        return training_config
+
+@patch('source.training.worker_daemon.TrainingConfigFactory', MockTrainingConfigFactory)
+@patch('source.training.worker_daemon.TrainingHandler', MockTrainingHandler)
+class WorkerDaemonTestCase(TestCase):
+    """
+    Test case for WorkerDaemon and WorkerClient classes. Stores all the test cases
+    and allows for convenient test case execution.
+    """
+
+    def setUp(self) -> None:
+        """
+        Setup function responsible for creation of system under
+        test (sut) for this class.
+        """
+
+        logging.info("Setting up test environment.")
+        self.__temporary_directory = tempfile.TemporaryDirectory()
+        self.__client: WorkerClient = WorkerClient(self.__temporary_directory.name)
+        self.__sut: WorkerDaemon = WorkerDaemon(self.__temporary_directory.name, max_workers = 2,
+                                                threads_per_worker = 1)
+
+    def tearDown(self) -> None:
+        """
+        Tear down function responsible for cleaning up all the
+        needed dependencies between test cases.
+        """
+
+        logging.info("Tearing down test environment.")
+        self.__temporary_directory.cleanup()
+
+    def test_worker_daemon_serve(self) -> None:
+        """
+        Tests WorkerDaemon's serve functionality together with WorkerClient.
+
+        Verifies that submitted jobs are run in forked workers, their output is
+        streamed back and failure of one job does not affect others.
+
+        Asserts:
+            Finished job reports its metrics and output, including printed lines.
+            Failed job reports its error.
+            Jobs are run outside of daemon process and queue is emptied.
+        """
+
+        job_ids = [self.__client.submit({'data_set_name': 'data_set.csv', 'training_config': {'nr_of_episodes': 3}}),
+                   self.__client.submit({'training_config': {'nr_of_episodes': -1, 'data_path': 'data_set.csv'}})]
+        logging.info("Attempt to serve jobs for WorkerDaemon.")
+        self.__sut.serve(max_jobs = 2, poll_interval = 0.05)
+
+        logging.info("Validating expected result.")
+        lines = list(self.__client.stream_logs(job_ids[0], poll_interval = 0.05, timeout = 10))
+        self.assertEqual([line for line in lines if line.startswith('Episode')],
+                         ['Episode 0', 'Episode 1', 'Episode 2'])
+        self.assertTrue(any('trained on data_set.csv' in line for line in lines))
+        self.assertFalse(any(f'Process {os.getpid()} ' in line for line in lines))
+        status = self.__client.get_status(job_ids[0])
+        self.assertEqual(status['status'], 'finished')
+        self.assertEqual(status['metrics'], {'accuracy': 0.5})
+
+        lines = list(self.__client.stream_logs(job_ids[1], poll_interval = 0.05, timeout = 10))
+        self.assertTrue(any('Mocked failure' in line for line in lines))
+        status = self.__client.get_status(job_ids[1])
+        self.assertEqual(status['status'], 'failed')
+        self.assertEqual(status['error'], 'Mocked failure')
+        for directory_name in [WorkerClient.PENDING_DIRECTORY_NAME, WorkerClient.RUNNING_DIRECTORY_NAME]:
+            self.assertEqual(os.listdir(os.path.join(self.__temporary_directory.name, directory_name)), [])
+
+    def test_worker_daemon_serve_fetches_remote_artifacts(self) -> None:
+        """
+        Tests WorkerDaemon's serve functionality with data set and weights given as S3 URLs,
+        as in train_model.py configuration. ArtifactCache is mocked to map URLs onto local paths.
+
+        Asserts:
+            Data set and weights are fetched through artifact cache and job is trained on local copies.
+        """
+
+        local_paths = {'s3://bucket/data_set.csv.gz': '/cache/data_set.csv',
+                       's3://bucket/weights.h5': '/cache/weights.h5'}
+        job_id = self.__client.submit({'data_set_name': 's3://bucket/data_set.csv.gz',
+                                       'weights_file_name': 's3://bucket/weights.h5',
+                                       'training_config': {'nr_of_episodes': 1}})
+
+        logging.info("Attempt to serve job for WorkerDaemon.")
+        with patch('source.training.worker_daemon.ArtifactCache.get_local_path',
+                   side_effect = lambda source, bucket_name: local_paths[source]):
+            self.__sut.serve(max_jobs = 1, poll_interval = 0.05)
+
+        logging.info("Validating expected result.")
+        lines = list(self.__client.stream_logs(job_id, poll_interval = 0.05, timeout = 10))
+        self.assertEqual(self.__client.get_status(job_id)['status'], 'finished')
+        self.assertTrue(any('trained on /cache/data_set.csv' in line for line in lines))
+        self.assertTrue(any('Loaded weights from /cache/weights.h5' in line for line in lines))
+
+    def test_worker_daemon_serve_recovers_orphaned_jobs(self) -> None:
+        """
+        Tests WorkerDaemon's serve functionality with jobs left in running directory.
+
+        Verifies that job whose daemon exited is recorded as crashed, so that following
+        it finishes, while job still locked by other daemon is left alone.
+
+        Asserts:
+            Orphaned job is recorded as crashed and removed from running directory.
+            Locked job keeps running without status.
+        """
+
+        job_ids = [self.__client.submit({'training_config': {'nr_of_episodes': 1}}) for _ in range(2)]
+        for job_id in job_ids:
+            os.rename(self.__client.get_path(WorkerClient.PENDING_DIRECTORY_NAME, job_id),
+                      self.__client.get_path(WorkerClient.RUNNING_DIRECTORY_NAME, job_id))
+        other_daemon_lock = FileLock(os.path.join(self.__temporary_directory.name,
+                                                  WorkerClient.RUNNING_DIRECTORY_NAME, job_ids[1] + '.lock'))
+        other_daemon_lock.acquire()
+        self.__client.submit({'data_set_name': 'data_set.csv', 'training_config': {'nr_of_episodes': 1}})
+
+        logging.info("Attempt to serve jobs for WorkerDaemon.")
+        self.__sut.serve(max_jobs = 1, poll_interval = 0.05)
+
+        logging.info("Validating expected result.")
+        list(self.__client.stream_logs(job_ids[0], poll_interval = 0.05, timeout = 1))
+        self.assertEqual(self.__client.get_status(job_ids[0])['status'], 'crashed')
+        self.assertFalse(os.path.exists(self.__client.get_path(WorkerClient.RUNNING_DIRECTORY_NAME, job_ids[0])))
+        self.assertIsNone(self.__client.get_status(job_ids[1]))
+        self.assertTrue(os.path.exists(self.__client.get_path(WorkerClient.RUNNING_DIRECTORY_NAME, job_ids[1])))
+        other_daemon_lock.release()
+
+    def test_worker_client_stream_logs_timeout(self) -> None:
+        """
+        Tests WorkerClient's stream_logs functionality for job that is not run.
+
+        Asserts:
+            TimeoutError is raised once timeout passes.
+        """
+
+        job_id = self.__client.submit({'training_config': {'nr_of_episodes': 1}})
+
+        logging.info("Validating expected exception.")
+        with self.assertRaises(TimeoutError):
+            list(self.__client.stream_logs(job_id, poll_interval = 0.05, timeout = 0.2))
@@ -0,0 +1,158 @@
+# tests/utils/test_artifact_cache.py
+
+from unittest import TestCase
+from unittest.mock import patch
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+import boto3
+from moto import mock_aws
+
+from source.aws import AWSHandler
+from source.utils import ArtifactCache, FileLock
+
+@mock_aws
+class ArtifactCacheTestCase(TestCase):
+    """
+    Test case for ArtifactCache class. Stores all the test cases
+    and allows for convenient test case execution.
+    """
+
+    # Constants used locally
+    BUCKET_NAME = 'mocked-bucket'
+
+    def setUp(self) -> None:
+        """
+        Setup function responsible for creation of system under
+        test (sut) for this class.
+        """
+
+        logging.info("Setting up test environment.")
+        self.__environment_patcher = patch.dict(os.environ, {'AWS_ACCESS_KEY_ID': 'access_key',
+                                                             'AWS_SECRET_ACCESS_KEY': 'secret_key',
+                                                             'ACCOUNT_ID': '123456789012'})
+        self.__environment_patcher.start()
+        self.__s3_client = boto3.client('s3', region_name = 'us-east-1')
+        self.__s3_client.create_bucket(Bucket = ArtifactCacheTestCase.BUCKET_NAME)
+        self.__temporary_directory = tempfile.TemporaryDirectory()
+        self.__aws_handler = AWSHandler('mocked_bucket-user-role')
+        self.__sut: ArtifactCache = ArtifactCache(self.__temporary_directory.name, 100,
+                                                  lambda: self.__aws_handler)
+
+    def tearDown(self) -> None:
+        """
+        Tear down function responsible for cleaning up all the
+        needed dependencies between test cases.
+        """
+
+        logging.info("Tearing down test environment.")
+        self.__temporary_directory.cleanup()
+        self.__environment_patcher.stop()
+
+    def __put(self, key: str, content: bytes) -> str:
+        """
+        Uploads object into mocked bucket.
+
+        Returns:
+            (str): S3 URL of uploaded object.
+        """
+
+        self.__s3_client.put_object(Bucket = ArtifactCacheTestCase.BUCKET_NAME, Key = key, Body = content)
+        return f's3://{ArtifactCacheTestCase.BUCKET_NAME}/{key}'
+
+    def test_artifact_cache_get_local_path(self) -> None:
+        """
+        Tests ArtifactCache's get_local_path functionality.
+
+        Verifies that artifact is downloaded and decompressed once, served from
+        cache while unchanged, and downloaded again after its content changes.
+
+        Asserts:
+            Cached artifact keeps source extension without compression suffix.
+            Unchanged artifact is not downloaded again.
+            Changed artifact is downloaded again.
+        """
+
+        source = self.__put('data/data_set.csv.gz', gzip.compress(b'time,close\n1,2\n'))
+        with patch.object(self.__aws_handler, 'open_s3_object_stream',
+                          wraps = self.__aws_handler.open_s3_object_stream) as open_stream:
+            logging.info("Attempt to fetch artifact twice for ArtifactCache.")
+            first_path = self.__sut.get_local_path(source, ArtifactCacheTestCase.BUCKET_NAME)
+            second_path = self.__sut.get_local_path(source, ArtifactCacheTestCase.BUCKET_NAME)
+
+            logging.info("Validating expected result.")
+            self.assertEqual(first_path, second_path)
+            self.assertTrue(first_path.endswith('.csv'))
+            self.assertEqual(open_stream.call_count, 1)
+            with open(first_path, 'rb') as file:
+                self.assertEqual(file.read(), b'time,close\n1,2\n')
+
+            self.__put('data/data_set.csv.gz', gzip.compress(b'time,close\n1,3\n'))
+            third_path = self.__sut.get_local_path(source, ArtifactCacheTestCase.BUCKET_NAME)
+            self.assertEqual(open_stream.call_count, 2)
+            with open(third_path, 'rb') as file:
+                self.assertEqual(file.read(), b'time,close\n1,3\n')
+
+    def test_artifact_cache_eviction(self) -> None:
+        """
+        Tests ArtifactCache's least recently used eviction.
+
+        Asserts:
+            Least recently used artifact is removed once cache exceeds its size.
+            Recently used artifacts are kept.
+        """
+
+        sources = [self.__put(f'file_{i}.json', bytes([i]) * 40) for i in range(3)]
+        paths = [self.__sut.get_local_path(source, ArtifactCacheTestCase.BUCKET_NAME) for source in sources[:2]]
+        self.__sut.get_local_path(sources[0], ArtifactCacheTestCase.BUCKET_NAME)
+        paths.append(self.__sut.get_local_path(sources[2], ArtifactCacheTestCase.BUCKET_NAME))
+
+        logging.info("Validating expected result.")
+        self.assertTrue(os.path.exists(paths[0]))
+        self.assertFalse(os.path.exists(paths[1]))
+        self.assertTrue(os.path.exists(paths[2]))
+
+    def test_artifact_cache_index_lock(self) -> None:
+        """
+        Tests ArtifactCache's locking of index shared with other processes.
+
+        Verifies that index is updated only once lock held by other process is released,
+        and that entry added by that process in the meantime is kept.
+
+        Asserts:
+            Index is not updated while lock is held by someone else.
+            Entries of both processes are present in index afterwards.
+        """
+
+        source = self.__put('data/config.json', b'{}')
+        other_entry = {'source': 'https://example.com/other.json', 'validator': 'etag', 'content_hash': 'other',
+                       'suffix': '.json', 'size': 2, 'last_access': 0.0}
+        index_path = os.path.join(self.__temporary_directory.name, ArtifactCache.INDEX_FILE_NAME)
+        paths = []
+
+        logging.info("Attempt to fetch artifact while index is locked by other process.")
+        with FileLock(os.path.join(self.__temporary_directory.name, ArtifactCache.LOCK_FILE_NAME)):
+            thread = threading.Thread(target = lambda: paths.append(
+                self.__sut.get_local_path(source, ArtifactCacheTestCase.BUCKET_NAME)))
+            thread.start()
+            thread.join(0.5)
+            self.assertTrue(thread.is_alive())
+            self.assertFalse(os.path.exists(index_path))
+
+            with open(os.path.join(self.__temporary_directory.name, ArtifactCache.OBJECTS_DIRECTORY_NAME,
+                                   'other.json'), 'w') as file:
+                file.write('{}')
+            with open(index_path, 'w') as file:
+                json.dump({'other': other_entry}, file)
+        thread.join()
+
+        logging.info("Validating expected result.")
+        with open(index_path, 'r') as file:
+            index = json.load(file)
+        self.assertEqual(len(paths), 1)
+        self.assertTrue(os.path.exists(paths[0]))
+        self.assertIn('other', index)
+        self.assertEqual(len(index), 2)
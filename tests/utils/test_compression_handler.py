@@ -0,0 +1,81 @@
+# tests/utils/test_compression_handler.py
+
+from unittest import TestCase
+import io
+import logging
+import os
+import tempfile
+from typing import Optional
+from ddt import ddt, data
+
+from source.utils import CompressionHandler
+
+@ddt
+class CompressionHandlerTestCase(TestCase):
+    """
+    Test case for CompressionHandler class. Stores all the test cases
+    and allows for convenient test case execution.
+    """
+
+    def setUp(self) -> None:
+        """
+        Setup function responsible for creation of system under
+        test (sut) for this class.
+        """
+
+        logging.info("Setting up test environment.")
+        self.__sut: CompressionHandler = CompressionHandler(block_size = 64)
+        self.__temporary_directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """
+        Tear down function responsible for cleaning up all the
+        needed dependencies between test cases.
+        """
+
+        logging.info("Tearing down test environment.")
+        self.__temporary_directory.cleanup()
+
+    @data(None, 'gzip', 'bz2', 'xz')
+    def test_compression_handler_roundtrip(self, compression: Optional[str]) -> None:
+        """
+        Tests CompressionHandler's compress_chunks and decompress_to_file functionality.
+
+        Verifies that data compressed chunk by chunk is detected and restored
+        when decompressed block by block, also when concatenated from two streams.
+
+        Parameters:
+            compression: Name of tested codec, or None for not compressed data.
+
+        Asserts:
+            Detected codec matches codec used for compression.
+            Decompressed data equals original data.
+        """
+
+        chunks = ['time,close\n'] + [f'2024-01-01 00:{minute:02d}:00,{minute * 1.5}\n' for minute in range(60)]
+        expected_content = ''.join(chunks).encode('utf-8') * 2
+
+        logging.info(f"Attempt to compress data with {compression} for CompressionHandler.")
+        compressed = b''.join(self.__sut.compress_chunks(chunks, compression)) * 2
+        destination_path = os.path.join(self.__temporary_directory.name, 'data.csv')
+        detected_compression = self.__sut.decompress_to_file(io.BytesIO(compressed), destination_path)
+
+        logging.info("Validating expected result.")
+        self.assertEqual(detected_compression, compression)
+        with open(destination_path, 'rb') as file:
+            self.assertEqual(file.read(), expected_content)
+
+    @data(('data.csv.gz', 'data.csv'), ('data.csv.xz', 'data.csv'), ('data.csv', 'data.csv'))
+    def test_compression_handler_strip_extension(self, names: tuple[str, str]) -> None:
+        """
+        Tests CompressionHandler's strip_extension functionality.
+
+        Parameters:
+            names: Name of file and expected name without codec extension.
+
+        Asserts:
+            Codec extension is removed, other extensions are kept.
+        """
+
+        file_name, expected_file_name = names
+        self.assertEqual(self.__sut.strip_extension(file_name), expected_file_name)
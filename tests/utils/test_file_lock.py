@@ -0,0 +1,91 @@
+# tests/utils/test_file_lock.py
+
+from unittest import TestCase
+import logging
+import multiprocessing
+import os
+import tempfile
+
+from source.utils import FileLock
+
+class FileLockTestCase(TestCase):
+    """
+    Test case for FileLock class. Stores all the test cases
+    and allows for convenient test case execution.
+    """
+
+    def setUp(self) -> None:
+        """
+        Setup function responsible for creation of system under
+        test (sut) for this class.
+        """
+
+        logging.info("Setting up test environment.")
+        self.__temporary_directory = tempfile.TemporaryDirectory()
+        self.__lock_path: str = os.path.join(self.__temporary_directory.name, '.lock')
+        self.__sut: FileLock = FileLock(self.__lock_path)
+
+    def tearDown(self) -> None:
+        """
+        Tear down function responsible for cleaning up all the
+        needed dependencies between test cases.
+        """
+
+        logging.info("Tearing down test environment.")
+        self.__sut.release()
+        self.__temporary_directory.cleanup()
+
+    @staticmethod
+    def acquire_and_exit(lock_path: str) -> None:
+        """
+        Acquires lock and exits process without releasing it.
+
+        Parameters:
+            lock_path (str): Path to lock file.
+        """
+
+        FileLock(lock_path).acquire()
+        os._exit(0)
+
+    def test_file_lock_try_acquire(self) -> None:
+        """
+        Tests FileLock's try_acquire and release functionality.
+
+        Asserts:
+            Lock held by one object can not be acquired by other one until it is released.
+            Lock can not be acquired twice by the same object.
+        """
+
+        other_lock = FileLock(self.__lock_path)
+        logging.info("Attempt to acquire lock for FileLock.")
+        self.assertTrue(self.__sut.try_acquire())
+
+        logging.info("Validating expected result.")
+        self.assertFalse(other_lock.try_acquire())
+        with self.assertRaises(RuntimeError):
+            self.__sut.try_acquire()
+        with self.assertRaises(RuntimeError):
+            other_lock.acquire(timeout = 0.1)
+
+        self.__sut.release()
+        with other_lock:
+            self.assertFalse(self.__sut.try_acquire())
+        self.assertTrue(self.__sut.try_acquire())
+
+    def test_file_lock_released_by_crashed_process(self) -> None:
+        """
+        Tests FileLock's behavior when process holding lock dies.
+
+        Asserts:
+            Lock left by dead process can be acquired, and lock file is kept.
+        """
+
+        logging.info("Attempt to acquire lock in process that exits without releasing it.")
+        process = multiprocessing.get_context('spawn').Process(target = FileLockTestCase.acquire_and_exit,
+                                                               args = (self.__lock_path,))
+        process.start()
+        process.join()
+
+        logging.info("Validating expected result.")
+        self.assertTrue(os.path.exists(self.__lock_path))
+        self.__sut.acquire(timeout = 1)
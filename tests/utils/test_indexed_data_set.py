@@ -0,0 +1,126 @@
+# tests/utils/test_indexed_data_set.py
+
+from unittest import TestCase
+import logging
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from ddt import ddt, data
+
+from source.environment import TradingEnvironment, MockRewardValidator, SimpleLabelAnnotator
+from source.utils import IndexedDataSetWriter, IndexedDataSetReader
+
+@ddt
+class IndexedDataSetTestCase(TestCase):
+    """
+    Test case for IndexedDataSetWriter and IndexedDataSetReader classes. Stores all
+    the test cases and allows for convenient test case execution.
+    """
+
+    def setUp(self) -> None:
+        """
+        Setup function responsible for creation of system under
+        test (sut) for this class.
+        """
+
+        logging.info("Setting up test environment.")
+        self.__temporary_directory = tempfile.TemporaryDirectory()
+        random_generator = np.random.default_rng(0)
+        close = 100 + np.cumsum(random_generator.normal(size = 1000))
+        self.__data = pd.DataFrame({
+            'low': close - 1,
+            'high': close + 1,
+            'open': close - 0.5,
+            'close': close,
+            'volume': random_generator.integers(100, 1000, size = 1000)
+        }, index = pd.date_range('2024-01-01', periods = 1000, freq = 'h', name = 'time'))
+        self.__data_path = os.path.join(self.__temporary_directory.name, 'data_set.ids')
+        IndexedDataSetWriter(rows_per_block = 64).write(self.__data, self.__data_path)
+
+    def tearDown(self) -> None:
+        """
+        Tear down function responsible for cleaning up all the
+        needed dependencies between test cases.
+        """
+
+        logging.info("Tearing down test environment.")
+        self.__temporary_directory.cleanup()
+
+    @data((0, 1000), (0, 1), (63, 65), (100, 400), (990, 2000), (500, 500))
+    def test_indexed_data_set_reader_read_rows(self, row_range: tuple[int, int]) -> None:
+        """
+        Tests IndexedDataSetReader's read_rows functionality.
+
+        Verifies that any range of rows, including ranges crossing block boundaries
+        and exceeding data set, is restored exactly.
+
+        Parameters:
+            row_range: Start and stop of requested rows.
+
+        Asserts:
+            Read rows equal rows of written data set.
+        """
+
+        start, stop = row_range
+        reader = IndexedDataSetReader.from_file(self.__data_path)
+        logging.info(f"Attempt to read rows {start}:{stop} for IndexedDataSetReader.")
+        result = reader.read_rows(start, stop)
+
+        logging.info("Validating expected result.")
+        expected_result = self.__data.reset_index().iloc[start:stop]
+        self.assertEqual(len(reader), len(self.__data))
+        self.assertEqual(list(result.columns), list(expected_result.columns))
+        pd.testing.assert_frame_equal(result, expected_result, check_index_type = False)
+
+    def test_indexed_data_set_reader_fetches_only_touched_blocks(self) -> None:
+        """
+        Tests IndexedDataSetReader's lazy fetching and block cache.
+
+        Asserts:
+            Reading small range fetches only fraction of data set.
+            Reading cached range again does not fetch anything.
+        """
+
+        reader = IndexedDataSetReader.from_file(self.__data_path, cache_size = 4)
+        footer_bytes = reader.fetched_bytes
+        reader.read_rows(900, 1000)
+        fetched_bytes = reader.fetched_bytes - footer_bytes
+        reader.read_rows(910, 990)
+
+        logging.info("Validating expected result.")
+        self.assertLess(fetched_bytes, os.path.getsize(self.__data_path) / 4)
+        self.assertEqual(reader.fetched_bytes - footer_bytes, fetched_bytes)
+
+    def test_indexed_data_set_trading_environment(self) -> None:
+        """
+        Tests TradingEnvironment's lazy loading of indexed data set.
+
+        Asserts:
+            Environment built from indexed data set behaves as one built from CSV file.
+        """
+
+        csv_path = os.path.join(self.__temporary_directory.name, 'data_set.csv')
+        self.__data.to_csv(csv_path)
+        validator = MockRewardValidator(lambda orders: len(orders))
+        environments = [TradingEnvironment(path, 1000.0, 5, 10, validator, SimpleLabelAnnotator(), 0.95, 1.05,
+                                           0.95, 1.05, 0.2) for path in [csv_path, self.__data_path]]
+
+        logging.info("Validating expected result.")
+        for mode in [TradingEnvironment.TRAIN_MODE, TradingEnvironment.TEST_MODE]:
+            results = []
+            for environment in environments:
+                environment.set_mode(mode)
+                states = [environment.reset(50)]
+                rewards = []
+                for action in range(20):
+                    state, reward, _, _ = environment.step(action % 3)
+                    states.append(state)
+                    rewards.append(reward)
+                results.append((environment.get_environment_length(), environment.get_environment_spatial_data_dimension(),
+                                states, rewards, environment.get_data_for_iteration(['close', 'volume'], 10, 30, 3)))
+
+            # Values read back from CSV file may differ on the last bits
+            self.assertEqual(results[0][:2], results[1][:2])
+            for csv_values, indexed_values in zip(results[0][2:], results[1][2:]):
+                np.testing.assert_allclose(np.array(csv_values), np.array(indexed_values), rtol = 1e-9)
@@ -0,0 +1,120 @@
+# tests/utils/test_metrics_exporter.py
+
+from unittest import TestCase
+import logging
+import socket
+import urllib.request
+
+from rl.callbacks import CallbackList
+from source.environment import Broker
+from source.utils import MetricsCallback, MetricsExporter
+
+class MetricsExporterTestCase(TestCase):
+    """
+    Test case for MetricsExporter class. Stores all the test cases
+    and allows for convenient test case execution.
+    """
+
+    def setUp(self) -> None:
+        """
+        Setup function responsible for creation of system under
+        test (sut) for this class.
+        """
+
+        logging.info("Setting up test environment.")
+        MetricsExporter.disable()
+        self.__broker: Broker = Broker()
+
+    def tearDown(self) -> None:
+        """
+        Tear down function responsible for cleaning up all the
+        needed dependencies between test cases.
+        """
+
+        logging.info("Tearing down test environment.")
+        MetricsExporter.disable()
+
+    def test_metrics_exporter_broker_orders(self) -> None:
+        """
+        Tests MetricsExporter's counting of orders placed and closed by Broker.
+
+        Asserts:
+            Orders are counted by side and closed orders by reason of closing.
+            Orders are not counted once exporter is disabled.
+        """
+
+        logging.info("Attempt to place and close orders with MetricsExporter enabled.")
+        MetricsExporter.enable(port = None)
+        self.__broker.place_order(100, True, 0.9, 1.1)
+        self.__broker.place_order(100, False, 0.9, 1.1)
+        self.__broker.place_order(100, True, 0.5, 2.0)
+        self.__broker.update_orders(1.2)
+
+        logging.info("Validating expected result.")
+        registry = MetricsExporter.get_registry()
+        get_value = lambda name, labels: registry.get_sample_value(f'{MetricsExporter.NAMESPACE}_{name}', labels)
+        self.assertEqual(get_value('broker_orders_placed_total', {'side': 'buy'}), 2)
+        self.assertEqual(get_value('broker_orders_placed_total', {'side': 'sell'}), 1)
+        self.assertEqual(get_value('broker_orders_closed_total', {'reason': 'take_profit'}), 1)
+        self.assertEqual(get_value('broker_orders_closed_total', {'reason': 'stop_loss'}), 1)
+
+        MetricsExporter.disable()
+        self.__broker.place_order(100, False, 0.9, 1.1)
+        self.assertFalse(MetricsExporter.is_enabled())
+        self.assertEqual(get_value('broker_orders_placed_total', {'side': 'sell'}), 1)
+
+    def test_metrics_exporter_http_endpoint(self) -> None:
+        """
+        Tests MetricsExporter's HTTP endpoint.
+
+        Asserts:
+            Observed durations and retries are served in Prometheus text format.
+        """
+
+        with socket.socket() as free_socket:
+            free_socket.bind((MetricsExporter.DEFAULT_ADDRESS, 0))
+            port = free_socket.getsockname()[1]
+
+        logging.info("Attempt to observe metrics with MetricsExporter enabled.")
+        MetricsExporter.enable(port = port)
+        for _ in range(3):
+            MetricsExporter.observe_environment_step(0.0002)
+        MetricsExporter.observe_coinbase_request(0.3)
+        MetricsExporter.count_coinbase_retry('rate_limited')
+        MetricsExporter.observe_keras_epoch(12.0)
+        MetricsExporter.observe_keras_batch(0.02)
+
+        logging.info("Validating expected result.")
+        with urllib.request.urlopen(f'http://{MetricsExporter.DEFAULT_ADDRESS}:{port}/metrics') as response:
+            content = response.read().decode()
+        prefix = MetricsExporter.NAMESPACE
+        self.assertIn(f'{prefix}_environment_step_duration_seconds_count 3.0', content)
+        self.assertIn(f'{prefix}_environment_step_duration_seconds_bucket{{le="0.00025"}} 3.0', content)
+        self.assertIn(f'{prefix}_coinbase_request_duration_seconds_count 1.0', content)
+        self.assertIn(f'{prefix}_coinbase_request_retries_total{{reason="rate_limited"}} 1.0', content)
+        self.assertIn(f'{prefix}_keras_epoch_duration_seconds_count 1.0', content)
+        self.assertIn(f'{prefix}_keras_batch_duration_seconds_count 1.0', content)
+
+    def test_metrics_callback_keras_rl_dispatch(self) -> None:
+        """
+        Tests MetricsCallback driven by keras-rl callback list, as while agent is trained.
+
+        Asserts:
+            Each episode is recorded as epoch and each step as batch.
+        """
+
+        callbacks = CallbackList([MetricsCallback()])
+        logging.info("Attempt to train two episodes of three steps with MetricsExporter enabled.")
+        MetricsExporter.enable(port = None)
+        for episode in range(2):
+            callbacks.on_episode_begin(episode)
+            for step in range(3):
+                callbacks.on_step_begin(step)
+                callbacks.on_step_end(step)
+            callbacks.on_episode_end(episode)
+
+        logging.info("Validating expected result.")
+        registry = MetricsExporter.get_registry()
+        prefix = MetricsExporter.NAMESPACE
+        self.assertEqual(registry.get_sample_value(f'{prefix}_keras_epoch_duration_seconds_count'), 2)
+        self.assertEqual(registry.get_sample_value(f'{prefix}_keras_batch_duration_seconds_count'), 6)
@@ -0,0 +1,120 @@
+# tests/utils/test_phase_profiler.py
+
+from unittest import TestCase
+import json
+import logging
+import os
+import tempfile
+import time
+
+from source.utils import PhaseProfiler
+
+class PhaseProfilerTestCase(TestCase):
+    """
+    Test case for PhaseProfiler class. Stores all the test cases
+    and allows for convenient test case execution.
+    """
+
+    def setUp(self) -> None:
+        """
+        Setup function responsible for creation of system under
+        test (sut) for this class.
+        """
+
+        logging.info("Setting up test environment.")
+        PhaseProfiler.reset()
+
+    def tearDown(self) -> None:
+        """
+        Tear down function responsible for cleaning up all the
+        needed dependencies between test cases.
+        """
+
+        logging.info("Tearing down test environment.")
+        PhaseProfiler.reset()
+
+    def test_phase_profiler_get_profile(self) -> None:
+        """
+        Tests PhaseProfiler's get_profile functionality.
+
+        Verifies that nested phases are accumulated over calls, and that counters
+        are attributed to phases active while they were counted.
+
+        Asserts:
+            Phases are listed in order of their first start with their nesting depth.
+            Self time of parent phase excludes time of nested phases.
+            Throughput is calculated over the shortest phase covering whole counter.
+            Peak RSS is reported.
+        """
+
+        @PhaseProfiler.measure('evaluate')
+        def evaluate() -> None:
+            PhaseProfiler.count(PhaseProfiler.ENVIRONMENT_STEPS, 10)
+
+        logging.info("Attempt to measure phases for PhaseProfiler.")
+        with PhaseProfiler.measure('run_training'):
+            with PhaseProfiler.measure('fit'):
+                time.sleep(0.05)
+                PhaseProfiler.count(PhaseProfiler.SAMPLES, 100)
+            for _ in range(3):
+                evaluate()
+        profile = PhaseProfiler.get_profile()
+
+        logging.info("Validating expected result.")
+        phases = {phase['path']: phase for phase in profile['phases']}
+        self.assertEqual(list(phases), ['run_training', 'run_training/fit', 'run_training/evaluate'])
+        self.assertEqual([phase['depth'] for phase in profile['phases']], [0, 1, 1])
+        self.assertEqual(phases['run_training/evaluate']['calls'], 3)
+        self.assertEqual(phases['run_training/evaluate']['counters'], {PhaseProfiler.ENVIRONMENT_STEPS: 30})
+        self.assertEqual(phases['run_training']['counters'], {PhaseProfiler.SAMPLES: 100,
+                                                              PhaseProfiler.ENVIRONMENT_STEPS: 30})
+        self.assertGreaterEqual(phases['run_training/fit']['total_time'], 0.05)
+        self.assertLess(phases['run_training']['self_time'], 0.05)
+        self.assertAlmostEqual(profile['throughput']['samples_per_second'],
+                               100 / phases['run_training/fit']['total_time'])
+        self.assertAlmostEqual(profile['throughput']['environment_steps_per_second'],
+                               30 / phases['run_training/evaluate']['total_time'])
+        if os.name == 'posix':
+            self.assertGreater(profile['peak_rss_bytes'], 0)
+
+    def test_phase_profiler_reset_during_phase(self) -> None:
+        """
+        Tests PhaseProfiler's reset functionality while phase is measured.
+
+        Asserts:
+            Phase running during reset is kept, and phases started after it stay nested in it.
+        """
+
+        with PhaseProfiler.measure('outer'):
+            PhaseProfiler.reset()
+            with PhaseProfiler.measure('inner'):
+                pass
+
+        logging.info("Validating expected result.")
+        self.assertEqual([phase['path'] for phase in PhaseProfiler.get_profile()['phases']], ['outer', 'outer/inner'])
+
+    def test_phase_profiler_save_profile(self) -> None:
+        """
+        Tests PhaseProfiler's save_profile and format_profile functionality.
+
+        Asserts:
+            Saved profile is valid JSON containing measured phases.
+            Formatted profile contains line per phase and counter.
+        """
+
+        with PhaseProfiler.measure('generate_report'):
+            with PhaseProfiler.measure('plot_rendering'):
+                PhaseProfiler.count(PhaseProfiler.ENVIRONMENT_STEPS)
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            profile_path = os.path.join(temporary_directory, 'profile.json')
+            PhaseProfiler.save_profile(profile_path)
+            with open(profile_path, 'r') as profile_file:
+                profile = json.load(profile_file)
+
+        logging.info("Validating expected result.")
+        self.assertEqual([phase['path'] for phase in profile['phases']],
+                         ['generate_report', 'generate_report/plot_rendering'])
+        lines = PhaseProfiler.format_profile(profile)
+        self.assertTrue(lines[2].startswith('  plot_rendering'))
+        self.assertTrue(any(line.startswith('environment_steps: 1') for line in lines))